@@ -0,0 +1,14 @@
+"""
+Calculator package entry point: python -m calculator
+Runs the headless command-line evaluator; the GUI is started with calculator_app.py
+"""
+
+import os
+import sys
+
+# The calculator modules import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cli import main
+
+sys.exit(main())
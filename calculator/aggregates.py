@@ -0,0 +1,174 @@
+"""
+GPA Aggregates Module
+Running credit-weighted totals per semester and cumulatively, updated in O(1)
+"""
+
+import math
+
+from course_store import CourseTable
+
+
+TOLERANCE = 1e-9
+
+
+class GradeTotals:
+    """Credit and quality-point totals for a group of courses"""
+
+    __slots__ = ('credits', 'points', 'count')
+
+    def __init__(self, credits=0.0, points=0.0, count=0):
+        self.credits = credits
+        self.points = points
+        self.count = count
+
+    @classmethod
+    def from_courses(cls, courses):
+        """Sum a CourseTable or a list of course dicts from scratch"""
+        if isinstance(courses, CourseTable):
+            return cls(courses.total_credits(), courses.quality_points(), len(courses))
+        courses = list(courses)
+        return cls(
+            math.fsum(c['credits'] for c in courses),
+            math.fsum(c['credits'] * c['points'] for c in courses),
+            len(courses)
+        )
+
+    @property
+    def gpa(self):
+        return self.points / self.credits if self.credits > 0 else 0.0
+
+    def add(self, course):
+        """Include a course"""
+        self.credits += course['credits']
+        self.points += course['credits'] * course['points']
+        self.count += 1
+
+    def remove(self, course):
+        """Exclude a course that was previously added"""
+        self.count -= 1
+        if self.count == 0:
+            # Avoid carrying rounding residue once the group is empty
+            self.credits = 0.0
+            self.points = 0.0
+        else:
+            self.credits -= course['credits']
+            self.points -= course['credits'] * course['points']
+
+    def merge(self, other):
+        """Include all courses of another group"""
+        self.credits += other.credits
+        self.points += other.points
+        self.count += other.count
+
+    def subtract(self, other):
+        """Exclude all courses of another group"""
+        self.count -= other.count
+        if self.count == 0:
+            self.credits = 0.0
+            self.points = 0.0
+        else:
+            self.credits -= other.credits
+            self.points -= other.points
+
+    def copy(self):
+        return GradeTotals(self.credits, self.points, self.count)
+
+    def matches(self, other, tolerance=TOLERANCE):
+        """Compare with another set of totals allowing for float rounding"""
+        return (self.count == other.count
+                and math.isclose(self.credits, other.credits, abs_tol=tolerance)
+                and math.isclose(self.points, other.points, abs_tol=tolerance))
+
+    def __repr__(self):
+        return f"GradeTotals(credits={self.credits}, points={self.points}, count={self.count})"
+
+
+class GPAAggregates:
+    """Totals for the current semester, each saved semester and all courses
+
+    Every mutation is O(1) (deleting a semester is O(1) plus the list
+    removal). With verify=True each update is cross-checked against a full
+    recomputation from the course lists passed to verify().
+    """
+
+    def __init__(self, verify=False):
+        self.current = GradeTotals()
+        self.semesters = []
+        self.cumulative = GradeTotals()
+        self.verify_enabled = verify
+
+    def rebuild(self, semesters, current_courses):
+        """Recompute all totals from scratch, e.g. after loading data"""
+        self.semesters = [GradeTotals.from_courses(s['courses']) for s in semesters]
+        self.current = GradeTotals.from_courses(current_courses)
+        self.cumulative = GradeTotals()
+        for totals in self.semesters:
+            self.cumulative.merge(totals)
+        self.cumulative.merge(self.current)
+
+    def add_course(self, course):
+        """Add a course to the current semester"""
+        self.current.add(course)
+        self.cumulative.add(course)
+
+    def remove_course(self, course):
+        """Remove a course from the current semester"""
+        self.current.remove(course)
+        self.cumulative.remove(course)
+
+    def edit_course(self, old, new):
+        """Replace a current-semester course with an edited version"""
+        self.remove_course(old)
+        self.add_course(new)
+
+    def save_semester(self):
+        """Move the current semester's totals into the saved semesters"""
+        self.semesters.append(self.current)
+        self.current = GradeTotals()
+
+    def add_semester(self, courses):
+        """Add an already complete semester, e.g. from an import"""
+        totals = GradeTotals.from_courses(courses)
+        self.semesters.append(totals)
+        self.cumulative.merge(totals)
+
+    def clear_current(self):
+        """Drop all current-semester courses"""
+        self.cumulative.subtract(self.current)
+        self.current = GradeTotals()
+
+    def delete_semester(self, index):
+        """Remove a saved semester"""
+        self.cumulative.subtract(self.semesters.pop(index))
+
+    def copy(self):
+        """Independent copy, e.g. to hand to a background export"""
+        other = GPAAggregates(self.verify_enabled)
+        other.current = self.current.copy()
+        other.semesters = [totals.copy() for totals in self.semesters]
+        other.cumulative = self.cumulative.copy()
+        return other
+
+    def verify(self, semesters, current_courses):
+        """Cross-check the running totals against a full recomputation
+
+        Returns a list of mismatch descriptions (empty when consistent).
+        Does nothing unless verification is enabled.
+        """
+        if not self.verify_enabled:
+            return []
+        expected = GPAAggregates()
+        expected.rebuild(semesters, current_courses)
+        mismatches = []
+        if len(expected.semesters) != len(self.semesters):
+            mismatches.append(
+                f"semester count {len(self.semesters)} != {len(expected.semesters)}"
+            )
+        for idx, (actual, wanted) in enumerate(zip(self.semesters, expected.semesters)):
+            if not actual.matches(wanted):
+                mismatches.append(f"semester {idx}: {actual} != {wanted}")
+        if not self.current.matches(expected.current):
+            mismatches.append(f"current: {self.current} != {expected.current}")
+        if not self.cumulative.matches(expected.cumulative):
+            mismatches.append(f"cumulative: {self.cumulative} != {expected.cumulative}")
+        return mismatches
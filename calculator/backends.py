@@ -0,0 +1,430 @@
+"""
+Numeric Backends Module
+Selectable number types for the engine: IEEE float, Decimal and exact Fraction
+"""
+
+import decimal
+import math
+from decimal import Decimal
+from fractions import Fraction
+
+import bignum
+import memo
+from operations import CONSTANTS, REGISTRY, binary_operation, format_number, scientific_function
+
+
+class FloatBackend:
+    """IEEE-754 double precision; the fast default"""
+
+    name = "float"
+
+    def parse(self, text):
+        """Convert display text to a number"""
+        return float(text)
+
+    def coerce(self, value):
+        """Convert a number from another backend"""
+        return float(value)
+
+    def format(self, value):
+        """Format a number for display"""
+        return format_number(value)
+
+    def constant(self, name):
+        """Return a named mathematical constant"""
+        return CONSTANTS[name]
+
+    def negate(self, value):
+        return -value
+
+    def binary(self, op, prev, current):
+        """Apply a binary operation"""
+        return binary_operation(op, prev, current)
+
+    def scientific(self, func, value, angle_mode="deg"):
+        """Apply a scientific function"""
+        return scientific_function(func, value, angle_mode)
+
+
+class DecimalBackend:
+    """decimal.Decimal arithmetic with a configurable number of significant digits"""
+
+    name = "decimal"
+
+    def __init__(self, precision=28):
+        self.context = decimal.Context(prec=precision)
+        self._pi = None
+        # Memoized results are shared by backends computing them the same way
+        self.cache_scope = (self.name, precision)
+        self.functions = {
+            'sin': self.sin, 'cos': self.cos, 'tan': self.tan,
+            'log': lambda x, mode: self.context.log10(x),
+            'ln': lambda x, mode: self.context.ln(x),
+            'sqrt': lambda x, mode: self.context.sqrt(x),
+            'cbrt': lambda x, mode: self.cbrt(x),
+            'square': lambda x, mode: self.context.multiply(x, x),
+            'cube': lambda x, mode: self.context.power(x, 3),
+            'reciprocal': lambda x, mode: self.context.divide(1, x),
+            'factorial': lambda x, mode: self.factorial(x),
+            'abs': lambda x, mode: self.context.abs(x),
+            '10x': lambda x, mode: self.context.power(Decimal(10), x),
+            '2x': lambda x, mode: self.context.power(Decimal(2), x),
+        }
+        self.operators = {
+            '+': self.context.add,
+            '-': self.context.subtract,
+            '*': self.context.multiply,
+            '/': self.context.divide,
+            '^': self.power,
+            '%': self.modulo,
+        }
+
+    @property
+    def precision(self):
+        return self.context.prec
+
+    def __reduce__(self):
+        # The function tables hold bound lambdas; rebuild them when unpickled
+        return (DecimalBackend, (self.context.prec,))
+
+    def parse(self, text):
+        """Convert display text to a number"""
+        try:
+            return self.context.create_decimal(text)
+        except decimal.InvalidOperation:
+            raise ValueError(f"could not convert string to Decimal: {text!r}") from None
+
+    def coerce(self, value):
+        """Convert a number from another backend"""
+        if isinstance(value, Fraction):
+            return self.context.divide(Decimal(value.numerator), Decimal(value.denominator))
+        return self.context.create_decimal(value)
+
+    def format(self, value):
+        """Format a number for display without trailing zeros"""
+        if not value.is_finite():
+            return str(value)
+        if value.is_zero():
+            return "0"
+        value = self.context.plus(value).normalize(self.context)
+        limit = max(bignum.DISPLAY_DIGITS, self.context.prec)
+        if not -limit <= value.adjusted() < limit:
+            # Avoid writing out hundreds of thousands of leading or trailing zeros
+            return format(value, 'e')
+        return format(value, 'f')
+
+    def constant(self, name):
+        """Return a named mathematical constant"""
+        if name == 'pi':
+            return self.pi()
+        if name == 'e':
+            return self.context.exp(Decimal(1))
+        raise KeyError(name)
+
+    def negate(self, value):
+        # Unary minus on a Decimal would round to the thread's context precision
+        return self.context.minus(value)
+
+    def binary(self, op, prev, current):
+        """Apply a binary operation"""
+        operation = REGISTRY.get(op, arity=2)
+        if op not in self.operators:
+            return self.coerce(operation(float(prev), float(current)))
+        if operation.domain is not None and not operation.domain(prev, current):
+            raise operation.error(f"{op}: math domain error")
+        return self.operators[op](prev, current)
+
+    def scientific(self, func, value, angle_mode="deg"):
+        """Apply a scientific function"""
+        operation = REGISTRY.get(func, arity=1)
+        if func not in self.functions:
+            # Operations registered without a Decimal implementation run in float
+            return self.coerce(operation(float(value), angle_mode=angle_mode))
+        if operation.domain is not None and not operation.domain(value):
+            raise operation.error(f"{func}: math domain error")
+        return memo.call(self.cache_scope, operation, value, angle_mode, self.functions[func])
+
+    def factorial(self, x):
+        result = bignum.factorial(x)
+        if isinstance(result, bignum.LargeNumber):
+            # Only the leading digits are known; Decimal keeps the exponent exact
+            return self.context.create_decimal(f"{result.mantissa!r}e{result.exponent}")
+        return self.context.plus(Decimal(result))
+
+    def power(self, base, exponent):
+        if exponent.is_zero():
+            # Decimal treats 0^0 as invalid; float and Fraction give 1
+            return Decimal(1)
+        if exponent == exponent.to_integral_value():
+            exponent = int(exponent)
+        return self.context.power(base, exponent)
+
+    def modulo(self, a, b):
+        # Match float semantics: the result takes the sign of the divisor
+        with decimal.localcontext(self.context) as ctx:
+            ctx.prec += 5
+            quotient = (a / b).to_integral_value(rounding=decimal.ROUND_FLOOR)
+            result = a - b * quotient
+        return self.context.plus(result)
+
+    def pi(self):
+        """Compute pi to the backend precision (cached)"""
+        if self._pi is None:
+            with decimal.localcontext(self.context) as ctx:
+                ctx.prec += 2
+                three = Decimal(3)
+                lasts, t, s, n, na, d, da = 0, three, 3, 1, 0, 0, 24
+                while s != lasts:
+                    lasts = s
+                    n, na = n + na, na + 8
+                    d, da = d + da, da + 32
+                    t = (t * n) / d
+                    s += t
+            self._pi = self.context.plus(s)
+        return self._pi
+
+    def _radians(self, x, angle_mode):
+        with decimal.localcontext(self.context) as ctx:
+            ctx.prec += 5
+            if angle_mode == 'deg':
+                x = x * self.pi() / 180
+            # Reduce into [0, 2pi) so the series converges quickly
+            two_pi = 2 * self.pi()
+            return x - two_pi * (x / two_pi).to_integral_value(rounding=decimal.ROUND_FLOOR)
+
+    def _series(self, x, first_term, first_index):
+        with decimal.localcontext(self.context) as ctx:
+            ctx.prec += 5
+            i, lasts, s, fact, num, sign = first_index, 0, first_term, 1, first_term, 1
+            x2 = x * x
+            while s != lasts:
+                lasts = s
+                i += 2
+                fact *= i * (i - 1)
+                num *= x2
+                sign *= -1
+                s += num / fact * sign
+            return s
+
+    def sin(self, x, angle_mode="deg"):
+        x = self._radians(x, angle_mode)
+        return self.context.plus(self._series(x, x, 1))
+
+    def cos(self, x, angle_mode="deg"):
+        x = self._radians(x, angle_mode)
+        return self.context.plus(self._series(x, Decimal(1), 0))
+
+    def tan(self, x, angle_mode="deg"):
+        x = self._radians(x, angle_mode)
+        with decimal.localcontext(self.context) as ctx:
+            ctx.prec += 5
+            result = self._series(x, x, 1) / self._series(x, Decimal(1), 0)
+        return self.context.plus(result)
+
+    def cbrt(self, x):
+        if x.is_zero():
+            return Decimal(0)
+        sign = -1 if x < 0 else 1
+        x = abs(x)
+        with decimal.localcontext(self.context) as ctx:
+            ctx.prec += 5
+            y = (x.ln() / 3).exp()
+            # Newton steps polish the last digits so perfect cubes come out exact
+            for _ in range(3):
+                y = (2 * y + x / (y * y)) / 3
+        return self.context.plus(sign * y)
+
+
+class FractionBackend:
+    """Exact rational arithmetic with fractions.Fraction
+
+    Operations that have a rational result (the four basic operations,
+    integer powers, factorial, and roots of perfect squares and cubes)
+    stay exact. Transcendental results, and integer powers estimated
+    above bignum.EXACT_DIGITS_LIMIT digits, are computed with a
+    DecimalBackend of the given precision and converted to the nearest
+    Fraction.
+    """
+
+    name = "fraction"
+
+    def __init__(self, precision=28, max_display_denominator=10 ** 6):
+        self.decimal = DecimalBackend(precision)
+        self.max_display_denominator = max_display_denominator
+        self.cache_scope = (self.name, precision)
+        self.functions = {
+            'sin': self._via_decimal('sin'), 'cos': self._via_decimal('cos'),
+            'tan': self._via_decimal('tan'), 'log': self.log10,
+            'ln': self._via_decimal('ln'),
+            'sqrt': lambda x, mode: self.root(x, 2),
+            'cbrt': lambda x, mode: self.root(x, 3),
+            'square': lambda x, mode: x * x,
+            'cube': lambda x, mode: x ** 3,
+            'reciprocal': lambda x, mode: 1 / x,
+            'factorial': lambda x, mode: self.factorial(x),
+            'abs': lambda x, mode: abs(x),
+            '10x': lambda x, mode: self.exp_base(10, x),
+            '2x': lambda x, mode: self.exp_base(2, x),
+        }
+        self.operators = {
+            '+': lambda a, b: a + b,
+            '-': lambda a, b: a - b,
+            '*': lambda a, b: a * b,
+            '/': lambda a, b: a / b,
+            '^': self.power,
+            '%': lambda a, b: a % b,
+        }
+
+    @property
+    def precision(self):
+        return self.decimal.precision
+
+    def __reduce__(self):
+        return (FractionBackend, (self.decimal.precision, self.max_display_denominator))
+
+    def parse(self, text):
+        """Convert display text (decimal or p/q) to a number"""
+        return Fraction(text)
+
+    def coerce(self, value):
+        """Convert a number from another backend"""
+        return Fraction(value)
+
+    def format(self, value):
+        """Format as p/q when the denominator is small, else as a decimal
+
+        Integers beyond bignum.DISPLAY_DIGITS digits are shown in
+        scientific notation, and numbers with more than
+        bignum.EXACT_DIGITS_LIMIT digits are never converted to decimal
+        digits in full.
+        """
+        numerator, denominator = value.numerator, value.denominator
+        if not bignum.is_large(numerator):
+            if denominator == 1:
+                return str(numerator)
+            if denominator <= self.max_display_denominator:
+                return f"{numerator}/{denominator}"
+        digits = max(numerator.bit_length(), denominator.bit_length()) * math.log10(2)
+        if digits > bignum.EXACT_DIGITS_LIMIT:
+            log10_abs = math.log10(abs(numerator)) - math.log10(denominator)
+            return bignum.format_scientific(bignum.LargeNumber(-1 if numerator < 0 else 1, log10_abs))
+        return self.decimal.format(self.decimal.coerce(value))
+
+    def constant(self, name):
+        """Return a rational approximation of a named constant"""
+        return Fraction(self.decimal.constant(name))
+
+    def negate(self, value):
+        return -value
+
+    def binary(self, op, prev, current):
+        """Apply a binary operation"""
+        operation = REGISTRY.get(op, arity=2)
+        if op not in self.operators:
+            return Fraction(operation(float(prev), float(current)))
+        if operation.domain is not None and not operation.domain(prev, current):
+            raise operation.error(f"{op}: math domain error")
+        return self.operators[op](prev, current)
+
+    def scientific(self, func, value, angle_mode="deg"):
+        """Apply a scientific function"""
+        operation = REGISTRY.get(func, arity=1)
+        if func not in self.functions:
+            return Fraction(operation(float(value), angle_mode=angle_mode))
+        if operation.domain is not None and not operation.domain(value):
+            raise operation.error(f"{func}: math domain error")
+        return memo.call(self.cache_scope, operation, value, angle_mode, self.functions[func])
+
+    def factorial(self, x):
+        n = int(x)
+        if bignum.factorial_digits(n) > bignum.EXACT_DIGITS_LIMIT:
+            raise OverflowError(f"{n}! exceeds {bignum.EXACT_DIGITS_LIMIT} digits")
+        return Fraction(bignum.exact_factorial(n))
+
+    def _via_decimal(self, func):
+        def apply(x, angle_mode):
+            return Fraction(self.decimal.scientific(func, self.decimal.coerce(x), angle_mode))
+        return apply
+
+    def log10(self, x, angle_mode="deg"):
+        # Exact for powers of ten, e.g. log(1/1000) == -3
+        for value, sign in ((x, 1), (1 / x, -1)):
+            if value.denominator == 1 and value.numerator >= 1:
+                digits = len(str(value.numerator)) - 1
+                if value.numerator == 10 ** digits:
+                    return Fraction(sign * digits)
+        return Fraction(self.decimal.functions['log'](self.decimal.coerce(x), angle_mode))
+
+    def root(self, x, n):
+        """Exact n-th root of perfect powers, else a Decimal approximation"""
+        sign = -1 if x < 0 else 1
+        num = _integer_root(abs(x.numerator), n)
+        den = _integer_root(x.denominator, n)
+        if num is not None and den is not None:
+            return Fraction(sign * num, den)
+        func = 'sqrt' if n == 2 else 'cbrt'
+        return Fraction(self.decimal.scientific(func, self.decimal.coerce(x)))
+
+    def power(self, base, exponent):
+        if exponent.denominator == 1:
+            return self._integer_power(base, exponent.numerator)
+        if exponent.denominator in (2, 3) and base >= 0:
+            root = self.root(base, exponent.denominator)
+            return root ** exponent.numerator
+        return Fraction(self.decimal.power(self.decimal.coerce(base), self.decimal.coerce(exponent)))
+
+    def exp_base(self, base, exponent):
+        if exponent.denominator == 1:
+            return self._integer_power(Fraction(base), exponent.numerator)
+        return Fraction(self.decimal.power(Decimal(base), self.decimal.coerce(exponent)))
+
+    def _integer_power(self, base, n):
+        """Exact base ** n, approximated in Decimal when estimated above EXACT_DIGITS_LIMIT digits"""
+        digits = max(bignum.power_digits(base.numerator, abs(n)),
+                     bignum.power_digits(base.denominator, abs(n)))
+        if digits <= bignum.EXACT_DIGITS_LIMIT:
+            return base ** n
+        # Decimal raises Overflow/Underflow beyond its exponent range
+        return Fraction(self.decimal.power(self.decimal.coerce(base), Decimal(n)))
+
+
+def _integer_root(value, n):
+    """Return the exact integer n-th root of value, or None"""
+    if n == 2:
+        root = math.isqrt(value)
+    else:
+        root = round(value ** (1 / n)) if value < 2 ** 53 else _icbrt(value)
+    for candidate in (root - 1, root, root + 1):
+        if candidate >= 0 and candidate ** n == value:
+            return candidate
+    return None
+
+
+def _icbrt(value):
+    # Integer Newton iteration for cube roots of large integers
+    x = 1 << ((value.bit_length() + 2) // 3)
+    while True:
+        y = (2 * x + value // (x * x)) // 3
+        if y >= x:
+            return x
+        x = y
+
+
+FLOAT = FloatBackend()
+
+BACKENDS = {
+    'float': FloatBackend,
+    'decimal': DecimalBackend,
+    'fraction': FractionBackend,
+}
+
+
+def get_backend(name, precision=None):
+    """Create a backend by name, passing precision to Decimal/Fraction"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown numeric backend: {name}")
+    if name == 'float':
+        return FLOAT
+    if precision is None:
+        return BACKENDS[name]()
+    return BACKENDS[name](precision)
@@ -0,0 +1,263 @@
+"""
+Batch Module
+Recomputes GPA for a directory of student data files in parallel
+
+    python batch.py students/ --output summary.csv
+    python batch.py students/ --output summary.jsonl --workers 8
+
+Files below the directory are grouped into students by name: alice.json,
+alice.gpab and the change log alice.json.log are one student, loaded
+like the GPA tab loads them (newest snapshot plus the log). A
+GPA_Calculator_Data-style alice.csv is used for a student with no
+snapshot or log. Students are processed by a process pool sized to
+the CPU count and results are written to the summary as they arrive.
+A cache next to the data remembers the mtime and size of each of a
+student's files, their content hash and the result, so unchanged
+students are not recomputed: equal mtimes and sizes skip the student
+outright, and files that were only touched are recognized by the hash.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from aggregates import GPAAggregates
+from course_store import CourseTable
+from csv_import import import_csv
+from grade_scheme import current_scheme, load_scheme, use_scheme
+from snapshot import BINARY_EXTENSION
+from storage import LogStore
+
+
+LOG_EXTENSION = ".json.log"
+EXTENSIONS = (LOG_EXTENSION, ".json", BINARY_EXTENSION, ".csv")
+CACHE_NAME = ".gpa_batch_cache.json"
+FIELDS = ["student", "file", "semesters", "courses", "credits", "cumulative_gpa",
+          "current_gpa", "semester_gpas", "error"]
+
+
+def split_extension(name):
+    """(stem, extension) of a student data file name, or (name, None)"""
+    for extension in EXTENSIONS:
+        if name.endswith(extension):
+            return name[:-len(extension)], extension
+    return name, None
+
+
+def find_students(directory, exclude=()):
+    """{student: relative paths of its data files}, in a stable order"""
+    exclude = {os.path.abspath(path) for path in exclude}
+    students = {}
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            stem, extension = split_extension(name)
+            if extension is None or name == CACHE_NAME or os.path.abspath(path) in exclude:
+                continue
+            student = os.path.relpath(os.path.join(root, stem), directory).replace(os.sep, "/")
+            students.setdefault(student, []).append(os.path.relpath(path, directory))
+    for student, paths in students.items():
+        stored = [path for path in paths if not path.endswith(".csv")]
+        if stored:
+            students[student] = stored
+    return students
+
+
+def files_hash(paths):
+    """SHA-256 over the names and contents of several files"""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(f"{os.path.basename(path)}\0{os.path.getsize(path)}\0".encode('utf-8'))
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def compute_student(paths):
+    """GPA summary for one student's data files (see find_students)"""
+    if paths[0].endswith(".csv"):
+        semesters, _ = import_csv(paths[0])
+        current = CourseTable()
+    else:
+        stem, _ = split_extension(paths[0])
+        semesters, current = LogStore(stem + ".json").load(repair=False)
+
+    totals = GPAAggregates()
+    totals.rebuild(semesters, current)
+    return {
+        "semesters": len(semesters),
+        "courses": totals.cumulative.count,
+        "credits": totals.cumulative.credits,
+        "cumulative_gpa": round(totals.cumulative.gpa, 4),
+        "current_gpa": round(totals.current.gpa, 4),
+        "semester_gpas": [round(t.gpa, 4) for t in totals.semesters],
+    }
+
+
+def process_student(paths, cached_hash=None, cached_result=None):
+    """Worker: (content hash, result, reused) for a student, reusing the cache if the content matches"""
+    digest = files_hash(paths)
+    if digest == cached_hash and cached_result is not None:
+        return digest, cached_result, True
+    return digest, compute_student(paths), False
+
+
+class CsvSummary:
+    def __init__(self, out):
+        self.writer = csv.DictWriter(out, FIELDS, lineterminator="\n")
+        self.writer.writeheader()
+
+    def write(self, row):
+        row = dict(row, semester_gpas=";".join(str(g) for g in row.get("semester_gpas", [])))
+        self.writer.writerow(row)
+
+
+class JsonLinesSummary:
+    def __init__(self, out):
+        self.out = out
+
+    def write(self, row):
+        self.out.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+SUMMARIES = {'csv': CsvSummary, 'jsonl': JsonLinesSummary}
+
+
+def load_cache(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(path, cache):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, path)
+
+
+class BatchStats:
+    def __init__(self, total):
+        self.total = total
+        self.computed = 0
+        self.cached = 0
+        self.failed = 0
+
+    @property
+    def done(self):
+        return self.computed + self.cached + self.failed
+
+    def __str__(self):
+        return (f"{self.done}/{self.total} students: {self.computed} computed, "
+                f"{self.cached} unchanged, {self.failed} failed")
+
+
+def run_batch(directory, out, fmt="csv", max_workers=None, use_cache=True, on_progress=None,
+              exclude=()):
+    """Summarize every student in a directory, streaming rows to out
+
+    Returns BatchStats. on_progress(stats) is called after each student;
+    exclude lists paths to leave out, such as a summary written inside
+    the directory.
+    """
+    students = find_students(directory, exclude)
+    cache_path = os.path.join(directory, CACHE_NAME)
+    cache = load_cache(cache_path) if use_cache else {}
+    # Results computed under another grade scheme are stale
+    if cache.get("grade_scheme") != current_scheme().key:
+        cache = {}
+    cache = cache.get("students", {})
+    new_cache = {}
+    summary = SUMMARIES[fmt](out)
+    stats = BatchStats(len(students))
+
+    def emit(student, result=None, error=None):
+        row = {"student": student, "file": ";".join(students[student]), "error": error or ""}
+        row.update(result or {})
+        summary.write(row)
+        if on_progress is not None:
+            on_progress(stats)
+
+    pending = {}
+    # Workers use the same grade scheme as this process
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                             initializer=use_scheme, initargs=(current_scheme(),)) as pool:
+        for student, relpaths in students.items():
+            paths = [os.path.join(directory, relpath) for relpath in relpaths]
+            # Every file of the student, including its change log, is part of the key
+            files = {}
+            for relpath, path in zip(relpaths, paths):
+                stat = os.stat(path)
+                files[relpath] = [stat.st_mtime_ns, stat.st_size]
+            entry = cache.get(student)
+            if entry and entry.get("files") == files:
+                new_cache[student] = entry
+                stats.cached += 1
+                emit(student, entry["result"])
+                continue
+            future = pool.submit(process_student, paths,
+                                 entry and entry["hash"], entry and entry["result"])
+            pending[future] = (student, files)
+
+        for future in as_completed(pending):
+            student, files = pending[future]
+            try:
+                digest, result, reused = future.result()
+            except Exception as e:
+                stats.failed += 1
+                emit(student, error=f"{type(e).__name__}: {e}")
+                continue
+            new_cache[student] = {"files": files, "hash": digest, "result": result}
+            if reused:
+                stats.cached += 1
+            else:
+                stats.computed += 1
+            emit(student, result)
+
+    if use_cache:
+        save_cache(cache_path, {"grade_scheme": current_scheme().key, "students": new_cache})
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recompute GPA for a directory of student data files.")
+    parser.add_argument("directory",
+                        help="directory containing .json, .gpab, .json.log or .csv student files")
+    parser.add_argument("-o", "--output", help="summary file (default: stdout)")
+    parser.add_argument("--format", choices=sorted(SUMMARIES),
+                        help="summary format (default: from --output extension, else csv)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="recompute every file and leave the cache untouched")
+    parser.add_argument("--grade-scheme", metavar="PATH",
+                        help="JSON grade scheme to use instead of the 4.0 scale")
+    args = parser.parse_args(argv)
+
+    if args.grade_scheme:
+        use_scheme(load_scheme(args.grade_scheme))
+
+    fmt = args.format or ('jsonl' if args.output and args.output.endswith(".jsonl") else 'csv')
+
+    def progress(stats):
+        print(f"\r{stats}", end="", file=sys.stderr, flush=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8', newline="") as out:
+            stats = run_batch(args.directory, out, fmt, args.workers, not args.no_cache, progress,
+                              exclude=[args.output])
+    else:
+        stats = run_batch(args.directory, sys.stdout, fmt, args.workers, not args.no_cache, progress)
+    print(file=sys.stderr)
+    return 1 if stats.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
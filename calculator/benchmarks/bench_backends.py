@@ -0,0 +1,80 @@
+"""
+Numeric Backend Benchmark
+Compares speed and accuracy of the float, Decimal and Fraction backends
+
+Run from the calculator directory:
+    python benchmarks/bench_backends.py [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from decimal import Decimal
+from fractions import Fraction
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import expression
+from backends import FLOAT, DecimalBackend, FractionBackend
+
+
+# Same workload for every backend: drift-prone sums, roots and compounding
+WORKLOAD = [
+    "0.1+0.2",
+    "0.1*3-0.3",
+    "cbrt(27)",
+    "cbrt(-8)",
+    "(1/3)*3",
+    "sqrt(2)^2",
+    "sin(30)",
+    "1.1^10",
+    "1000(1+0.05/12)^120",
+    "log(1000)",
+    "2^0.5*2^0.5",
+]
+
+
+def to_decimal(value):
+    """Convert any backend result to a Decimal for error measurement"""
+    if isinstance(value, Fraction):
+        return Decimal(value.numerator) / Decimal(value.denominator)
+    return Decimal(value)
+
+
+def run_backend(backend, repeat):
+    """Return (seconds per evaluation, results) for the workload"""
+    results = [expression.evaluate(text, "deg", backend) for text in WORKLOAD]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in WORKLOAD:
+            expression.evaluate(text, "deg", backend)
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(WORKLOAD)), results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    reference = DecimalBackend(precision=60)
+    expected = [to_decimal(expression.evaluate(text, "deg", reference)) for text in WORKLOAD]
+
+    backends = [
+        ("float", FLOAT),
+        ("decimal (28 digits)", DecimalBackend(28)),
+        ("decimal (50 digits)", DecimalBackend(50)),
+        ("fraction", FractionBackend()),
+    ]
+
+    print(f"{'backend':<22}{'us/eval':>10}{'max abs error':>18}{'exact results':>15}")
+    for name, backend in backends:
+        per_eval, results = run_backend(backend, args.repeat)
+        errors = [abs(to_decimal(r) - e) for r, e in zip(results, expected)]
+        exact = sum(1 for err in errors if err < Decimal("1e-50"))
+        print(f"{name:<22}{per_eval * 1e6:>10.1f}{max(errors):>18.2E}{exact:>10}/{len(WORKLOAD)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Snapshot Benchmark
+Compares loading GPA data from the JSON and binary snapshot formats
+
+Run from the calculator directory:
+    python benchmarks/bench_snapshot.py [--sizes 1000 100000 1000000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from course_store import GRADES, CourseTable
+from snapshot import load_binary, read_header, read_snapshot, write_binary, write_snapshot
+
+
+COURSES_PER_SEMESTER = 6
+DISTINCT_NAMES = 2000
+
+
+def make_semesters(course_count, seed=0):
+    """Random semesters totalling course_count courses"""
+    rng = np.random.default_rng(seed)
+    names = [f"Course {i}" for i in range(DISTINCT_NAMES)]
+    semesters = []
+    for start in range(0, course_count, COURSES_PER_SEMESTER):
+        count = min(COURSES_PER_SEMESTER, course_count - start)
+        semesters.append({
+            'name': f"Semester {len(semesters) + 1}",
+            'courses': CourseTable.from_columns(
+                [names[i] for i in rng.integers(0, DISTINCT_NAMES, count)],
+                rng.choice([1.0, 2.0, 3.0, 4.0], count),
+                [GRADES[i] for i in rng.integers(0, len(GRADES), count)],
+            ),
+        })
+    return semesters, CourseTable()
+
+
+def best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'courses':>10}{'json MB':>10}{'binary MB':>11}{'json load':>12}"
+          f"{'binary load':>13}{'header':>10}{'speedup':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "gpa_data.json")
+        binary_path = os.path.join(tmp, "gpa_data.gpab")
+        for size in args.sizes:
+            semesters, current = make_semesters(size)
+            write_snapshot(json_path, semesters, current)
+            write_binary(binary_path, semesters, current)
+
+            json_time = best_time(lambda: read_snapshot(json_path), args.repeat)
+            binary_time = best_time(lambda: load_binary(binary_path), args.repeat)
+            header_time = best_time(lambda: read_header(binary_path).cumulative.gpa, args.repeat)
+            print(f"{size:>10}{os.path.getsize(json_path) / 1e6:>10.1f}"
+                  f"{os.path.getsize(binary_path) / 1e6:>11.1f}"
+                  f"{json_time * 1000:>10.1f}ms{binary_time * 1000:>11.1f}ms"
+                  f"{header_time * 1e6:>8.0f}us{json_time / binary_time:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,431 @@
+"""
+Benchmark Suite
+Times the calculator's hot paths and flags regressions against a stored baseline
+
+Run from the calculator directory:
+    python benchmarks/run_benchmarks.py --output baseline.json
+    python benchmarks/run_benchmarks.py --baseline baseline.json --threshold 0.25
+    python benchmarks/run_benchmarks.py --quick --only engine gpa
+
+Groups:
+    engine      keypress arithmetic, every scientific function, typed expressions
+    format      format_number on integers, decimals and huge results
+    gpa         GPAAggregates.rebuild and calculate_gpa at 10 to 1,000,000 courses
+    storage     save_data (LogStore.append) and load_data at growing history sizes
+    export      export_report in every format
+    tk          update_course_list and create_buttons in a hidden Tk window
+                (skipped when no display is available)
+
+Every case reports the best of several repeats, in seconds per operation.
+Inputs come from fixed seeds, so two runs on the same machine measure
+the same work. With --baseline, cases slower than the baseline by more
+than the threshold are listed and the exit status is 1.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aggregates import GPAAggregates
+from course_store import CourseTable
+from engine import CalculatorEngine
+from export import EXTENSIONS, export_report
+from operations import REGISTRY, format_number
+from repository import MemoryRepository
+from snapshot import write_any
+from storage import COMPACT_EVERY, LogStore
+
+from bench_snapshot import make_semesters
+
+try:
+    from gpa_calculator import GPACalculator
+except ImportError:     # customtkinter missing: only the headless GPA cases run
+    GPACalculator = None
+
+
+GPA_SIZES = [10, 1000, 100000, 1000000]
+HISTORY_SIZES = [100, 1000, 10000, 100000, 1000000]
+EXPORT_SIZES = [1000, 100000]
+TABLE_SIZES = [10, 1000, 100000]
+
+QUICK_GPA_SIZES = [10, 1000, 10000]
+QUICK_HISTORY_SIZES = [100, 1000, 10000]
+QUICK_EXPORT_SIZES = [1000]
+QUICK_TABLE_SIZES = [10, 1000]
+
+# Verifying totals recomputes every course, so larger sizes add little but time
+VERIFY_LIMIT = 100000
+
+DEFAULT_THRESHOLD = 0.25
+
+
+class Skip(Exception):
+    """Raised by a group that cannot run here, with the reason"""
+
+
+# Engine
+
+def bench_engine(quick):
+    engine = CalculatorEngine()
+
+    def arithmetic(op):
+        def run():
+            engine.all_clear()
+            engine.number_pressed('12.5')
+            engine.operation_pressed(op)
+            engine.number_pressed('3')
+            engine.equals_pressed()
+        return run
+
+    for op in ('+', '-', '*', '/', '^', '%'):
+        yield "engine.equals_pressed", {'op': op}, arithmetic(op), 1
+
+    def scientific(func):
+        def run():
+            engine.current_value = "5"
+            engine.scientific_function(func)
+        return run
+
+    for func in REGISTRY.keys(arity=1):
+        yield "engine.scientific_function", {'func': func}, scientific(func), 1
+
+    yield "engine.evaluate", {'text': "2(3+4)^2 - sqrt(16)"}, \
+        lambda: engine.evaluate("2(3+4)^2 - sqrt(16)"), 1
+
+
+def bench_format(quick):
+    values = {
+        'int': [0, 7, 42, 1024, 65536, 10 ** 9],
+        'float': [0.1 + 0.2, 1 / 3, 2.5, 3.14159, 1e-7, 12345.678],
+        'large': [2.0 ** 1000, 10.0 ** 300],
+    }
+    for kind, numbers in values.items():
+        yield "format_number", {'kind': kind}, \
+            lambda numbers=numbers: [format_number(n) for n in numbers], len(numbers)
+
+
+# GPA
+
+class _Label:
+    def configure(self, **options):
+        pass
+
+
+class HeadlessGPA:
+    """The state GPACalculator.calculate_gpa reads, with labels that draw nothing"""
+
+    def __init__(self, semesters, current, verify=False):
+        self.calculate_gpa = GPACalculator.calculate_gpa.__get__(self)
+        self.get_gpa_color = GPACalculator.get_gpa_color.__get__(self)
+        self.semesters = semesters
+        self.current_semester_courses = current
+        self.totals = GPAAggregates(verify=verify)
+        self.totals.rebuild(semesters, current)
+        self.repository = MemoryRepository(self)
+        self.semester_gpa_label = _Label()
+        self.cumulative_gpa_label = _Label()
+        self.credits_label = _Label()
+
+
+def bench_gpa(quick):
+    for size in QUICK_GPA_SIZES if quick else GPA_SIZES:
+        semesters, current = make_semesters(size)
+        totals = GPAAggregates()
+        yield "gpa.rebuild", {'courses': size}, lambda s=semesters, c=current: totals.rebuild(s, c), 1
+        if GPACalculator is None:
+            continue
+
+        gpa = HeadlessGPA(semesters, current)
+        yield "gpa.calculate_gpa", {'courses': size}, gpa.calculate_gpa, 1
+        if size <= VERIFY_LIMIT:
+            checked = HeadlessGPA(semesters, current, verify=True)
+            yield "gpa.calculate_gpa_verified", {'courses': size}, checked.calculate_gpa, 1
+
+
+# Persistence
+
+def changes(count, seed=0):
+    """count change records like the GPA tab's: six courses, then a saved semester"""
+    rng = np.random.default_rng(seed)
+    credits = rng.choice([1.0, 2.0, 3.0, 4.0], count).tolist()
+    grades = rng.choice(['A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'D', 'F'], count).tolist()
+    records = []
+    for i in range(count):
+        if i % 7 == 6:
+            records.append({'op': 'save_semester', 'name': f"Semester {i // 7 + 1}"})
+        else:
+            records.append({'op': 'add_course',
+                            'course': {'name': f"Course {i}", 'credits': credits[i], 'grade': grades[i]}})
+    return records
+
+
+def bench_storage(quick):
+    """Saving and loading with size courses already stored
+
+    Compaction rewrites the whole snapshot every COMPACT_EVERY changes,
+    so a save is timed over one full window of changes on top of a
+    snapshot of the given size, and a load reads that snapshot plus the
+    longest log it can have.
+    """
+    tmp = tempfile.mkdtemp(prefix="calculator-bench-")
+    records = changes(COMPACT_EVERY)
+    try:
+        for size in QUICK_HISTORY_SIZES if quick else HISTORY_SIZES:
+            base = os.path.join(tmp, f"base_{size}.json")
+            write_any(base, *make_semesters(size))
+            path = os.path.join(tmp, "gpa_data.json")
+
+            def open_store(base=base):
+                for leftover in (path, path + ".log"):
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
+                shutil.copyfile(base, path)
+                store = LogStore(path, fsync='never')
+                store.load()
+                return store
+
+            def save(store):
+                for record in records:
+                    store.append(record)
+                store.close()
+
+            yield "storage.save_data", {'history': size}, save, len(records), open_store
+
+            store = open_store()
+            for record in records[:-1]:
+                store.append(record)
+            store.close()
+            logged = os.path.join(tmp, f"logged_{size}.json")
+            shutil.copyfile(path, logged)
+            shutil.copyfile(path + ".log", logged + ".log")
+            yield "storage.load_data", {'history': size}, lambda p=logged: LogStore(p).load(), 1
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_export(quick):
+    tmp = tempfile.mkdtemp(prefix="calculator-bench-")
+    try:
+        for size in QUICK_EXPORT_SIZES if quick else EXPORT_SIZES:
+            semesters, current = make_semesters(size)
+            for fmt, extension in EXTENSIONS.items():
+                path = os.path.join(tmp, "report" + extension)
+                yield "export_report", {'courses': size, 'format': fmt}, \
+                    lambda p=path, f=fmt, s=semesters, c=current: export_report(p, s, c, f), 1
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+# UI
+
+def bench_tk(quick):
+    try:
+        import customtkinter as ctk
+        root = ctk.CTk()
+    except Exception as e:
+        raise Skip(f"no Tk display ({e})")
+    root.withdraw()
+    tmp = tempfile.mkdtemp(prefix="calculator-bench-")
+    try:
+        from scientific_calculator import ScientificCalculator
+
+        gpa = GPACalculator(root, database=os.path.join(tmp, "bench.db"))
+        root.update()
+        for size in QUICK_TABLE_SIZES if quick else TABLE_SIZES:
+            semesters, _ = make_semesters(size)
+            gpa.current_semester_courses = CourseTable.concatenate([s['courses'] for s in semesters])
+
+            def rebuild():
+                gpa.update_course_list()
+                root.update_idletasks()
+
+            yield "tk.update_course_list", {'courses': size}, rebuild, 1
+
+        calc = ScientificCalculator(root)
+        root.update()
+
+        def create_buttons():
+            # The new button frame is destroyed again, so that cost is included
+            before = set(calc.winfo_children())
+            calc.create_buttons()
+            root.update_idletasks()
+            for child in set(calc.winfo_children()) - before:
+                child.destroy()
+
+        yield "tk.create_buttons", {}, create_buttons, 1
+        calc.destroy()
+        gpa.destroy()
+    finally:
+        root.destroy()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+GROUPS = {
+    'engine': bench_engine,
+    'format': bench_format,
+    'gpa': bench_gpa,
+    'storage': bench_storage,
+    'export': bench_export,
+    'tk': bench_tk,
+}
+
+
+# Running and comparing
+
+def case_name(name, params):
+    if not params:
+        return name
+    return f"{name}[{','.join(f'{k}={v}' for k, v in params.items())}]"
+
+
+def measure(func, repeat, min_time, setup=None):
+    """Best seconds per call over repeat rounds of at least min_time each
+
+    With setup, every call is func(setup()) and only func is timed.
+    """
+    if setup is not None:
+        return measure_with_setup(func, setup, repeat, min_time)
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.2))
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        best = min(best, timer.timeit(number) / number)
+    return best, number
+
+
+def measure_with_setup(func, setup, repeat, min_time):
+    best = float('inf')
+    calls = 0
+    total = 0.0
+    while calls < repeat or total < min_time * repeat:
+        state = setup()
+        start = time.perf_counter()
+        func(state)
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+        calls += 1
+    return best, calls
+
+
+def run(groups, quick=False, repeat=3, min_time=0.2, out=sys.stdout):
+    """Run the groups and return the results document"""
+    results = {}
+    skipped = {}
+    for group in groups:
+        try:
+            for name, params, func, ops, *setup in GROUPS[group](quick):
+                seconds, number = measure(func, repeat, min_time, *setup)
+                key = case_name(name, params)
+                results[key] = {'group': group, 'params': params,
+                                'seconds': seconds / ops, 'ops': ops, 'number': number}
+                print(f"{key:<60}{format_seconds(seconds / ops):>12}", file=out, flush=True)
+        except Skip as e:
+            skipped[group] = str(e)
+            print(f"{group}: skipped, {e}", file=out, flush=True)
+    return {
+        'meta': {
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'quick': quick,
+            'repeat': repeat,
+        },
+        'results': results,
+        'skipped': skipped,
+    }
+
+
+def format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD, out=sys.stdout):
+    """Print cases present in both runs; returns the names slower by more than threshold"""
+    regressions = []
+    old = baseline['results']
+    new = current['results']
+    print(f"\n{'case':<60}{'baseline':>12}{'current':>12}{'change':>9}", file=out)
+    for key in new:
+        if key not in old:
+            continue
+        before = old[key]['seconds']
+        after = new[key]['seconds']
+        change = after / before - 1 if before > 0 else 0.0
+        mark = ""
+        if change > threshold:
+            regressions.append(key)
+            mark = "  REGRESSION"
+        print(f"{key:<60}{format_seconds(before):>12}{format_seconds(after):>12}"
+              f"{change:>+9.0%}{mark}", file=out)
+    missing = [key for key in old if key not in new]
+    if missing:
+        print(f"{len(missing)} baseline case(s) not run", file=out)
+    print(f"{len(regressions)} regression(s) past {threshold:.0%}", file=out)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=list(GROUPS), metavar="GROUP",
+                        help=f"groups to run (default: all of {', '.join(GROUPS)})")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes, for a fast check")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="seconds each timing round runs at least (default: 0.2)")
+    parser.add_argument("--output", metavar="PATH", help="save the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against saved results")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown flagged as a regression (default: 0.25, i.e. 25%%)")
+    parser.add_argument("--results", metavar="PATH",
+                        help="compare saved results instead of running (needs --baseline)")
+    args = parser.parse_args(argv)
+    if args.results and not args.baseline:
+        parser.error("--results needs --baseline")
+
+    baseline = None
+    if args.baseline:
+        try:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot read baseline {args.baseline}: {e}")
+
+    if args.results:
+        with open(args.results, 'r', encoding='utf-8') as f:
+            current = json.load(f)
+    else:
+        started = time.perf_counter()
+        current = run(args.only or list(GROUPS), args.quick, args.repeat, args.min_time)
+        print(f"{len(current['results'])} cases in {time.perf_counter() - started:.0f} s")
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(current, f, indent=2)
+
+    if baseline is not None:
+        return 1 if compare(baseline, current, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""
+Big Number Module
+Size-guarded factorials and integer powers with log-gamma approximations
+"""
+
+import math
+from functools import lru_cache
+
+
+# Exact results estimated above this many decimal digits are approximated instead
+EXACT_DIGITS_LIMIT = 5000
+# Integers with more digits than this are displayed in scientific notation
+DISPLAY_DIGITS = 30
+FACTORIAL_CACHE_SIZE = 128
+
+_LOG10_2 = math.log10(2)
+# Results below 10 ** _FLOAT_LOG10_MAX are returned as floats
+_FLOAT_LOG10_MAX = 308
+
+
+class LargeNumber:
+    """A magnitude too large to materialize, stored as sign * 10 ** log10_abs
+
+    Addition, subtraction, multiplication, division and comparisons are
+    done in log space and give a float again once the result fits one.
+    Anything else, such as a float function or %, raises OverflowError.
+    """
+
+    __slots__ = ('sign', 'log10_abs')
+
+    def __init__(self, sign, log10_abs):
+        self.sign = sign
+        self.log10_abs = log10_abs
+
+    @property
+    def exponent(self):
+        return math.floor(self.log10_abs)
+
+    @property
+    def mantissa(self):
+        return 10 ** (self.log10_abs - self.exponent)
+
+    def __float__(self):
+        raise OverflowError(f"{format_scientific(self)} is too large for this operation")
+
+    def __neg__(self):
+        return LargeNumber(-self.sign, self.log10_abs)
+
+    def __abs__(self):
+        return LargeNumber(1, self.log10_abs)
+
+    def __add__(self, other):
+        return _add(self, other)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return _add(self, -other)
+
+    def __rsub__(self, other):
+        return _add(-self, other)
+
+    def __mul__(self, other):
+        sign, log10_abs = _log_parts(other)
+        if sign == 0:
+            return 0.0
+        return from_log10(self.sign * sign, self.log10_abs + log10_abs)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        sign, log10_abs = _log_parts(other)
+        if sign == 0:
+            raise ZeroDivisionError("division by zero")
+        return from_log10(self.sign * sign, self.log10_abs - log10_abs)
+
+    def __rtruediv__(self, other):
+        sign, log10_abs = _log_parts(other)
+        if sign == 0:
+            return 0.0
+        return from_log10(self.sign * sign, log10_abs - self.log10_abs)
+
+    def __pow__(self, exponent):
+        # float() raises OverflowError for a LargeNumber exponent
+        exponent = float(exponent)
+        if exponent == 0:
+            return 1
+        sign = self.sign
+        if sign < 0:
+            if not exponent.is_integer():
+                raise ValueError("math domain error")
+            sign = -1 if int(exponent) % 2 else 1
+        return from_log10(sign, self.log10_abs * exponent)
+
+    def __mod__(self, other):
+        raise OverflowError(f"{format_scientific(self)} is too large for this operation")
+
+    __rmod__ = __rpow__ = __mod__
+
+    def __lt__(self, other):
+        return _compare(self, other) < 0
+
+    def __le__(self, other):
+        return _compare(self, other) <= 0
+
+    def __gt__(self, other):
+        return _compare(self, other) > 0
+
+    def __ge__(self, other):
+        return _compare(self, other) >= 0
+
+    def __repr__(self):
+        return f"LargeNumber({format_scientific(self)})"
+
+
+def from_log10(sign, log10_abs):
+    """sign * 10 ** log10_abs as a float if it fits one, else a LargeNumber"""
+    if log10_abs < _FLOAT_LOG10_MAX:
+        return math.copysign(10.0 ** log10_abs, sign)
+    return LargeNumber(sign, log10_abs)
+
+
+def _log_parts(value):
+    """(sign, log10 |value|) of a number or LargeNumber; sign is 0 for zero"""
+    if isinstance(value, LargeNumber):
+        return value.sign, value.log10_abs
+    if value == 0:
+        return 0, -math.inf
+    if isinstance(value, float) and not math.isfinite(value):
+        raise OverflowError("cannot combine an infinite value with a LargeNumber")
+    return (-1 if value < 0 else 1), math.log10(abs(value))
+
+
+def _add(a, b):
+    (sign_a, log_a), (sign_b, log_b) = _log_parts(a), _log_parts(b)
+    if log_a < log_b:
+        (sign_a, log_a), (sign_b, log_b) = (sign_b, log_b), (sign_a, log_a)
+    if sign_b == 0:
+        return from_log10(sign_a, log_a)
+    ratio = 10.0 ** (log_b - log_a)
+    scale = 1 + ratio if sign_a == sign_b else 1 - ratio
+    if scale == 0:
+        return 0.0
+    return from_log10(sign_a, log_a + math.log10(scale))
+
+
+def _compare(a, b):
+    (sign_a, log_a), (sign_b, log_b) = _log_parts(a), _log_parts(b)
+    if sign_a != sign_b:
+        return -1 if sign_a < sign_b else 1
+    if log_a == log_b:
+        return 0
+    return sign_a if log_a > log_b else -sign_a
+
+
+def set_exact_digits_limit(digits):
+    """Configure the estimated size above which approximations are used"""
+    global EXACT_DIGITS_LIMIT
+    EXACT_DIGITS_LIMIT = digits
+
+
+def factorial_digits(n):
+    """Estimate the number of decimal digits of n! via log-gamma"""
+    if n < 2:
+        return 1
+    return math.floor(math.lgamma(n + 1) / math.log(10)) + 1
+
+
+def power_digits(base, exponent):
+    """Estimate the number of decimal digits of base ** exponent"""
+    if base == 0 or exponent <= 0:
+        return 1
+    return math.floor(exponent * math.log10(abs(base))) + 1
+
+
+@lru_cache(maxsize=FACTORIAL_CACHE_SIZE)
+def exact_factorial(n):
+    """Exact n! with previously computed results cached"""
+    return math.factorial(n)
+
+
+def stirling_factorial(n):
+    """Approximate n! from the log-gamma function"""
+    return LargeNumber(1, math.lgamma(n + 1) / math.log(10))
+
+
+def factorial(value):
+    """n! for int(value), approximated beyond EXACT_DIGITS_LIMIT digits"""
+    n = int(value)
+    if n < 0:
+        raise ValueError("factorial() not defined for negative values")
+    if factorial_digits(n) > EXACT_DIGITS_LIMIT:
+        return stirling_factorial(n)
+    return exact_factorial(n)
+
+
+def power(base, exponent):
+    """base ** exponent, exact for integers and approximated when huge"""
+    if isinstance(base, LargeNumber) or isinstance(exponent, LargeNumber):
+        return base ** exponent
+    if _is_integral(base) and _is_integral(exponent) and exponent >= 0:
+        if power_digits(base, exponent) > EXACT_DIGITS_LIMIT:
+            sign = -1 if base < 0 and int(exponent) % 2 else 1
+            return LargeNumber(sign, exponent * math.log10(abs(base)))
+        return int(base) ** int(exponent)
+    if base < 0 and not _is_integral(exponent):
+        # Python would return a complex number
+        raise ValueError("math domain error")
+    try:
+        return base ** exponent
+    except OverflowError:
+        if base <= 0:
+            raise
+        log10_abs = exponent * math.log10(base)
+        if log10_abs < 0:
+            return 0.0
+        return LargeNumber(1, log10_abs)
+
+
+def _is_integral(value):
+    return isinstance(value, int) or (isinstance(value, float) and value.is_integer())
+
+
+def is_large(num):
+    """Check whether num should be shown in scientific notation"""
+    if isinstance(num, LargeNumber):
+        return True
+    if isinstance(num, int):
+        # bit_length avoids converting the integer to a decimal string
+        return num.bit_length() * _LOG10_2 > DISPLAY_DIGITS
+    if isinstance(num, float):
+        return math.isfinite(num) and abs(num) >= 10 ** DISPLAY_DIGITS
+    return False
+
+
+def format_scientific(num):
+    """Format a huge (or, as a LargeNumber, tiny) number as mantissa e+exponent"""
+    if isinstance(num, LargeNumber):
+        sign, log10_abs = num.sign, num.log10_abs
+    else:
+        sign = -1 if num < 0 else 1
+        log10_abs = math.log10(abs(num))
+    exponent = math.floor(log10_abs)
+    mantissa = round(10 ** (log10_abs - exponent), 10)
+    if mantissa >= 10:
+        mantissa /= 10
+        exponent += 1
+    digits = f"{mantissa:.10f}".rstrip('0').rstrip('.')
+    return f"{'-' if sign < 0 else ''}{digits}e{exponent:+d}"
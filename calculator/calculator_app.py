@@ -3,19 +3,45 @@ Scientific & GPA Calculator Application
 A modern dual-purpose calculator with beautiful UI
 """
 
+import time
+
+_START = time.perf_counter()
+
+import argparse
+import sys
+
 import customtkinter as ctk
-from scientific_calculator import ScientificCalculator
-from gpa_calculator import GPACalculator
+
+import metrics
+from storage import FSYNC_POLICIES
+from styles import get_font
+
+_IMPORTED = time.perf_counter()
 
 # Set appearance mode and color theme
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
 
+SCIENTIFIC_TAB = "Scientific Calculator"
+GPA_TAB = "GPA Calculator"
+
+
 class CalculatorApp(ctk.CTk):
-    def __init__(self):
+    def __init__(self, verify_gpa=False, fsync='interval', database=None, student=None,
+                 binary_snapshot=False, use_processes=False):
         super().__init__()
         
+        self.verify_gpa = verify_gpa
+        self.fsync = fsync
+        self.database = database
+        self.student = student
+        self.binary_snapshot = binary_snapshot
+        self.use_processes = use_processes
+        
+        # Startup milestones in seconds since the module started importing
+        self.milestones = {"import": _IMPORTED - _START}
+        
         # Configure window
         self.title("Scientific & GPA Calculator")
         self.geometry("900x700")
@@ -28,30 +54,37 @@ class CalculatorApp(ctk.CTk):
         # Create header
         self.create_header()
         
-        # Create tabview
-        self.tabview = ctk.CTkTabview(self, corner_radius=15)
+        # Create tabview; tab contents are built when first selected
+        self.tabview = ctk.CTkTabview(self, corner_radius=15, command=self.on_tab_selected)
         self.tabview.grid(row=1, column=0, padx=20, pady=(0, 20), sticky="nsew")
         
         # Add tabs
-        self.tabview.add("Scientific Calculator")
-        self.tabview.add("GPA Calculator")
+        self.tabview.add(SCIENTIFIC_TAB)
+        self.tabview.add(GPA_TAB)
         
         # Configure tab grid
-        self.tabview.tab("Scientific Calculator").grid_rowconfigure(0, weight=1)
-        self.tabview.tab("Scientific Calculator").grid_columnconfigure(0, weight=1)
-        self.tabview.tab("GPA Calculator").grid_rowconfigure(0, weight=1)
-        self.tabview.tab("GPA Calculator").grid_columnconfigure(0, weight=1)
-        
-        # Create calculator instances
-        self.scientific_calc = ScientificCalculator(self.tabview.tab("Scientific Calculator"))
-        self.scientific_calc.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+        self.tabview.tab(SCIENTIFIC_TAB).grid_rowconfigure(0, weight=1)
+        self.tabview.tab(SCIENTIFIC_TAB).grid_columnconfigure(0, weight=1)
+        self.tabview.tab(GPA_TAB).grid_rowconfigure(0, weight=1)
+        self.tabview.tab(GPA_TAB).grid_columnconfigure(0, weight=1)
         
-        self.gpa_calc = GPACalculator(self.tabview.tab("GPA Calculator"))
-        self.gpa_calc.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+        self.scientific_calc = None
+        self.gpa_calc = None
+        self.tab_builders = {
+            SCIENTIFIC_TAB: self.build_scientific_tab,
+            GPA_TAB: self.build_gpa_tab,
+        }
         
         # Set default tab
-        self.tabview.set("Scientific Calculator")
+        self.tabview.set(SCIENTIFIC_TAB)
+        self.on_tab_selected()
+        
+        # With metrics on, F9 profiles everything between two presses
+        if metrics.enabled():
+            self.bind("<F9>", self.toggle_profile)
         
+        self.milestones["construction"] = time.perf_counter() - _START
+    
     def create_header(self):
         """Create the application header"""
         header_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -61,7 +94,7 @@ class CalculatorApp(ctk.CTk):
         title = ctk.CTkLabel(
             header_frame,
             text="🧮 Advanced Calculator Suite",
-            font=ctk.CTkFont(size=28, weight="bold")
+            font=get_font(28, "bold")
         )
         title.pack(side="left")
         
@@ -69,16 +102,152 @@ class CalculatorApp(ctk.CTk):
         subtitle = ctk.CTkLabel(
             header_frame,
             text="Scientific & GPA Calculations Made Beautiful",
-            font=ctk.CTkFont(size=14),
+            font=get_font(14),
             text_color=("gray60", "gray40")
         )
         subtitle.pack(side="left", padx=15)
+    
+    def on_tab_selected(self):
+        """Build the selected tab's contents the first time it is shown"""
+        builder = self.tab_builders.pop(self.tabview.get(), None)
+        if builder is not None:
+            builder()
+    
+    def build_scientific_tab(self):
+        """Create the scientific calculator"""
+        from scientific_calculator import ScientificCalculator
+        
+        self.scientific_calc = ScientificCalculator(self.tabview.tab(SCIENTIFIC_TAB),
+                                                    use_processes=self.use_processes)
+        self.scientific_calc.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+    
+    def build_gpa_tab(self):
+        """Create the GPA calculator"""
+        from gpa_calculator import GPACalculator
+        
+        self.gpa_calc = GPACalculator(
+            self.tabview.tab(GPA_TAB), verify_totals=self.verify_gpa, fsync=self.fsync,
+            database=self.database, student=self.student or "default",
+            binary_snapshot=self.binary_snapshot
+        )
+        self.gpa_calc.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+    
+    def toggle_profile(self, event=None):
+        """Start cProfile, or stop it and print the slowest calls"""
+        report = metrics.toggle_profile()
+        if report is None:
+            print("Profiling; press F9 again to stop", file=sys.stderr)
+        else:
+            print(f"Profile saved to {metrics.PROFILE_FILE}\n{report}", file=sys.stderr)
+    
+    def report_startup(self, quit_after=True):
+        """Print startup milestones once the first frame has been drawn"""
+        def first_paint():
+            self.update_idletasks()
+            self.milestones["first_paint"] = time.perf_counter() - _START
+            for name, seconds in self.milestones.items():
+                print(f"{name:<14}{seconds * 1000:8.1f} ms", file=sys.stderr)
+            if quit_after:
+                self.destroy()
+        
+        def on_map(event):
+            if event.widget is self and "first_paint" not in self.milestones:
+                self.milestones["first_paint"] = None
+                self.after_idle(first_paint)
+        
+        self.bind("<Map>", on_map, add="+")
 
 
-def main():
+def main(argv=None):
     """Main application entry point"""
-    app = CalculatorApp()
+    parser = argparse.ArgumentParser(description="Scientific & GPA Calculator")
+    parser.add_argument(
+        "--startup-timing", action="store_true",
+        help="print import, construction and first-paint times, then exit"
+    )
+    parser.add_argument(
+        "--verify-gpa", action="store_true",
+        help="cross-check incremental GPA totals against a full recompute on every update"
+    )
+    parser.add_argument(
+        "--fsync", choices=FSYNC_POLICIES, default="interval",
+        help="when to fsync the GPA change log: every change, at most once a second, or never"
+    )
+    parser.add_argument(
+        "--database", metavar="PATH",
+        help="keep GPA data in a SQLite database shared by several students instead of gpa_data.json"
+    )
+    parser.add_argument(
+        "--student", default="default",
+        help="student whose GPA data is shown when using --database (default: default)"
+    )
+    parser.add_argument(
+        "--binary-snapshot", action="store_true",
+        help="compact GPA data into the binary gpa_data.gpab instead of gpa_data.json"
+    )
+    parser.add_argument(
+        "--process-pool", action="store_true",
+        help="evaluate slow calculations in a worker process instead of a thread"
+    )
+    parser.add_argument(
+        "--grade-scheme", metavar="PATH",
+        help="JSON file with the letter grades and marks bands to use instead of the 4.0 scale"
+    )
+    parser.add_argument(
+        "--memo-cache", type=int, default=0, metavar="SIZE",
+        help="memoize up to SIZE scientific function results (default: off)"
+    )
+    parser.add_argument(
+        "--memo-policy", choices=("lru", "lfu"), default="lru",
+        help="which result the memo cache evicts first (default: lru)"
+    )
+    parser.add_argument(
+        "--metrics", action="store_true",
+        help="time hot paths into latency histograms; F9 starts/stops cProfile"
+    )
+    parser.add_argument(
+        "--metrics-json", metavar="PATH",
+        help="write the latency histograms to PATH on exit (implies --metrics)"
+    )
+    parser.add_argument(
+        "--metrics-port", type=int, metavar="PORT",
+        help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics (implies --metrics)"
+    )
+    args = parser.parse_args(argv)
+    
+    if args.metrics or args.metrics_json or args.metrics_port is not None:
+        metrics.enable()
+    if args.metrics_port is not None:
+        try:
+            metrics.serve(args.metrics_port)
+        except OSError as e:
+            parser.error(f"cannot serve metrics on port {args.metrics_port}: {e}")
+    
+    if args.memo_cache < 0:
+        parser.error("--memo-cache must not be negative")
+    if args.memo_cache:
+        import memo
+        memo.enable(args.memo_cache, args.memo_policy)
+    
+    if args.grade_scheme:
+        from grade_scheme import load_scheme, use_scheme
+        try:
+            use_scheme(load_scheme(args.grade_scheme))
+        except (OSError, ValueError, KeyError) as e:
+            parser.error(f"cannot load grade scheme {args.grade_scheme}: {e}")
+    
+    app = CalculatorApp(verify_gpa=args.verify_gpa, fsync=args.fsync,
+                        database=args.database, student=args.student,
+                        binary_snapshot=args.binary_snapshot, use_processes=args.process_pool)
+    if args.startup_timing:
+        app.report_startup()
     app.mainloop()
+    
+    if args.metrics_json:
+        try:
+            metrics.write_json(args.metrics_json)
+        except OSError as e:
+            print(f"Error writing metrics: {e}", file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,152 @@
+"""
+Command Line Module
+Evaluates expressions from arguments, files or stdin without loading the GUI
+
+    python -m calculator "2(3+4)^2" "sin(30)" -2+3
+    python -m calculator -f formulas.txt --format csv
+    cat formulas.txt | python -m calculator --format jsonl
+    python -m calculator -f formulas.txt --memo-cache 4096
+"""
+
+import argparse
+import csv
+import json
+import sys
+
+import memo
+from backends import BACKENDS, get_backend
+from engine import DIV_BY_ZERO, ERROR, evaluate_expression
+from expression import ExpressionError, normalize, tokenize
+
+
+def evaluate_line(text, angle_mode="deg", backend=None):
+    """Evaluate one expression, returning (display text, error or None)"""
+    backend = backend or get_backend('float')
+    try:
+        return backend.format(evaluate_expression(text, angle_mode, backend)), None
+    except ZeroDivisionError as e:
+        return DIV_BY_ZERO, str(e)
+    except Exception as e:
+        return ERROR, str(e)
+
+
+def read_expressions(args):
+    """Yield expressions from arguments, a file or stdin, skipping blanks and comments"""
+    if args.expressions:
+        lines = args.expressions
+    elif args.file and args.file != '-':
+        lines = open(args.file, 'r', encoding='utf-8')
+    else:
+        lines = sys.stdin
+
+    try:
+        for line in lines:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+    finally:
+        if hasattr(lines, 'close') and lines is not sys.stdin:
+            lines.close()
+
+
+class TextWriter:
+    def __init__(self, out):
+        self.out = out
+
+    def write(self, text, result, error):
+        self.out.write(result + "\n")
+
+
+class CsvWriter:
+    def __init__(self, out):
+        self.writer = csv.writer(out, lineterminator="\n")
+        self.writer.writerow(["expression", "result", "error"])
+
+    def write(self, text, result, error):
+        self.writer.writerow([text, result, error or ""])
+
+
+class JsonLinesWriter:
+    def __init__(self, out):
+        self.out = out
+
+    def write(self, text, result, error):
+        record = {"expression": text, "result": result}
+        if error is not None:
+            record["error"] = error
+        self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+WRITERS = {'text': TextWriter, 'csv': CsvWriter, 'jsonl': JsonLinesWriter}
+
+
+def shield_expressions(argv):
+    """argv with arguments like -2+3 or -sin(30) kept from being read as options
+
+    An argument starting with a single "-" that tokenizes as an expression
+    gets a leading space, which argparse does not treat as an option
+    prefix and evaluation ignores. Others, such as -f, stay options.
+    """
+    shielded = []
+    for arg in argv:
+        if arg.startswith("-") and not arg.startswith("--") and len(arg) > 1:
+            try:
+                tokenize(normalize(arg))
+                arg = " " + arg
+            except ExpressionError:
+                pass
+        shielded.append(arg)
+    return shielded
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m calculator",
+        description="Evaluate calculator expressions without starting the GUI."
+    )
+    parser.add_argument("expressions", nargs="*",
+                        help="expressions to evaluate, which may start with '-' as in -2+3 "
+                             "(default: read from --file or stdin)")
+    parser.add_argument("-f", "--file",
+                        help="read one expression per line from FILE ('-' for stdin)")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="text",
+                        help="output format (default: text)")
+    parser.add_argument("--angle", choices=("deg", "rad"), default="deg",
+                        help="angle mode for trigonometric functions (default: deg)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="float",
+                        help="numeric backend (default: float)")
+    parser.add_argument("--precision", type=int,
+                        help="significant digits for the decimal/fraction backends")
+    parser.add_argument("--memo-cache", type=int, default=0, metavar="SIZE",
+                        help="memoize up to SIZE scientific function results "
+                             "and print the cache counters to stderr (default: off)")
+    parser.add_argument("--memo-policy", choices=sorted(memo.POLICIES), default="lru",
+                        help="which result the memo cache evicts first (default: lru)")
+    return parser
+
+
+def main(argv=None):
+    """Run the CLI; returns 1 if any expression failed, else 0"""
+    parser = build_parser()
+    args = parser.parse_args(shield_expressions(sys.argv[1:] if argv is None else argv))
+    if args.memo_cache < 0:
+        parser.error("--memo-cache must not be negative")
+    if args.memo_cache:
+        memo.enable(args.memo_cache, args.memo_policy)
+    backend = get_backend(args.backend, args.precision)
+    out = sys.stdout
+    writer = WRITERS[args.format](out)
+
+    failed = False
+    for text in read_expressions(args):
+        result, error = evaluate_line(text, args.angle, backend)
+        failed = failed or error is not None
+        writer.write(text, result, error)
+    out.flush()
+    if args.memo_cache:
+        print(memo.cache_info(), file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
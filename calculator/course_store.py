@@ -0,0 +1,278 @@
+"""
+Course Store Module
+Columnar course storage: typed NumPy arrays per semester with vectorized GPA math
+"""
+
+import numpy as np
+
+# Letter grades and points of the active grade scheme
+from grade_scheme import GRADE_CODES, GRADE_POINTS, GRADE_SCALE, GRADES, resolve_grade
+
+INITIAL_CAPACITY = 8
+
+
+class NamePool:
+    """Interned course names shared by every table
+
+    Tables store a uint32 id per course, so a name repeated across many
+    students or semesters is kept in memory once.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+    def intern(self, name):
+        name_id = self.ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.ids[name] = name_id
+            self.names.append(name)
+        return name_id
+
+    def __getitem__(self, name_id):
+        return self.names[name_id]
+
+    def __len__(self):
+        return len(self.names)
+
+
+NAMES = NamePool()
+
+
+class CourseTable:
+    """Courses of one semester as parallel typed columns
+
+    Columns are name ids (uint32 into NAMES), credits (float64) and grade
+    codes (uint8 into GRADES); grade points are looked up from the codes
+    in the active grade scheme, so they follow a scheme change.
+    A course takes 13 bytes plus its share of the interned names, and
+    totals, GPA and grade histograms are single NumPy reductions.
+
+    Individual courses are exchanged as the familiar dicts
+    {'name', 'credits', 'grade', 'points'}, so table[i] and iteration
+    behave like the list of dicts this replaces.
+    """
+
+    __slots__ = ('_name_ids', '_credits', '_grades', '_size')
+
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self._name_ids = np.empty(capacity, dtype=np.uint32)
+        self._credits = np.empty(capacity, dtype=np.float64)
+        self._grades = np.empty(capacity, dtype=np.uint8)
+        self._size = 0
+
+    @classmethod
+    def from_dicts(cls, courses):
+        """Build a table from course dicts, e.g. loaded from JSON"""
+        courses = list(courses)
+        table = cls(max(len(courses), INITIAL_CAPACITY))
+        for course in courses:
+            table.append(course['name'], course['credits'], course['grade'], course.get('points'))
+        return table
+
+    @classmethod
+    def from_columns(cls, names, credits, grades):
+        """Build a table from parallel sequences of names, credits and grade letters"""
+        table = cls(0)
+        table.extend(names, credits, grades)
+        return table
+
+    @classmethod
+    def from_arrays(cls, name_ids, credits, grade_codes, copy=True):
+        """Build a table from column arrays; name_ids must be ids in NAMES
+
+        With copy=False the table uses the arrays (e.g. slices of one large
+        array) directly; appending reallocates, so the caller's data is
+        never overwritten beyond the table's own rows.
+        """
+        convert = np.array if copy else np.asarray
+        table = cls.__new__(cls)
+        table._name_ids = convert(name_ids, dtype=np.uint32)
+        table._credits = convert(credits, dtype=np.float64)
+        table._grades = convert(grade_codes, dtype=np.uint8)
+        table._size = len(table._credits)
+        return table
+
+    @classmethod
+    def concatenate(cls, tables):
+        """One table holding the courses of several tables, e.g. all semesters"""
+        tables = list(tables)
+        table = cls(0)
+        table._name_ids = np.concatenate([t.name_ids for t in tables] or [table._name_ids])
+        table._credits = np.concatenate([t.credits for t in tables] or [table._credits])
+        table._grades = np.concatenate([t.grade_codes for t in tables] or [table._grades])
+        table._size = len(table._credits)
+        return table
+
+    # Columns (read-only views of the used part of each array)
+
+    @property
+    def name_ids(self):
+        return self._view(self._name_ids)
+
+    @property
+    def credits(self):
+        return self._view(self._credits)
+
+    @property
+    def grade_codes(self):
+        return self._view(self._grades)
+
+    @property
+    def points(self):
+        return GRADE_POINTS[self.grade_codes]
+
+    def _view(self, column):
+        view = column[:self._size]
+        view.flags.writeable = False
+        return view
+
+    # Editing
+
+    def _reserve(self, count):
+        needed = self._size + count
+        capacity = len(self._credits)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, INITIAL_CAPACITY)
+        for attr in ('_name_ids', '_credits', '_grades'):
+            old = getattr(self, attr)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, attr, new)
+
+    def append(self, name, credits, grade, points=None):
+        """Add a course; grade is a letter of the active grade scheme
+
+        A letter from another scheme, e.g. in saved data, is mapped to an
+        active one by its stored points (see resolve_grade).
+        """
+        code = GRADE_CODES.get(grade)
+        if code is None:
+            code = resolve_grade(grade, points)
+        self._reserve(1)
+        i = self._size
+        self._name_ids[i] = NAMES.intern(name)
+        self._credits[i] = credits
+        self._grades[i] = code
+        self._size += 1
+
+    def extend(self, names, credits, grades):
+        """Add many courses at once from parallel sequences"""
+        credits = np.asarray(credits, dtype=np.float64)
+        try:
+            codes = np.fromiter((GRADE_CODES[g] for g in grades), dtype=np.uint8,
+                                count=len(credits))
+        except KeyError as e:
+            raise ValueError(f"Unknown grade: {e.args[0]}") from None
+        self.extend_codes(names, credits, codes)
+
+    def extend_codes(self, names, credits, grade_codes):
+        """Add many courses whose grades are already codes, e.g. converted from marks"""
+        credits = np.asarray(credits, dtype=np.float64)
+        codes = np.asarray(grade_codes, dtype=np.uint8)
+        name_ids = np.fromiter((NAMES.intern(n) for n in names), dtype=np.uint32,
+                               count=len(credits))
+        count = len(credits)
+        self._reserve(count)
+        end = self._size + count
+        self._name_ids[self._size:end] = name_ids
+        self._credits[self._size:end] = credits
+        self._grades[self._size:end] = codes
+        self._size = end
+
+    def pop(self, index=-1):
+        """Remove a course and return it as a dict"""
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("course index out of range")
+        course = self[index]
+        for column in (self._name_ids, self._credits, self._grades):
+            column[index:self._size - 1] = column[index + 1:self._size]
+        self._size -= 1
+        return course
+
+    def clear(self):
+        self._size = 0
+
+    def copy(self):
+        table = CourseTable(0)
+        table._name_ids = self._name_ids[:self._size].copy()
+        table._credits = self._credits[:self._size].copy()
+        table._grades = self._grades[:self._size].copy()
+        table._size = self._size
+        return table
+
+    # Access
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("course index out of range")
+        code = self._grades[index]
+        return {
+            'name': NAMES[self._name_ids[index]],
+            'credits': float(self._credits[index]),
+            'grade': GRADES[code],
+            'points': float(GRADE_POINTS[code])
+        }
+
+    def __iter__(self):
+        for i in range(self._size):
+            yield self[i]
+
+    def records(self):
+        """Yield (name, credits, grade, points) tuples without building dicts"""
+        names = NAMES.names
+        for name_id, credits, code, points in zip(self.name_ids.tolist(), self.credits.tolist(),
+                                                  self.grade_codes.tolist(), self.points.tolist()):
+            yield names[name_id], credits, GRADES[code], points
+
+    def to_dicts(self):
+        return list(self)
+
+    # Aggregates
+
+    def total_credits(self):
+        return float(self.credits.sum())
+
+    def quality_points(self):
+        return float(np.dot(self.credits, self.points))
+
+    def gpa(self):
+        credits = self.total_credits()
+        return self.quality_points() / credits if credits > 0 else 0.0
+
+    def grade_histogram(self):
+        """Number of courses per grade letter, in GRADE_SCALE order"""
+        counts = np.bincount(self.grade_codes, minlength=len(GRADES)).tolist()
+        return {grade: counts[GRADE_CODES[grade]] for grade in GRADE_SCALE}
+
+    def __repr__(self):
+        return f"CourseTable({self._size} courses, {self.total_credits()} credits)"
+
+
+def semesters_to_data(semesters, current_courses):
+    """JSON-ready dict in the gpa_data.json layout"""
+    return {
+        'semesters': [{'name': s['name'], 'courses': s['courses'].to_dicts()} for s in semesters],
+        'current_courses': current_courses.to_dicts()
+    }
+
+
+def semesters_from_data(data):
+    """Inverse of semesters_to_data: (semesters, current course table)"""
+    semesters = [
+        {'name': s['name'], 'courses': CourseTable.from_dicts(s['courses'])}
+        for s in data.get('semesters', [])
+    ]
+    return semesters, CourseTable.from_dicts(data.get('current_courses', []))
@@ -0,0 +1,288 @@
+"""
+CSV Import Module
+Streams course rows from GPA_Calculator_Data.csv-style files into semesters
+
+Each semester block is a header row, course rows and footer summary rows:
+
+    Sr#,Course,Cr Hours,Marks,Course GPA,Points
+    1,DS,4,89,4,16.0
+    ,T_Cr_hours,18,,Total_Points,57.1
+    ,GPA,,,,3.17
+    ,Pre_GPA,,,,3.0
+    ,Pre_cr_h,,,,18.0
+    ,CGPA,,,,3.09
+    ,Percentage,,,,72.8
+
+Grade points come from the marks through the active grade scheme's
+bands (see grade_scheme); the Course GPA/Points columns and the footer
+rows are only used as checksums.
+"""
+
+import csv
+import math
+import os
+import sys
+
+from course_store import CourseTable
+from grade_scheme import current_scheme
+
+
+HEADER = ("Sr#", "Course", "Cr Hours", "Marks", "Course GPA", "Points")
+FOOTER_LABELS = ("T_Cr_hours", "GPA", "Pre_GPA", "Pre_cr_h", "CGPA", "Percentage")
+
+# Course rows are buffered and appended to the semester's table in chunks
+CHUNK_SIZE = 10000
+
+
+def marks_to_points(marks):
+    """Grade points for a mark out of 100 in the active grade scheme"""
+    return current_scheme().points_for_marks(marks)
+
+
+def marks_to_grade(marks):
+    """Letter grade for a mark out of 100 in the active grade scheme"""
+    return current_scheme().grade_for_marks(marks)
+
+
+class RowError:
+    """A problem with one CSV line; skipped rows were not imported"""
+
+    __slots__ = ('line', 'message', 'row', 'skipped')
+
+    def __init__(self, line, message, row, skipped=True):
+        self.line = line
+        self.message = message
+        self.row = row
+        self.skipped = skipped
+
+    def __str__(self):
+        action = "skipped" if self.skipped else "imported"
+        return f"line {self.line}: {self.message} ({action})"
+
+
+class Checksum:
+    """A footer value compared with the value computed from the imported rows"""
+
+    __slots__ = ('semester', 'label', 'expected', 'computed', 'ok')
+
+    def __init__(self, semester, label, expected, computed, ok):
+        self.semester = semester
+        self.label = label
+        self.expected = expected
+        self.computed = computed
+        self.ok = ok
+
+    def __str__(self):
+        status = "ok" if self.ok else "MISMATCH"
+        return f"{self.semester} {self.label}: file {self.expected}, computed {self.computed:.4g} ({status})"
+
+
+class ImportReport:
+    """Row errors and footer checksums collected during an import"""
+
+    def __init__(self):
+        self.rows_read = 0
+        self.courses_imported = 0
+        self.errors = []
+        self.checksums = []
+
+    @property
+    def failed_checksums(self):
+        return [c for c in self.checksums if not c.ok]
+
+    def summary(self):
+        return (f"{self.courses_imported} courses imported from {self.rows_read} rows, "
+                f"{sum(e.skipped for e in self.errors)} skipped, "
+                f"{len(self.failed_checksums)}/{len(self.checksums)} checksums failed")
+
+
+class _SemesterBuilder:
+    """Accumulates one semester's rows and checks its footer"""
+
+    def __init__(self, name, chunk_size):
+        self.name = name
+        self.chunk_size = chunk_size
+        self.table = CourseTable()
+        self.names = []
+        self.credits = []
+        self.marks = []
+        self.total_credits = 0.0
+        self.total_points = 0.0
+        self.total_marks = 0.0
+        self.count = 0
+        self.footer = {}
+
+    def add(self, name, credits, marks, points):
+        self.names.append(name)
+        self.credits.append(credits)
+        self.marks.append(marks)
+        self.total_credits += credits
+        self.total_points += credits * points
+        self.total_marks += marks
+        self.count += 1
+        if len(self.names) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self.names:
+            # Letter grades for the whole chunk in one vectorized lookup
+            codes = current_scheme().grade_codes_for_marks(self.marks)
+            self.table.extend_codes(self.names, self.credits, codes)
+            self.names, self.credits, self.marks = [], [], []
+
+    def finish(self, report):
+        """Flush buffered rows, verify the footer and return the semester dict"""
+        self.flush()
+        computed = {}
+        if self.total_credits > 0:
+            computed['T_Cr_hours'] = self.total_credits
+            computed['Total_Points'] = self.total_points
+            computed['GPA'] = self.total_points / self.total_credits
+        if self.count:
+            computed['Percentage'] = self.total_marks / self.count
+        pre_gpa = _value(self.footer.get('Pre_GPA'))
+        pre_credits = _value(self.footer.get('Pre_cr_h'))
+        if pre_gpa is not None and pre_credits is not None and self.total_credits + pre_credits > 0:
+            computed['CGPA'] = ((self.total_points + pre_gpa * pre_credits)
+                                / (self.total_credits + pre_credits))
+
+        for label, text in self.footer.items():
+            if label in computed:
+                expected = _value(text)
+                ok = expected is not None and _close(expected, computed[label], text)
+                report.checksums.append(Checksum(self.name, label, text, computed[label], ok))
+        return {'name': self.name, 'courses': self.table}
+
+
+def _value(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def _close(expected, computed, text):
+    """Compare allowing for the rounding of the value as written in the file"""
+    decimals = len(text.split('.', 1)[1]) if '.' in text else 0
+    return math.isclose(expected, computed, abs_tol=0.5 * 10 ** -decimals + 1e-9)
+
+
+def iter_semesters(lines, name="Imported", report=None, chunk_size=CHUNK_SIZE):
+    """Yield semester dicts from CSV lines as each semester's footer ends
+
+    lines can be an open file or any iterable of strings; nothing is read
+    ahead beyond the current row. Problems are recorded in report.
+    """
+    report = report if report is not None else ImportReport()
+    builder = None
+    in_footer = False
+    semester_count = 0
+
+    def new_builder():
+        nonlocal semester_count
+        semester_count += 1
+        label = name if semester_count == 1 else f"{name} ({semester_count})"
+        return _SemesterBuilder(label, chunk_size)
+
+    reader = csv.reader(lines)
+    for row in reader:
+        line = reader.line_num
+        cells = [cell.strip() for cell in row]
+        if not any(cells):
+            continue
+        if cells[0] == HEADER[0]:
+            continue
+
+        if not cells[0] and len(cells) > 1 and cells[1] in FOOTER_LABELS:
+            if builder is None:
+                report.errors.append(RowError(line, "summary row before any course", row))
+                continue
+            in_footer = True
+            if cells[1] == 'T_Cr_hours':
+                builder.footer['T_Cr_hours'] = cells[2] if len(cells) > 2 else ""
+                if len(cells) > 5 and cells[4] == 'Total_Points':
+                    builder.footer['Total_Points'] = cells[5]
+            else:
+                builder.footer[cells[1]] = next((c for c in reversed(cells[2:]) if c), "")
+            continue
+
+        report.rows_read += 1
+        course = _parse_course(cells, line, row, report)
+        if course is None:
+            continue
+        if builder is None or in_footer:
+            if builder is not None:
+                yield builder.finish(report)
+            builder = new_builder()
+            in_footer = False
+        builder.add(*course)
+        report.courses_imported += 1
+
+    if builder is not None:
+        yield builder.finish(report)
+
+
+def _parse_course(cells, line, row, report):
+    """Validate a course row, returning (name, credits, marks, points) or None"""
+    if len(cells) < 4:
+        report.errors.append(RowError(line, f"expected at least 4 columns, got {len(cells)}", row))
+        return None
+    if not cells[1]:
+        report.errors.append(RowError(line, "missing course name", row))
+        return None
+    try:
+        credits = float(cells[2])
+        marks = float(cells[3])
+    except ValueError:
+        report.errors.append(RowError(line, "credit hours and marks must be numbers", row))
+        return None
+    if not (math.isfinite(credits) and credits > 0):
+        report.errors.append(RowError(line, f"credit hours must be a positive number, got {cells[2]}", row))
+        return None
+    if not 0 <= marks <= 100:
+        report.errors.append(RowError(line, f"marks must be between 0 and 100, got {cells[3]}", row))
+        return None
+
+    points = marks_to_points(marks)
+    listed_gpa = _value(cells[4]) if len(cells) > 4 and cells[4] else None
+    listed_points = _value(cells[5]) if len(cells) > 5 and cells[5] else None
+    if listed_gpa is not None and not math.isclose(listed_gpa, points, abs_tol=0.05):
+        report.errors.append(RowError(
+            line, f"Course GPA {cells[4]} does not match {points} for {cells[3]} marks", row, skipped=False
+        ))
+    elif listed_points is not None and not math.isclose(listed_points, credits * points, abs_tol=0.05):
+        report.errors.append(RowError(
+            line, f"Points {cells[5]} does not match {credits * points:.1f}", row, skipped=False
+        ))
+    return cells[1], credits, marks, points
+
+
+def import_csv(filename, name=None, chunk_size=CHUNK_SIZE):
+    """Import a CSV file, returning (list of semester dicts, ImportReport)"""
+    if name is None:
+        name = os.path.splitext(os.path.basename(filename))[0]
+    report = ImportReport()
+    with open(filename, 'r', newline='', encoding='utf-8-sig') as f:
+        semesters = list(iter_semesters(f, name, report, chunk_size))
+    return semesters, report
+
+
+def main(argv=None):
+    """Check CSV files and print each import report; returns 1 on any problem"""
+    argv = sys.argv[1:] if argv is None else argv
+    failed = False
+    for filename in argv:
+        semesters, report = import_csv(filename)
+        print(f"{filename}: {report.summary()}")
+        for semester in semesters:
+            courses = semester['courses']
+            print(f"  {semester['name']}: {len(courses)} courses, "
+                  f"{courses.total_credits():g} credits, GPA {courses.gpa():.2f}")
+        for item in report.errors + report.checksums:
+            print(f"  {item}")
+        failed = failed or bool(report.errors or report.failed_checksums)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+Calculator Engine Module
+Headless evaluation core shared by the scientific calculator UI and batch callers
+"""
+
+import copy
+
+import metrics
+from operations import CONSTANTS
+from backends import FLOAT, get_backend
+import expression
+
+
+ERROR = "Error"
+DIV_BY_ZERO = "Error: Div by 0"
+
+
+def evaluate_expression(text, angle_mode="deg", backend=None):
+    """Evaluate typed input, closing any parentheses left open"""
+    missing = text.count('(') - text.count(')')
+    if missing > 0:
+        text += ')' * missing
+    return expression.evaluate(text, angle_mode, backend)
+
+
+def run_engine(engine, method, *args):
+    """Apply an engine method to a (copied) engine and return it
+
+    Module-level so a snapshot can be evaluated in a worker process.
+    """
+    getattr(engine, method)(*args)
+    return engine
+
+
+class CalculatorEngine:
+    """Keypress-driven calculator state machine without any UI dependency"""
+
+    def __init__(self, angle_mode="deg", backend=None):
+        self.backend = backend or FLOAT
+        self.current_value = "0"
+        self.previous_value = ""
+        self.operation = None
+        self.new_number = True
+        self.memory = 0
+        self.angle_mode = angle_mode  # deg or rad
+        self.history_text = ""
+        # (expression, result, angle mode) of the latest evaluation, until taken
+        self.last_evaluation = None
+
+    def snapshot(self):
+        """Return an independent copy of the engine state"""
+        return copy.copy(self)
+
+    def restore(self, other):
+        """Adopt the state of another engine, e.g. one computed in the background"""
+        self.__dict__.update(other.__dict__)
+
+    def set_angle_mode(self, mode):
+        """Switch between degrees and radians"""
+        if mode not in ('deg', 'rad'):
+            raise ValueError(f"Unknown angle mode: {mode}")
+        self.angle_mode = mode
+
+    def set_backend(self, backend, precision=None):
+        """Switch numeric backend by instance or name ('float', 'decimal', 'fraction')"""
+        if isinstance(backend, str):
+            backend = get_backend(backend, precision)
+        self.memory = backend.coerce(self.memory)
+        self.backend = backend
+
+    def format(self, value):
+        """Format a number with the active backend"""
+        return self.backend.format(value)
+
+    def record(self, expression):
+        """Remember an evaluation and the value it left on the display"""
+        self.last_evaluation = (expression, self.current_value, self.angle_mode)
+
+    def take_evaluation(self):
+        """Return and forget the latest evaluation (None if there was none)"""
+        evaluation, self.last_evaluation = self.last_evaluation, None
+        return evaluation
+
+    def set_error(self, message=ERROR):
+        """Show an error message as the current value"""
+        metrics.increment("errors", message)
+        self.current_value = message
+        self.new_number = True
+
+    def number_pressed(self, number):
+        """Handle number input"""
+        if self.new_number:
+            self.current_value = number
+            self.new_number = False
+        else:
+            if self.current_value == "0":
+                self.current_value = number
+            else:
+                self.current_value += number
+
+    def decimal_pressed(self):
+        """Handle decimal point"""
+        if '.' not in self.current_value:
+            if self.new_number:
+                self.current_value = "0."
+                self.new_number = False
+            else:
+                self.current_value += '.'
+
+    def operation_pressed(self, op):
+        """Handle binary operation input"""
+        if self.operation and not self.new_number:
+            self.equals_pressed()
+
+        self.previous_value = self.current_value
+        self.operation = op
+        self.new_number = True
+        self.history_text = f"{self.current_value} {self.operation}"
+
+    def current_number(self):
+        """Return the numeric value of the current input"""
+        try:
+            return self.backend.parse(self.current_value)
+        except ValueError:
+            return evaluate_expression(self.current_value, self.angle_mode, self.backend)
+
+    def pending_result(self):
+        """Compute the result of the pending operation"""
+        try:
+            prev = self.backend.parse(self.previous_value)
+            current = self.backend.parse(self.current_value)
+        except ValueError:
+            # Parenthesised input: evaluate the whole typed expression
+            return evaluate_expression(
+                self.previous_value + self.operation + self.current_value,
+                self.angle_mode, self.backend
+            )
+        return self.backend.binary(self.operation, prev, current)
+
+    @metrics.timed("equals_pressed", lambda self: self.operation or "expression")
+    def equals_pressed(self):
+        """Calculate the pending operation or typed expression"""
+        if not self.operation:
+            if '(' in self.current_value or ')' in self.current_value:
+                self.evaluate(self.current_value)
+            return
+
+        expression = f"{self.previous_value} {self.operation} {self.current_value}"
+        try:
+            result = self.pending_result()
+        except ZeroDivisionError:
+            if self.operation == '/':
+                self.set_error(DIV_BY_ZERO)
+            else:
+                self.set_error()
+            self.record(expression)
+            return
+        except Exception:
+            self.set_error()
+            self.record(expression)
+            return
+
+        self.current_value = self.format(result)
+        self.operation = None
+        self.new_number = True
+        self.history_text = ""
+        self.record(expression)
+
+    def evaluate(self, text):
+        """Evaluate a whole typed expression, show the result and return it"""
+        try:
+            self.current_value = self.format(evaluate_expression(text, self.angle_mode, self.backend))
+            self.new_number = True
+        except ZeroDivisionError:
+            self.set_error(DIV_BY_ZERO)
+        except Exception:
+            self.set_error()
+        self.record(text)
+        return self.current_value
+
+    @metrics.timed("scientific_function", lambda self, func: func)
+    def scientific_function(self, func):
+        """Apply a scientific function to the current value"""
+        expression = f"{func}({self.current_value})"
+        try:
+            result = self.backend.scientific(func, self.current_number(), self.angle_mode)
+            self.current_value = self.format(result)
+            self.new_number = True
+        except Exception:
+            self.set_error()
+        self.record(expression)
+
+    def paste(self, text):
+        """Enter pasted text in one step
+
+        A number becomes the current input as if typed; anything else is
+        evaluated as an expression. Surrounding whitespace is ignored.
+        """
+        text = text.strip()
+        if not text:
+            return
+        try:
+            self.backend.parse(text)
+            is_number = any(c.isdigit() for c in text)
+        except ValueError:
+            is_number = False
+        if is_number:
+            self.current_value = text
+            self.new_number = False
+        else:
+            self.evaluate(text)
+
+    def constant_pressed(self, constant):
+        """Insert mathematical constant"""
+        if constant not in CONSTANTS:
+            return
+        self.current_value = self.format(self.backend.constant(constant))
+        self.new_number = True
+
+    def toggle_sign(self):
+        """Toggle positive/negative"""
+        try:
+            self.current_value = self.format(self.backend.negate(self.current_number()))
+        except (ArithmeticError, ValueError):
+            pass
+
+    def backspace(self):
+        """Remove last character"""
+        if not self.new_number and len(self.current_value) > 1:
+            self.current_value = self.current_value[:-1]
+        elif not self.new_number:
+            self.current_value = "0"
+            self.new_number = True
+
+    def clear(self):
+        """Clear current value"""
+        self.current_value = "0"
+        self.new_number = True
+
+    def all_clear(self):
+        """Clear everything except memory"""
+        self.current_value = "0"
+        self.previous_value = ""
+        self.operation = None
+        self.new_number = True
+        self.history_text = ""
+
+    def append_char(self, char):
+        """Append character (for parentheses)"""
+        if self.new_number:
+            self.current_value = char
+            self.new_number = False
+        else:
+            self.current_value += char
+
+    # Memory functions
+    def memory_clear(self):
+        """Clear memory"""
+        self.memory = 0
+
+    def memory_recall(self):
+        """Recall memory"""
+        self.current_value = self.format(self.backend.coerce(self.memory))
+        self.new_number = True
+
+    def memory_add(self):
+        """Add to memory"""
+        try:
+            self.memory += self.current_number()
+        except (ArithmeticError, ValueError):
+            pass
+
+    def memory_subtract(self):
+        """Subtract from memory"""
+        try:
+            self.memory -= self.current_number()
+        except (ArithmeticError, ValueError):
+            pass
+
+    def memory_store(self):
+        """Store in memory"""
+        try:
+            self.memory = self.current_number()
+        except (ArithmeticError, ValueError):
+            pass
+
@@ -0,0 +1,120 @@
+"""
+Background Executor Module
+Runs slow work off the Tk thread and marshals results back with after()
+"""
+
+import queue
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
+
+
+POLL_INTERVAL_MS = 16  # one frame at 60fps
+
+
+class BackgroundExecutor:
+    """Thread pool (plus optional process pool) whose callbacks run on the Tk thread
+
+    Callbacks are never invoked from worker threads: finished futures are
+    queued and drained by an after() poll that only runs while tasks are
+    pending. Tasks are submitted under a group name; cancel(group)
+    discards every outstanding result of that group, including tasks that
+    are already running and cannot be interrupted.
+    """
+
+    def __init__(self, widget, max_workers=2, use_processes=False,
+                 poll_interval=POLL_INTERVAL_MS):
+        self.widget = widget
+        self.poll_interval = poll_interval
+        self.use_processes = use_processes
+        self._threads = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="calculator")
+        self._processes = None
+        self._completed = queue.Queue()
+        self._pending = {}
+        self._generations = {}
+        self._poll_id = None
+
+    def submit(self, fn, *args, on_done=None, on_error=None, group="default",
+               cpu_bound=False):
+        """Run fn(*args) in the background and call on_done(result) on the Tk thread
+
+        cpu_bound tasks go to the process pool when use_processes is set;
+        fn and its arguments must then be picklable.
+        """
+        if cpu_bound and self.use_processes:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor()
+            future = self._processes.submit(fn, *args)
+        else:
+            future = self._threads.submit(fn, *args)
+
+        generation = self._generations.get(group, 0)
+        self._pending[future] = (on_done, on_error, group, generation)
+        future.add_done_callback(self._completed.put)
+        self._schedule_poll()
+        return future
+
+    def cancel(self, group="default"):
+        """Cancel queued tasks of a group and ignore results of running ones"""
+        self._generations[group] = self._generations.get(group, 0) + 1
+        for future, (_, _, task_group, _) in list(self._pending.items()):
+            if task_group == group:
+                future.cancel()
+                del self._pending[future]
+
+    def busy(self, group=None):
+        """Check whether any task (of a group) is still pending"""
+        if group is None:
+            return bool(self._pending)
+        return any(task[2] == group for task in self._pending.values())
+
+    def shutdown(self, wait=False):
+        """Stop polling and release the worker pools
+
+        With wait=True queued tasks still run (their callbacks do not) and
+        the call blocks until they finish, e.g. to flush pending writes.
+        """
+        if self._poll_id is not None:
+            self.widget.after_cancel(self._poll_id)
+            self._poll_id = None
+        if not wait:
+            for future in self._pending:
+                future.cancel()
+        self._pending.clear()
+        self._threads.shutdown(wait=wait)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False)
+
+    def _schedule_poll(self):
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                future = self._completed.get_nowait()
+            except queue.Empty:
+                break
+            task = self._pending.pop(future, None)
+            if task is None:
+                continue  # cancelled
+            on_done, on_error, group, generation = task
+            if generation != self._generations.get(group, 0):
+                continue
+            self._deliver(future, on_done, on_error)
+        if self._pending:
+            self._schedule_poll()
+
+    def _deliver(self, future, on_done, on_error):
+        try:
+            result = future.result()
+        except CancelledError:
+            return
+        except Exception as e:
+            if on_error is not None:
+                on_error(e)
+            else:
+                print(f"Background task failed: {e}")
+            return
+        if on_done is not None:
+            on_done(result)
@@ -0,0 +1,322 @@
+"""
+Export Module
+Streams GPA reports as text, CSV, JSON Lines or HTML, one row at a time
+
+    python export.py --database gpa.db --output reports/ --format html
+
+Reports are written while iterating over semesters and their course
+records, so memory use does not grow with the length of the history.
+Semester and cumulative totals are taken from precomputed aggregates
+when available instead of being summed again.
+"""
+
+import argparse
+import csv
+import html
+import json
+import os
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from aggregates import GPAAggregates
+from grade_scheme import current_scheme, use_scheme
+from repository import SQLiteRepository
+
+
+class TextWriter:
+    """The plain-text report layout"""
+
+    def __init__(self, out):
+        self.out = out
+
+    def begin(self, cumulative):
+        self.out.write("=" * 50 + "\n")
+        self.out.write("GPA REPORT\n")
+        self.out.write("=" * 50 + "\n\n")
+        if cumulative.count:
+            self.out.write(f"Cumulative GPA: {cumulative.gpa:.2f}\n")
+            self.out.write(f"Total Credits: {int(cumulative.credits)}\n\n")
+
+    def semester(self, name, totals, unsaved):
+        self.out.write("-" * 50 + "\n")
+        self.out.write("Current Semester (Unsaved)\n" if unsaved else f"Semester: {name}\n")
+        self.out.write("-" * 50 + "\n")
+        self.out.write(f"Semester GPA: {totals.gpa:.2f}\n")
+        self.out.write(f"Credits: {int(totals.credits)}\n\n")
+
+    def course(self, name, credits, grade, points):
+        self.out.write(f"  {name}\n")
+        self.out.write(f"    Credits: {credits}, Grade: {grade}, Points: {points}\n")
+
+    def end_semester(self, unsaved):
+        if not unsaved:
+            self.out.write("\n")
+
+    def end(self):
+        pass
+
+
+class CsvWriter:
+    """One row per cumulative summary, semester and course"""
+
+    def __init__(self, out):
+        self.writer = csv.writer(out, lineterminator="\n")
+        self.name = None
+
+    def begin(self, cumulative):
+        self.writer.writerow(["type", "semester", "course", "credits", "grade", "points", "gpa"])
+        self.writer.writerow(["cumulative", "", "", cumulative.credits, "", cumulative.points,
+                              f"{cumulative.gpa:.2f}"])
+
+    def semester(self, name, totals, unsaved):
+        self.name = "Current Semester (Unsaved)" if unsaved else name
+        self.writer.writerow(["semester", self.name, "", totals.credits, "", totals.points,
+                              f"{totals.gpa:.2f}"])
+
+    def course(self, name, credits, grade, points):
+        self.writer.writerow(["course", self.name, name, credits, grade, points, ""])
+
+    def end_semester(self, unsaved):
+        pass
+
+    def end(self):
+        pass
+
+
+class JsonLinesWriter:
+    """One JSON object per cumulative summary, semester and course"""
+
+    def __init__(self, out):
+        self.out = out
+        self.name = None
+
+    def write(self, record):
+        self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def begin(self, cumulative):
+        self.write({"type": "cumulative", "gpa": round(cumulative.gpa, 4),
+                    "credits": cumulative.credits, "courses": cumulative.count})
+
+    def semester(self, name, totals, unsaved):
+        self.name = name
+        self.write({"type": "semester", "name": name, "unsaved": unsaved,
+                    "gpa": round(totals.gpa, 4), "credits": totals.credits, "courses": totals.count})
+
+    def course(self, name, credits, grade, points):
+        self.write({"type": "course", "semester": self.name, "name": name,
+                    "credits": credits, "grade": grade, "points": points})
+
+    def end_semester(self, unsaved):
+        pass
+
+    def end(self):
+        pass
+
+
+class HtmlWriter:
+    """A standalone HTML page with one table per semester"""
+
+    def __init__(self, out):
+        self.out = out
+
+    def begin(self, cumulative):
+        self.out.write(
+            "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n<title>GPA Report</title>\n"
+            "<style>body{font-family:sans-serif}table{border-collapse:collapse;margin-bottom:1.5em}"
+            "th,td{border:1px solid #999;padding:4px 10px}th{background:#eee}</style>\n"
+            "</head>\n<body>\n<h1>GPA Report</h1>\n"
+        )
+        if cumulative.count:
+            self.out.write(f"<p>Cumulative GPA: <b>{cumulative.gpa:.2f}</b>, "
+                           f"Total Credits: <b>{int(cumulative.credits)}</b></p>\n")
+
+    def semester(self, name, totals, unsaved):
+        title = "Current Semester (Unsaved)" if unsaved else f"Semester: {name}"
+        self.out.write(f"<h2>{html.escape(title)}</h2>\n")
+        self.out.write(f"<p>Semester GPA: {totals.gpa:.2f}, Credits: {int(totals.credits)}</p>\n")
+        self.out.write("<table>\n<tr><th>Course</th><th>Credits</th><th>Grade</th><th>Points</th></tr>\n")
+
+    def course(self, name, credits, grade, points):
+        self.out.write(f"<tr><td>{html.escape(name)}</td><td>{credits}</td>"
+                       f"<td>{html.escape(grade)}</td><td>{points}</td></tr>\n")
+
+    def end_semester(self, unsaved):
+        self.out.write("</table>\n")
+
+    def end(self):
+        self.out.write("</body>\n</html>\n")
+
+
+WRITERS = {'text': TextWriter, 'csv': CsvWriter, 'jsonl': JsonLinesWriter, 'html': HtmlWriter}
+EXTENSIONS = {'text': ".txt", 'csv': ".csv", 'jsonl': ".jsonl", 'html': ".html"}
+
+
+def format_for(filename, default="text"):
+    """Report format implied by a file name's extension"""
+    extension = os.path.splitext(filename)[1].lower()
+    for fmt, known in EXTENSIONS.items():
+        if extension == known:
+            return fmt
+    return default
+
+
+def write_report(out, semesters, current_courses, fmt="text", aggregates=None):
+    """Stream a report for semesters and current courses to a text stream
+
+    aggregates is a GPAAggregates matching the data (e.g. a copy of the GPA
+    tab's running totals); without it, totals are computed per semester
+    with vectorized sums.
+    """
+    if aggregates is None:
+        aggregates = GPAAggregates()
+        aggregates.rebuild(semesters, current_courses)
+
+    sections = [(semester['name'], totals, False, semester['courses'].records())
+                for semester, totals in zip(semesters, aggregates.semesters)]
+    if current_courses:
+        sections.append((None, aggregates.current, True, current_courses.records()))
+    write_sections(out, aggregates.cumulative, sections, fmt)
+
+
+def write_sections(out, cumulative, sections, fmt="text"):
+    """Stream a report from (semester name, GradeTotals, is current, course records) sections
+
+    sections and each section's records may be generators; they are
+    consumed in order, one record at a time.
+    """
+    writer = WRITERS[fmt](out)
+    writer.begin(cumulative)
+    for name, totals, unsaved, records in sections:
+        writer.semester(name, totals, unsaved)
+        for record in records:
+            writer.course(*record)
+        writer.end_semester(unsaved)
+    writer.end()
+
+
+def open_report(filename, fmt):
+    """Open a report file for writing in a format"""
+    newline = "" if fmt == 'csv' else None
+    return open(filename, 'w', encoding='utf-8', newline=newline)
+
+
+def export_report(filename, semesters, current_courses, fmt=None, aggregates=None):
+    """Write a report file; the format defaults to the one implied by the extension"""
+    fmt = fmt or format_for(filename)
+    with open_report(filename, fmt) as f:
+        write_report(f, semesters, current_courses, fmt, aggregates)
+
+
+def report_filename(student, fmt):
+    """Safe file name for a student's report"""
+    return re.sub(r"[^\w.-]+", "_", student).strip("_") + EXTENSIONS[fmt]
+
+
+def report_filenames(student_ids, fmt):
+    """{student: file name} for {student: id}, adding the id where safe names collide
+
+    Names are compared case-insensitively, as on Windows and macOS.
+    """
+    filenames = {student: report_filename(student, fmt) for student in student_ids}
+    counts = Counter(filename.lower() for filename in filenames.values())
+    for student, filename in filenames.items():
+        if counts[filename.lower()] > 1:
+            filenames[student] = report_filename(f"{student}_{student_ids[student]}", fmt)
+    if len({filename.lower() for filename in filenames.values()}) < len(filenames):
+        raise ValueError("Students' report file names collide")
+    return filenames
+
+
+def export_student(database, student, directory, fmt, filename=None):
+    """Export one existing student of a SQLite database; runs in a worker process
+
+    Totals come from the database's aggregate queries and courses are
+    streamed one semester at a time (see SQLiteRepository.sections).
+    """
+    filename = os.path.join(directory, filename or report_filename(student, fmt))
+    repository = SQLiteRepository(database, student, create=False)
+    try:
+        _, cumulative = repository.totals()
+        with open_report(filename, fmt) as f:
+            write_sections(f, cumulative, repository.sections(), fmt)
+    finally:
+        repository.close()
+    return filename
+
+
+def export_database(database, directory, fmt="text", students=None, max_workers=None,
+                    on_progress=None):
+    """Export every (or the given) student's report to a directory in parallel
+
+    Each worker process opens its own database connection, so only
+    student names cross process boundaries. Raises KeyError for a
+    student not in the database before writing anything. Returns
+    {student: filename} and raises the first failure after all other
+    reports are written.
+    """
+    repository = SQLiteRepository(database, student=None)
+    try:
+        if students is None:
+            students = [name for name, _ in repository.students()]
+        student_ids = {}
+        for student in students:
+            student_ids[student] = repository.find_student(student)
+            if student_ids[student] is None:
+                raise KeyError(f"No student named {student!r} in {database}")
+    finally:
+        repository.close()
+    filenames = report_filenames(student_ids, fmt)
+    os.makedirs(directory, exist_ok=True)
+
+    written = {}
+    errors = []
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=use_scheme,
+                             initargs=(current_scheme(),)) as pool:
+        futures = {pool.submit(export_student, database, student, directory, fmt,
+                               filenames[student]): student
+                   for student in student_ids}
+        for future in as_completed(futures):
+            student = futures[future]
+            try:
+                written[student] = future.result()
+            except Exception as e:
+                errors.append((student, e))
+            if on_progress is not None:
+                on_progress(len(written) + len(errors), len(futures))
+    if errors:
+        student, error = errors[0]
+        raise RuntimeError(f"{len(errors)} report(s) failed, first for {student}: {error}") from error
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export GPA reports for every student in a database.")
+    parser.add_argument("--database", required=True, help="SQLite database created with --database")
+    parser.add_argument("--output", required=True, help="directory for the report files")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="text",
+                        help="report format (default: text)")
+    parser.add_argument("--student", action="append",
+                        help="only export this student (repeatable)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.database):
+        parser.error(f"no such database: {args.database}")
+
+    def progress(done, total):
+        print(f"\r{done}/{total} reports", end="", file=sys.stderr, flush=True)
+
+    try:
+        written = export_database(args.database, args.output, args.format, args.student,
+                                  args.workers, progress)
+    except KeyError as e:
+        print(f"Error: {e.args[0]}", file=sys.stderr)
+        return 1
+    print(file=sys.stderr)
+    print(f"Wrote {len(written)} reports to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,316 @@
+"""
+Expression Module
+Parses infix expressions and compiles them into cached, reusable closures
+"""
+
+import re
+from functools import lru_cache
+
+from operations import CONSTANTS, REGISTRY, binary_operation, scientific_function
+
+
+CACHE_SIZE = 1024
+
+# Functions whose result depends on the angle mode cannot be folded at compile time
+ANGLE_FUNCTIONS = ('sin', 'cos', 'tan')
+
+FUNCTION_ALIASES = {
+    'exp10': '10x', 'exp2': '2x', 'fact': 'factorial',
+    'sqr': 'square', 'recip': 'reciprocal',
+}
+POSTFIX_FUNCTIONS = {'!': 'factorial', '²': 'square', '³': 'cube'}
+SYMBOL_ALIASES = (('**', '^'), ('×', '*'), ('÷', '/'), ('−', '-'))
+
+TOKEN_RE = re.compile(
+    r"(?P<func>10x|2x)(?=\s*\()"
+    r"|(?P<number>(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?)"
+    r"|(?P<name>[a-z]+|π)"
+    r"|(?P<op>[-+*/^%()!²³√])"
+)
+
+
+class ExpressionError(ValueError):
+    """Raised when an expression cannot be tokenized or parsed"""
+
+
+def normalize(text):
+    """Normalize expression text so equivalent spellings share a cache entry
+
+    Runs of whitespace become one space; they still separate tokens, so
+    "2 3" is not 23.
+    """
+    text = " ".join(text.split()).lower()
+    for alias, symbol in SYMBOL_ALIASES:
+        text = text.replace(alias, symbol)
+    return text
+
+
+def tokenize(text):
+    """Split normalized expression text into (kind, value) tokens, skipping whitespace"""
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        if text[pos].isspace():
+            pos += 1
+            continue
+        match = TOKEN_RE.match(text, pos)
+        if not match:
+            raise ExpressionError(f"Unexpected character {text[pos]!r} at position {pos}")
+        kind = match.lastgroup
+        value = match.group()
+        if kind == 'number':
+            tokens.append(('number', value))
+        elif kind == 'func':
+            tokens.append(('func', value))
+        elif kind == 'name':
+            if value == 'π':
+                value = 'pi'
+            value = FUNCTION_ALIASES.get(value, value)
+            if value == 'mod':
+                tokens.append(('op', '%'))
+            elif REGISTRY.is_unary(value):
+                tokens.append(('func', value))
+            elif value in CONSTANTS:
+                tokens.append(('const', value))
+            else:
+                raise ExpressionError(f"Unknown name {value!r}")
+        else:
+            tokens.append(('op', value))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing a tuple-based syntax tree
+
+    Nodes are ('number', text), ('const', name), ('neg', operand),
+    ('func', name, argument) and ('bin', op, left, right).
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return (None, None)
+
+    def advance(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expect(self, value):
+        kind, actual = self.advance()
+        if kind != 'op' or actual != value:
+            raise ExpressionError(f"Expected {value!r}")
+
+    def parse(self):
+        if not self.tokens:
+            raise ExpressionError("Empty expression")
+        node = self.expression()
+        if self.pos != len(self.tokens):
+            raise ExpressionError(f"Unexpected token {self.peek()[1]!r}")
+        return node
+
+    def expression(self):
+        node = self.term()
+        while self.peek() in (('op', '+'), ('op', '-')):
+            op = self.advance()[1]
+            node = ('bin', op, node, self.term())
+        return node
+
+    def term(self):
+        node = self.unary()
+        while True:
+            kind, value = self.peek()
+            if kind == 'op' and value in ('*', '/', '%'):
+                self.advance()
+                node = ('bin', value, node, self.unary())
+            elif self.starts_primary():
+                # Implicit multiplication: 2pi, 3(4+1), (1+2)(3+4), but not
+                # one number after another ("2 3", "1.2.3")
+                if kind == 'number' and self.tokens[self.pos - 1][0] == 'number':
+                    raise ExpressionError(f"Unexpected number {value!r}")
+                node = ('bin', '*', node, self.power())
+            else:
+                return node
+
+    def starts_primary(self):
+        kind, value = self.peek()
+        return kind in ('number', 'const', 'func') or (kind == 'op' and value in ('(', '√'))
+
+    def unary(self):
+        kind, value = self.peek()
+        if kind == 'op' and value in ('-', '+'):
+            self.advance()
+            operand = self.unary()
+            return ('neg', operand) if value == '-' else operand
+        return self.power()
+
+    def power(self):
+        base = self.postfix()
+        if self.peek() == ('op', '^'):
+            self.advance()
+            # Right associative, and the exponent may carry its own sign
+            return ('bin', '^', base, self.unary())
+        return base
+
+    def postfix(self):
+        node = self.primary()
+        while True:
+            kind, value = self.peek()
+            if kind == 'op' and value in POSTFIX_FUNCTIONS:
+                self.advance()
+                node = ('func', POSTFIX_FUNCTIONS[value], node)
+            else:
+                return node
+
+    def primary(self):
+        kind, value = self.advance()
+        if kind in ('number', 'const'):
+            return (kind, value)
+        if kind == 'func' or (kind, value) == ('op', '√'):
+            func = 'sqrt' if kind == 'op' else value
+            if self.peek() == ('op', '('):
+                return ('func', func, self.primary())
+            return ('func', func, self.unary())
+        if (kind, value) == ('op', '('):
+            node = self.expression()
+            self.expect(')')
+            return node
+        if kind is None:
+            raise ExpressionError("Unexpected end of expression")
+        raise ExpressionError(f"Unexpected token {value!r}")
+
+
+def _constant(value):
+    return (lambda angle_mode: value), True
+
+
+def _fold(node):
+    """Evaluate a constant closure at compile time, leaving errors for runtime"""
+    fn, is_constant = node
+    if not is_constant:
+        return node
+    try:
+        return _constant(fn('deg'))
+    except (ArithmeticError, ValueError):
+        return fn, False
+
+
+def _float_closure(node):
+    """Build a float closure taking the angle mode, folding constant subtrees"""
+    kind = node[0]
+    if kind == 'number':
+        return _constant(float(node[1]))
+    if kind == 'const':
+        return _constant(CONSTANTS[node[1]])
+    if kind == 'neg':
+        operand_fn, is_constant = _float_closure(node[1])
+
+        def evaluate(angle_mode):
+            return -operand_fn(angle_mode)
+
+        return _fold((evaluate, is_constant))
+    if kind == 'func':
+        func = node[1]
+        argument_fn, is_constant = _float_closure(node[2])
+
+        def evaluate(angle_mode):
+            return scientific_function(func, argument_fn(angle_mode), angle_mode)
+
+        return _fold((evaluate, is_constant and func not in ANGLE_FUNCTIONS))
+
+    op = node[1]
+    left_fn, left_const = _float_closure(node[2])
+    right_fn, right_const = _float_closure(node[3])
+
+    def evaluate(angle_mode):
+        return binary_operation(op, left_fn(angle_mode), right_fn(angle_mode))
+
+    return _fold((evaluate, left_const and right_const))
+
+
+def _backend_closure(node):
+    """Build a closure taking (angle_mode, backend) for non-float backends"""
+    kind = node[0]
+    if kind == 'number':
+        text = node[1]
+        return lambda angle_mode, backend: backend.parse(text)
+    if kind == 'const':
+        name = node[1]
+        return lambda angle_mode, backend: backend.constant(name)
+    if kind == 'neg':
+        operand_fn = _backend_closure(node[1])
+        return lambda angle_mode, backend: backend.negate(operand_fn(angle_mode, backend))
+    if kind == 'func':
+        func = node[1]
+        argument_fn = _backend_closure(node[2])
+        return lambda angle_mode, backend: backend.scientific(
+            func, argument_fn(angle_mode, backend), angle_mode)
+
+    op = node[1]
+    left_fn = _backend_closure(node[2])
+    right_fn = _backend_closure(node[3])
+    return lambda angle_mode, backend: backend.binary(
+        op, left_fn(angle_mode, backend), right_fn(angle_mode, backend))
+
+
+def parse(text):
+    """Parse expression text into a syntax tree"""
+    return _Parser(tokenize(normalize(text))).parse()
+
+
+def _compile(normalized):
+    fn, _ = _float_closure(_Parser(tokenize(normalized)).parse())
+    return fn
+
+
+def _compile_backend(normalized):
+    return _backend_closure(_Parser(tokenize(normalized)).parse())
+
+
+_compile_cached = lru_cache(maxsize=CACHE_SIZE)(_compile)
+_compile_backend_cached = lru_cache(maxsize=CACHE_SIZE)(_compile_backend)
+
+
+def compile_expression(text, backend=None):
+    """Compile expression text into a closure taking the angle mode
+
+    Without a backend (or with the float backend) the closure evaluates in
+    float with constant subtrees folded; otherwise numbers are parsed and
+    operations applied by the given numeric backend.
+    """
+    normalized = normalize(text)
+    if backend is None or backend.name == 'float':
+        return _compile_cached(normalized)
+    fn = _compile_backend_cached(normalized)
+    return lambda angle_mode="deg": fn(angle_mode, backend)
+
+
+def evaluate(text, angle_mode="deg", backend=None):
+    """Evaluate an infix expression and return the numeric result"""
+    normalized = normalize(text)
+    if backend is None or backend.name == 'float':
+        return _compile_cached(normalized)(angle_mode)
+    return _compile_backend_cached(normalized)(angle_mode, backend)
+
+
+def set_cache_size(size):
+    """Resize the compiled-expression caches, discarding current entries"""
+    global _compile_cached, _compile_backend_cached
+    _compile_cached = lru_cache(maxsize=size)(_compile)
+    _compile_backend_cached = lru_cache(maxsize=size)(_compile_backend)
+
+
+def cache_info():
+    """Return hit/miss statistics for the float compiled-expression cache"""
+    return _compile_cached.cache_info()
+
+
+def clear_cache():
+    """Discard all compiled expressions"""
+    _compile_cached.cache_clear()
+    _compile_backend_cached.cache_clear()
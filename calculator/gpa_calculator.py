@@ -4,28 +4,68 @@ Manages course grades and calculates GPA with semester tracking
 """
 
 import customtkinter as ctk
-import json
-import os
+import math
 from tkinter import filedialog, messagebox
 
+import metrics
+from aggregates import GPAAggregates
+from csv_import import import_csv
+from course_store import GRADE_SCALE, CourseTable
+from executor import BackgroundExecutor
+from export import export_report
+from planner import plan_grades
+from repository import DEFAULT_STUDENT, MemoryRepository, SQLiteRepository
+from storage import LogStore
+from styles import get_font
+from virtual_table import VirtualTable
+
+
+COURSE_COLUMNS = [
+    ("Course", 100, "w"),
+    ("Credits", 100, "center"),
+    ("Grade", 100, "center"),
+    ("Points", 100, "center"),
+]
+
+HISTORY_COLUMNS = [
+    ("Semester", 280, "w"),
+    ("GPA", 140, "w"),
+    ("Credits", 140, "w"),
+]
+
+PLAN_COLUMNS = [
+    ("Plan", 80, "w"),
+    ("Grades (credits)", 420, "w"),
+    ("CGPA", 80, "center"),
+]
+
 
 class GPACalculator(ctk.CTkFrame):
-    def __init__(self, parent):
+    def __init__(self, parent, verify_totals=False, fsync='interval', database=None,
+                 student=DEFAULT_STUDENT, binary_snapshot=False):
         super().__init__(parent, fg_color="transparent")
         
         # Data storage
         self.semesters = []
-        self.current_semester_courses = []
+        self.current_semester_courses = CourseTable()
+        
+        # Running GPA totals, optionally cross-checked against full recomputes
+        self.totals = GPAAggregates(verify=verify_totals)
         self.data_file = "gpa_data.json"
         
-        # Grade scale (4.0 system)
-        self.grade_scale = {
-            'A': 4.0, 'A-': 3.7,
-            'B+': 3.3, 'B': 3.0, 'B-': 2.7,
-            'C+': 2.3, 'C': 2.0, 'C-': 1.7,
-            'D+': 1.3, 'D': 1.0,
-            'F': 0.0
-        }
+        if database:
+            # One student's rows of a shared SQLite database, read with SQL aggregates
+            self.store = self.repository = SQLiteRepository(database, student)
+        else:
+            # Snapshot plus append-only change log; only touched by the I/O worker
+            self.store = LogStore(self.data_file, fsync=fsync, binary=binary_snapshot)
+            self.repository = MemoryRepository(self)
+        
+        # Disk I/O runs on a single background worker so writes stay ordered
+        self.executor = BackgroundExecutor(self, max_workers=1)
+        
+        # Grade scale (4.0 system); grades are stored as codes into this table
+        self.grade_scale = GRADE_SCALE
         
         # Configure grid
         self.grid_rowconfigure(0, weight=0)
@@ -33,13 +73,15 @@ class GPACalculator(ctk.CTkFrame):
         self.grid_rowconfigure(2, weight=0)
         self.grid_columnconfigure(0, weight=1)
         
-        # Create UI
+        # Create UI; buttons that change data stay disabled until loading finishes
+        self.edit_buttons = []
         self.create_summary_panel()
         self.create_course_entry()
         self.create_action_buttons()
+        self.set_editing(False)
         
-        # Load saved data
-        self.load_data()
+        # Load saved data once the tab has been drawn
+        self.after_idle(self.load_data)
         
     def create_summary_panel(self):
         """Create GPA summary display"""
@@ -54,13 +96,13 @@ class GPACalculator(ctk.CTkFrame):
         ctk.CTkLabel(
             semester_frame,
             text="Current Semester GPA",
-            font=ctk.CTkFont(size=14, weight="bold")
+            font=get_font(14, "bold")
         ).pack(pady=(10, 5))
         
         self.semester_gpa_label = ctk.CTkLabel(
             semester_frame,
             text="0.00",
-            font=ctk.CTkFont(size=32, weight="bold"),
+            font=get_font(32, "bold"),
             text_color="#4caf50"
         )
         self.semester_gpa_label.pack(pady=(0, 10))
@@ -72,13 +114,13 @@ class GPACalculator(ctk.CTkFrame):
         ctk.CTkLabel(
             cumulative_frame,
             text="Cumulative GPA",
-            font=ctk.CTkFont(size=14, weight="bold")
+            font=get_font(14, "bold")
         ).pack(pady=(10, 5))
         
         self.cumulative_gpa_label = ctk.CTkLabel(
             cumulative_frame,
             text="0.00",
-            font=ctk.CTkFont(size=32, weight="bold"),
+            font=get_font(32, "bold"),
             text_color="#2196f3"
         )
         self.cumulative_gpa_label.pack(pady=(0, 10))
@@ -90,13 +132,13 @@ class GPACalculator(ctk.CTkFrame):
         ctk.CTkLabel(
             credits_frame,
             text="Total Credits",
-            font=ctk.CTkFont(size=14, weight="bold")
+            font=get_font(14, "bold")
         ).pack(pady=(10, 5))
         
         self.credits_label = ctk.CTkLabel(
             credits_frame,
             text="0",
-            font=ctk.CTkFont(size=32, weight="bold"),
+            font=get_font(32, "bold"),
             text_color="#ff9800"
         )
         self.credits_label.pack(pady=(0, 10))
@@ -118,7 +160,7 @@ class GPACalculator(ctk.CTkFrame):
         ctk.CTkLabel(
             entry_frame,
             text="Add Course:",
-            font=ctk.CTkFont(size=16, weight="bold")
+            font=get_font(16, "bold")
         ).grid(row=0, column=0, columnspan=4, sticky="w", pady=(0, 10))
         
         # Course name
@@ -147,69 +189,78 @@ class GPACalculator(ctk.CTkFrame):
             width=100
         )
         self.grade_menu.grid(row=2, column=3, sticky="w", padx=(5, 0), pady=5)
-        self.grade_menu.set("A")
+        self.grade_menu.set(next(iter(self.grade_scale)))
         
         # Add button
         add_btn = ctk.CTkButton(
             entry_frame,
             text="➕ Add Course",
             command=self.add_course,
-            font=ctk.CTkFont(size=14, weight="bold"),
+            font=get_font(14, "bold"),
             fg_color="#00897b",
             hover_color="#00695c",
             height=35
         )
         add_btn.grid(row=3, column=0, columnspan=4, pady=(15, 0), sticky="ew")
+        self.edit_buttons.append(add_btn)
         
         # Course list
         list_label = ctk.CTkLabel(
             main_frame,
             text="Current Semester Courses:",
-            font=ctk.CTkFont(size=16, weight="bold")
+            font=get_font(16, "bold")
         )
         list_label.grid(row=1, column=0, padx=15, pady=(0, 5), sticky="w")
         
-        # Scrollable frame for courses
-        self.courses_frame = ctk.CTkScrollableFrame(main_frame, corner_radius=8)
-        self.courses_frame.grid(row=2, column=0, padx=15, pady=(0, 15), sticky="nsew")
+        # Virtualized table for courses
+        self.course_table = VirtualTable(
+            main_frame,
+            columns=COURSE_COLUMNS,
+            on_action=self.delete_course,
+            empty_text="No courses added yet",
+            corner_radius=8
+        )
+        self.course_table.grid(row=2, column=0, padx=15, pady=(0, 15), sticky="nsew")
         main_frame.grid_rowconfigure(2, weight=1)
         
     def create_action_buttons(self):
         """Create action buttons"""
         button_frame = ctk.CTkFrame(self, fg_color="transparent")
         button_frame.grid(row=2, column=0, padx=10, pady=(0, 10), sticky="ew")
-        button_frame.grid_columnconfigure((0, 1, 2, 3), weight=1)
+        button_frame.grid_columnconfigure((0, 1, 2, 3, 4, 5), weight=1)
         
         # Save Semester
         save_btn = ctk.CTkButton(
             button_frame,
             text="💾 Save Semester",
             command=self.save_semester,
-            font=ctk.CTkFont(size=14, weight="bold"),
+            font=get_font(14, "bold"),
             fg_color="#1f538d",
             hover_color="#164070",
             height=40
         )
         save_btn.grid(row=0, column=0, padx=5, sticky="ew")
+        self.edit_buttons.append(save_btn)
         
         # Clear Current
         clear_btn = ctk.CTkButton(
             button_frame,
             text="🗑️ Clear Current",
             command=self.clear_current,
-            font=ctk.CTkFont(size=14, weight="bold"),
+            font=get_font(14, "bold"),
             fg_color="#f57c00",
             hover_color="#ef6c00",
             height=40
         )
         clear_btn.grid(row=0, column=1, padx=5, sticky="ew")
+        self.edit_buttons.append(clear_btn)
         
         # View History
         history_btn = ctk.CTkButton(
             button_frame,
             text="📊 View History",
             command=self.view_history,
-            font=ctk.CTkFont(size=14, weight="bold"),
+            font=get_font(14, "bold"),
             fg_color="#6441a5",
             hover_color="#512d8b",
             height=40
@@ -221,13 +272,38 @@ class GPACalculator(ctk.CTkFrame):
             button_frame,
             text="📄 Export Report",
             command=self.export_report,
-            font=ctk.CTkFont(size=14, weight="bold"),
+            font=get_font(14, "bold"),
             fg_color="#00695c",
             hover_color="#004d40",
             height=40
         )
         export_btn.grid(row=0, column=3, padx=5, sticky="ew")
         
+        # Import CSV
+        import_btn = ctk.CTkButton(
+            button_frame,
+            text="📥 Import CSV",
+            command=self.import_csv,
+            font=get_font(14, "bold"),
+            fg_color="#5d4037",
+            hover_color="#4e342e",
+            height=40
+        )
+        import_btn.grid(row=0, column=4, padx=5, sticky="ew")
+        self.edit_buttons.append(import_btn)
+        
+        # What-If Planner
+        plan_btn = ctk.CTkButton(
+            button_frame,
+            text="🎯 What-If",
+            command=self.plan_target,
+            font=get_font(14, "bold"),
+            fg_color="#ad1457",
+            hover_color="#880e4f",
+            height=40
+        )
+        plan_btn.grid(row=0, column=5, padx=5, sticky="ew")
+        
     def add_course(self):
         """Add a course to current semester"""
         course_name = self.course_name_entry.get().strip()
@@ -241,111 +317,53 @@ class GPACalculator(ctk.CTkFrame):
         
         try:
             credits = float(credits_str)
-            if credits <= 0:
+            if not (math.isfinite(credits) and credits > 0):
                 raise ValueError()
         except:
             messagebox.showerror("Error", "Please enter a valid number of credits")
             return
         
         # Add course
-        course = {
-            'name': course_name,
-            'credits': credits,
-            'grade': grade,
-            'points': self.grade_scale[grade]
-        }
-        self.current_semester_courses.append(course)
+        self.current_semester_courses.append(course_name, credits, grade)
+        course = self.current_semester_courses[-1]
+        self.totals.add_course(course)
+        self.save_data('add_course', course={'name': course_name, 'credits': credits, 'grade': grade,
+                                             'points': course['points']})
         
         # Clear entries
         self.course_name_entry.delete(0, 'end')
         self.credits_entry.delete(0, 'end')
-        self.grade_menu.set("A")
+        self.grade_menu.set(next(iter(self.grade_scale)))
         
         # Update display
-        self.update_course_list()
+        self.course_table.append(course_row(**course))
         self.calculate_gpa()
         
+    @metrics.timed("update_course_list")
     def update_course_list(self):
         """Update the displayed course list"""
-        # Clear existing
-        for widget in self.courses_frame.winfo_children():
-            widget.destroy()
-        
-        if not self.current_semester_courses:
-            ctk.CTkLabel(
-                self.courses_frame,
-                text="No courses added yet",
-                text_color="gray",
-                font=ctk.CTkFont(size=14)
-            ).pack(pady=20)
-            return
-        
-        # Add header
-        header_frame = ctk.CTkFrame(self.courses_frame, fg_color="gray25")
-        header_frame.pack(fill="x", pady=(0, 5))
-        
-        headers = ["Course", "Credits", "Grade", "Points", ""]
-        for i, header in enumerate(headers):
-            label = ctk.CTkLabel(
-                header_frame,
-                text=header,
-                font=ctk.CTkFont(size=12, weight="bold"),
-                width=100 if i < 4 else 50
-            )
-            label.pack(side="left", padx=5, pady=5)
-        
-        # Add courses
-        for idx, course in enumerate(self.current_semester_courses):
-            course_frame = ctk.CTkFrame(self.courses_frame, fg_color="gray20")
-            course_frame.pack(fill="x", pady=2)
-            
-            ctk.CTkLabel(course_frame, text=course['name'], width=100, anchor="w").pack(side="left", padx=5, pady=5)
-            ctk.CTkLabel(course_frame, text=str(course['credits']), width=100).pack(side="left", padx=5, pady=5)
-            ctk.CTkLabel(course_frame, text=course['grade'], width=100).pack(side="left", padx=5, pady=5)
-            ctk.CTkLabel(course_frame, text=f"{course['points']:.1f}", width=100).pack(side="left", padx=5, pady=5)
-            
-            # Delete button
-            delete_btn = ctk.CTkButton(
-                course_frame,
-                text="✕",
-                width=50,
-                command=lambda i=idx: self.delete_course(i),
-                fg_color="#d32f2f",
-                hover_color="#b71c1c"
-            )
-            delete_btn.pack(side="left", padx=5, pady=5)
+        self.course_table.set_rows(course_row(*c) for c in self.current_semester_courses.records())
     
     def delete_course(self, index):
         """Delete a course"""
-        if 0 <= index < len(self.current_semester_courses):
-            self.current_semester_courses.pop(index)
-            self.update_course_list()
+        if self.loaded and 0 <= index < len(self.current_semester_courses):
+            self.totals.remove_course(self.current_semester_courses.pop(index))
+            self.course_table.delete(index)
+            self.save_data('delete_course', index=index)
             self.calculate_gpa()
     
+    @metrics.timed("calculate_gpa")
     def calculate_gpa(self):
         """Calculate and update GPA displays"""
-        # Calculate current semester GPA
-        if self.current_semester_courses:
-            total_points = sum(c['credits'] * c['points'] for c in self.current_semester_courses)
-            total_credits = sum(c['credits'] for c in self.current_semester_courses)
-            semester_gpa = total_points / total_credits if total_credits > 0 else 0.0
-        else:
-            semester_gpa = 0.0
-            total_credits = 0
-        
-        # Calculate cumulative GPA
-        all_courses = []
-        for semester in self.semesters:
-            all_courses.extend(semester['courses'])
-        all_courses.extend(self.current_semester_courses)
-        
-        if all_courses:
-            cumulative_points = sum(c['credits'] * c['points'] for c in all_courses)
-            cumulative_credits = sum(c['credits'] for c in all_courses)
-            cumulative_gpa = cumulative_points / cumulative_credits if cumulative_credits > 0 else 0.0
-        else:
-            cumulative_gpa = 0.0
-            cumulative_credits = 0
+        mismatches = self.totals.verify(self.semesters, self.current_semester_courses)
+        if mismatches:
+            print(f"GPA totals out of sync, rebuilding: {'; '.join(mismatches)}")
+            self.totals.rebuild(self.semesters, self.current_semester_courses)
+        
+        current, cumulative = self.repository.totals()
+        semester_gpa = current.gpa
+        cumulative_gpa = cumulative.gpa
+        cumulative_credits = cumulative.credits
         
         # Update labels
         self.semester_gpa_label.configure(text=f"{semester_gpa:.2f}")
@@ -385,14 +403,15 @@ class GPACalculator(ctk.CTkFrame):
         if semester_name:
             semester = {
                 'name': semester_name,
-                'courses': self.current_semester_courses.copy()
+                'courses': self.current_semester_courses
             }
             self.semesters.append(semester)
-            self.current_semester_courses = []
+            self.current_semester_courses = CourseTable()
+            self.totals.save_semester()
             
             self.update_course_list()
+            self.save_data('save_semester', name=semester_name)
             self.calculate_gpa()
-            self.save_data()
             
             messagebox.showinfo("Success", f"Semester '{semester_name}' saved!")
     
@@ -400,8 +419,10 @@ class GPACalculator(ctk.CTkFrame):
         """Clear current semester courses"""
         if self.current_semester_courses:
             if messagebox.askyesno("Confirm", "Clear all current courses?"):
-                self.current_semester_courses = []
+                self.current_semester_courses = CourseTable()
+                self.totals.clear_current()
                 self.update_course_list()
+                self.save_data('clear_current')
                 self.calculate_gpa()
     
     def view_history(self):
@@ -419,73 +440,128 @@ class GPACalculator(ctk.CTkFrame):
         ctk.CTkLabel(
             history_window,
             text="📚 Semester History",
-            font=ctk.CTkFont(size=24, weight="bold")
+            font=get_font(24, "bold")
         ).pack(pady=20)
         
-        # Scrollable frame
-        scroll_frame = ctk.CTkScrollableFrame(history_window)
-        scroll_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
-        
-        # Display semesters
-        for idx, semester in enumerate(self.semesters):
-            semester_frame = ctk.CTkFrame(scroll_frame, corner_radius=10)
-            semester_frame.pack(fill="x", pady=10)
+        # One header row per semester followed by its courses
+        rows = []
+        row_semesters = []
+        for idx, (name, semester_totals, courses) in enumerate(self.repository.history()):
+            semester_gpa = semester_totals.gpa
             
-            # Semester header
-            header_frame = ctk.CTkFrame(semester_frame, fg_color="gray25")
-            header_frame.pack(fill="x", padx=10, pady=10)
+            rows.append(('header', (
+                name,
+                (f"GPA: {semester_gpa:.2f}", self.get_gpa_color(semester_gpa)),
+                f"Credits: {int(semester_totals.credits)}"
+            )))
+            row_semesters.append(idx)
             
-            ctk.CTkLabel(
-                header_frame,
-                text=semester['name'],
-                font=ctk.CTkFont(size=18, weight="bold")
-            ).pack(side="left", padx=10, pady=5)
-            
-            # Calculate semester GPA
-            total_points = sum(c['credits'] * c['points'] for c in semester['courses'])
-            total_credits = sum(c['credits'] for c in semester['courses'])
-            semester_gpa = total_points / total_credits if total_credits > 0 else 0.0
-            
-            gpa_label = ctk.CTkLabel(
-                header_frame,
-                text=f"GPA: {semester_gpa:.2f}",
-                font=ctk.CTkFont(size=16, weight="bold"),
-                text_color=self.get_gpa_color(semester_gpa)
-            )
-            gpa_label.pack(side="left", padx=10, pady=5)
+            for course_name, credits, grade, _ in courses:
+                rows.append(('item', (
+                    f"  • {course_name}",
+                    f"{credits} credits",
+                    f"Grade: {grade}"
+                )))
+                row_semesters.append(idx)
+        
+        history_table = VirtualTable(
+            history_window,
+            columns=HISTORY_COLUMNS,
+            row_height=36,
+            on_action=lambda row: self.delete_semester(row_semesters[row], history_window),
+            show_header=False,
+            action_width=80
+        )
+        history_table.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+        history_table.set_rows(rows)
+    
+    def plan_target(self):
+        """Plan the grades needed in upcoming courses to reach a target CGPA"""
+        plan_window = ctk.CTkToplevel(self)
+        plan_window.title("What-If Planner")
+        plan_window.geometry("700x500")
+        
+        # Title
+        ctk.CTkLabel(
+            plan_window,
+            text="🎯 What-If Planner",
+            font=get_font(24, "bold")
+        ).pack(pady=20)
+        
+        form = ctk.CTkFrame(plan_window, fg_color="transparent")
+        form.pack(fill="x", padx=20)
+        
+        ctk.CTkLabel(form, text="Target CGPA:").grid(row=0, column=0, sticky="w", pady=5)
+        target_entry = ctk.CTkEntry(form, placeholder_text="e.g., 3.5", width=80)
+        target_entry.grid(row=0, column=1, sticky="w", padx=(5, 10), pady=5)
+        
+        ctk.CTkLabel(form, text="Upcoming credits:").grid(row=0, column=2, sticky="w", pady=5)
+        credits_entry = ctk.CTkEntry(form, placeholder_text="e.g., 3, 3, 4", width=140)
+        credits_entry.grid(row=0, column=3, sticky="w", padx=(5, 10), pady=5)
+        
+        # Grades below the chosen one are left out of every plan
+        letters = sorted(self.grade_scale, key=self.grade_scale.get, reverse=True)
+        ctk.CTkLabel(form, text="Lowest grade:").grid(row=0, column=4, sticky="w", pady=5)
+        lowest_menu = ctk.CTkOptionMenu(form, values=letters, width=80)
+        lowest_menu.grid(row=0, column=5, sticky="w", padx=(5, 0), pady=5)
+        lowest_menu.set(letters[-1])
+        
+        results = VirtualTable(
+            plan_window,
+            columns=PLAN_COLUMNS,
+            row_height=36,
+            empty_text="Enter a target CGPA and the credits of upcoming courses"
+        )
+        
+        def run_plan():
+            try:
+                target = float(target_entry.get().strip())
+                credits = [float(c) for c in credits_entry.get().replace(",", " ").split()]
+            except ValueError:
+                messagebox.showerror("Error", "Please enter a target CGPA and credit hours as numbers",
+                                     parent=plan_window)
+                return
             
-            ctk.CTkLabel(
-                header_frame,
-                text=f"Credits: {int(total_credits)}",
-                font=ctk.CTkFont(size=14)
-            ).pack(side="left", padx=10, pady=5)
+            lowest = self.grade_scale[lowest_menu.get()]
+            allowed = [g for g in letters if self.grade_scale[g] >= lowest]
+            try:
+                result = plan_grades(self.repository.totals()[1], credits, target, allowed)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e), parent=plan_window)
+                return
             
-            # Delete button
-            delete_btn = ctk.CTkButton(
-                header_frame,
-                text="Delete",
-                width=80,
-                command=lambda i=idx: self.delete_semester(i, history_window),
-                fg_color="#d32f2f",
-                hover_color="#b71c1c"
+            results.set_rows(
+                ('item', (
+                    f"Plan {n}",
+                    ", ".join(f"{grade} ({c:g})" for grade, c in zip(plan.grades, credits)),
+                    (f"{plan.gpa:.2f}", self.get_gpa_color(plan.gpa))
+                ))
+                for n, plan in enumerate(result.plans, 1)
             )
-            delete_btn.pack(side="right", padx=10, pady=5)
-            
-            # Courses
-            for course in semester['courses']:
-                course_text = f"  • {course['name']} - {course['credits']} credits - Grade: {course['grade']}"
-                ctk.CTkLabel(
-                    semester_frame,
-                    text=course_text,
-                    anchor="w"
-                ).pack(fill="x", padx=20, pady=2)
+            if not result.feasible:
+                messagebox.showinfo(
+                    "What-If",
+                    f"A CGPA of {target:.2f} is out of reach; the best possible is {result.best_gpa:.2f}",
+                    parent=plan_window
+                )
+        
+        ctk.CTkButton(
+            form,
+            text="Plan",
+            command=run_plan,
+            font=get_font(14, "bold"),
+            width=80
+        ).grid(row=0, column=6, padx=(10, 0), pady=5)
+        
+        results.pack(fill="both", expand=True, padx=20, pady=(10, 20))
     
     def delete_semester(self, index, window):
         """Delete a semester from history"""
         if messagebox.askyesno("Confirm", f"Delete semester '{self.semesters[index]['name']}'?"):
             self.semesters.pop(index)
+            self.totals.delete_semester(index)
+            self.save_data('delete_semester', index=index)
             self.calculate_gpa()
-            self.save_data()
             window.destroy()
             messagebox.showinfo("Success", "Semester deleted")
     
@@ -497,90 +573,108 @@ class GPACalculator(ctk.CTkFrame):
         
         filename = filedialog.asksaveasfilename(
             defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+            filetypes=[
+                ("Text files", "*.txt"), ("CSV files", "*.csv"),
+                ("JSON Lines files", "*.jsonl"), ("HTML files", "*.html"), ("All files", "*.*")
+            ]
         )
         
         if filename:
-            try:
-                with open(filename, 'w') as f:
-                    f.write("=" * 50 + "\n")
-                    f.write("GPA REPORT\n")
-                    f.write("=" * 50 + "\n\n")
-                    
-                    # Cumulative stats
-                    all_courses = []
-                    for semester in self.semesters:
-                        all_courses.extend(semester['courses'])
-                    all_courses.extend(self.current_semester_courses)
-                    
-                    if all_courses:
-                        cumulative_points = sum(c['credits'] * c['points'] for c in all_courses)
-                        cumulative_credits = sum(c['credits'] for c in all_courses)
-                        cumulative_gpa = cumulative_points / cumulative_credits
-                        
-                        f.write(f"Cumulative GPA: {cumulative_gpa:.2f}\n")
-                        f.write(f"Total Credits: {int(cumulative_credits)}\n\n")
-                    
-                    # Semesters
-                    for semester in self.semesters:
-                        f.write("-" * 50 + "\n")
-                        f.write(f"Semester: {semester['name']}\n")
-                        f.write("-" * 50 + "\n")
-                        
-                        total_points = sum(c['credits'] * c['points'] for c in semester['courses'])
-                        total_credits = sum(c['credits'] for c in semester['courses'])
-                        semester_gpa = total_points / total_credits
-                        
-                        f.write(f"Semester GPA: {semester_gpa:.2f}\n")
-                        f.write(f"Credits: {int(total_credits)}\n\n")
-                        
-                        for course in semester['courses']:
-                            f.write(f"  {course['name']}\n")
-                            f.write(f"    Credits: {course['credits']}, Grade: {course['grade']}, Points: {course['points']}\n")
-                        f.write("\n")
-                    
-                    # Current semester
-                    if self.current_semester_courses:
-                        f.write("-" * 50 + "\n")
-                        f.write("Current Semester (Unsaved)\n")
-                        f.write("-" * 50 + "\n")
-                        
-                        total_points = sum(c['credits'] * c['points'] for c in self.current_semester_courses)
-                        total_credits = sum(c['credits'] for c in self.current_semester_courses)
-                        semester_gpa = total_points / total_credits
-                        
-                        f.write(f"Semester GPA: {semester_gpa:.2f}\n")
-                        f.write(f"Credits: {int(total_credits)}\n\n")
-                        
-                        for course in self.current_semester_courses:
-                            f.write(f"  {course['name']}\n")
-                            f.write(f"    Credits: {course['credits']}, Grade: {course['grade']}, Points: {course['points']}\n")
-                
-                messagebox.showinfo("Success", f"Report exported to {filename}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to export report: {str(e)}")
+            # Stream the report in the background, reusing a copy of the running totals
+            self.executor.submit(
+                export_report, filename, list(self.semesters), self.current_semester_courses.copy(),
+                None, self.totals.copy(),
+                on_done=lambda _: messagebox.showinfo("Success", f"Report exported to {filename}"),
+                on_error=lambda e: messagebox.showerror("Error", f"Failed to export report: {str(e)}"),
+                group="export"
+            )
     
-    def save_data(self):
-        """Save data to JSON file"""
-        data = {
-            'semesters': self.semesters,
-            'current_courses': self.current_semester_courses
-        }
-        try:
-            with open(self.data_file, 'w') as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            print(f"Error saving data: {e}")
+    def import_csv(self):
+        """Import semesters from a GPA_Calculator_Data.csv-style file"""
+        filename = filedialog.askopenfilename(
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        
+        if filename:
+            self.executor.submit(
+                import_csv, filename,
+                on_done=self.apply_import,
+                on_error=lambda e: messagebox.showerror("Error", f"Failed to import CSV: {str(e)}"),
+                group="import"
+            )
     
-    def load_data(self):
-        """Load data from JSON file"""
-        if os.path.exists(self.data_file):
+    def apply_import(self, result):
+        """Add imported semesters and report skipped rows and failed checksums"""
+        semesters, report = result
+        for semester in semesters:
+            self.semesters.append(semester)
+            self.totals.add_semester(semester['courses'])
+            self.save_data('add_semester', semester=semester)
+        
+        if semesters:
+            self.calculate_gpa()
+        
+        problems = [str(e) for e in report.errors] + [str(c) for c in report.failed_checksums]
+        message = report.summary()
+        if problems:
+            shown = "\n".join(problems[:10])
+            more = f"\n...and {len(problems) - 10} more" if len(problems) > 10 else ""
+            messagebox.showwarning("Import", f"{message}\n\n{shown}{more}")
+        else:
+            messagebox.showinfo("Import", message)
+    
+    def save_data(self, op, **fields):
+        """Record one change with the store, in the background unless it must be read back"""
+        append = metrics.wrap("save_data", self.store.append, op)
+        if self.store.synchronous_writes:
             try:
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                    self.semesters = data.get('semesters', [])
-                    self.current_semester_courses = data.get('current_courses', [])
-                    self.update_course_list()
-                    self.calculate_gpa()
+                append(dict(fields, op=op))
             except Exception as e:
-                print(f"Error loading data: {e}")
+                print(f"Error saving data: {e}")
+            return
+        self.executor.submit(
+            append, dict(fields, op=op),
+            on_error=lambda e: print(f"Error saving data: {e}"),
+            group="save"
+        )
+    
+    def load_data(self):
+        """Load the data snapshot and replay the change log in the background"""
+        self.executor.submit(
+            metrics.wrap("load_data", self.store.load),
+            on_done=self.apply_data,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load data: {str(e)}"),
+            group="load"
+        )
+    
+    def apply_data(self, data):
+        """Show data loaded from disk and allow editing it"""
+        self.semesters, self.current_semester_courses = data
+        self.totals.rebuild(self.semesters, self.current_semester_courses)
+        self.update_course_list()
+        self.calculate_gpa()
+        self.set_editing(True)
+    
+    def set_editing(self, enabled):
+        """Enable or disable everything that changes data
+
+        Edits made before loading finishes would be replaced by the loaded
+        data, and after a failed load they would be logged on top of a log
+        that could not be replayed, so editing waits for a successful load.
+        """
+        self.loaded = enabled
+        for button in self.edit_buttons:
+            button.configure(state="normal" if enabled else "disabled")
+    
+    def destroy(self):
+        """Flush pending saves and stop background work before the widget goes away"""
+        self.executor.cancel("import")
+        self.executor.cancel("export")
+        self.executor.submit(self.store.close, group="save")
+        self.executor.shutdown(wait=True)
+        super().destroy()
+
+
+def course_row(name, credits, grade, points):
+    """Table row for a current-semester course"""
+    return ('row', (name, str(credits), grade, f"{points:.1f}"))
@@ -0,0 +1,227 @@
+"""
+Grade Scheme Module
+Configurable letter-grade tables and marks bands with precomputed lookups
+
+A scheme maps letter grades to points and marks out of 100 to points,
+and is loaded from a JSON file such as:
+
+    {
+        "name": "4.0",
+        "letters": {"A": 4.0, "A-": 3.7, "B+": 3.3, "B": 3.0, "F": 0.0},
+        "bands": [[50, 1.7], [55, 2.0], [60, 2.3], [85, 4.0]]
+    }
+
+Each band is [lowest marks, points] and runs up to the next band; marks
+below the first band get the scheme's lowest points. Band points must
+belong to a letter, since courses are stored by letter and imported
+marks become the letter with those points.
+
+Integer marks are converted through a precomputed 101-entry array and
+fractional marks with a binary search over the band edges; both have
+vectorized NumPy forms for converting many marks in one pass.
+
+One scheme is active at a time (use_scheme). Courses store a grade code
+per course and read their points through GRADE_POINTS, which is updated
+in place, so every stored course reports the active scheme's points.
+
+Saved data keeps each course's points next to its letter. A letter the
+active scheme lacks (data saved under another scheme) is mapped to the
+active letter with the nearest points (resolve_grade), so old data
+always loads.
+"""
+
+import bisect
+import json
+
+import numpy as np
+
+
+# Grade codes are uint8, so at most 256 distinct letters can ever be registered
+MAX_GRADES = 256
+
+# Every letter registered so far, indexed by grade code. Append-only, so
+# a code keeps its meaning when the active scheme changes
+GRADES = []
+_REGISTERED = {}
+
+# The active scheme, updated in place by use_scheme
+GRADE_SCALE = {}                                            # letter -> points
+GRADE_CODES = {}                                            # letter -> code
+GRADE_POINTS = np.full(MAX_GRADES, np.nan, dtype=np.float64)  # code -> points (NaN if inactive)
+
+_active = None
+
+
+class GradeScheme:
+    """Letter grades with their points, plus optional marks bands"""
+
+    def __init__(self, name, letters, bands=()):
+        self.name = name
+        self.letters = {str(letter): float(points) for letter, points in letters.items()}
+        if not self.letters:
+            raise ValueError(f"Grade scheme {name} has no letter grades")
+
+        # Marks become the first listed letter with the band's points
+        by_points = {}
+        for letter, points in self.letters.items():
+            by_points.setdefault(points, letter)
+
+        bands = sorted((float(marks), float(points)) for marks, points in bands)
+        if bands and bands[0][0] > 0:
+            bands.insert(0, (0.0, min(self.letters.values())))
+        edges = [marks for marks, _ in bands]
+        if len(set(edges)) != len(edges):
+            raise ValueError(f"Grade scheme {name} has two bands starting at the same marks")
+        for marks, points in bands:
+            if not 0 <= marks <= 100:
+                raise ValueError(f"Band at {marks:g} marks is outside 0-100")
+            if points not in by_points:
+                raise ValueError(f"Band at {marks:g} marks gives {points:g} points, "
+                                 f"which no letter grade in {name} has")
+        self.bands = bands
+
+        self._edges = edges
+        self._band_points = [points for _, points in bands]
+        self.band_grades = [by_points[points] for points in self._band_points]
+        self.band_marks = np.array(edges, dtype=np.float64)
+        self.band_points = np.array(self._band_points, dtype=np.float64)
+        if bands:
+            # Band of every integer mark 0-100, and the points it gives
+            self.band_table = np.searchsorted(self.band_marks, np.arange(101), side='right') - 1
+            self.marks_table = self.band_points[self.band_table]
+            self._table = self.marks_table.tolist()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config.get('name', "custom"), config['letters'], config.get('bands', ()))
+
+    def to_config(self):
+        bands = [[marks, points] for marks, points in self.bands]
+        return {'name': self.name, 'letters': dict(self.letters), 'bands': bands}
+
+    @property
+    def key(self):
+        """String identifying the letter points, e.g. to detect a scheme change"""
+        return json.dumps(self.letters, sort_keys=True)
+
+    # Single marks
+
+    def _band(self, marks):
+        if not self.bands:
+            raise ValueError(f"Grade scheme {self.name} has no marks bands")
+        if not 0 <= marks <= 100:
+            raise ValueError(f"marks must be between 0 and 100, got {marks}")
+        return bisect.bisect_right(self._edges, marks) - 1
+
+    def points_for_marks(self, marks):
+        """Grade points for a mark out of 100"""
+        if 0 <= marks <= 100 and marks == int(marks) and self.bands:
+            return self._table[int(marks)]
+        return self._band_points[self._band(marks)]
+
+    def grade_for_marks(self, marks):
+        """Letter grade for a mark out of 100"""
+        return self.band_grades[self._band(marks)]
+
+    # Arrays of marks
+
+    def band_indices(self, marks):
+        """Band of each mark, in one vectorized pass"""
+        if not self.bands:
+            raise ValueError(f"Grade scheme {self.name} has no marks bands")
+        marks = np.asarray(marks)
+        if marks.size and not (marks.min() >= 0 and marks.max() <= 100):
+            raise ValueError("marks must be between 0 and 100")
+        if np.issubdtype(marks.dtype, np.integer):
+            return self.band_table[marks]
+        return np.searchsorted(self.band_marks, marks, side='right') - 1
+
+    def points_for_marks_array(self, marks):
+        """Grade points for an array of marks"""
+        return self.band_points[self.band_indices(marks)]
+
+    def grade_codes_for_marks(self, marks):
+        """Grade codes (see GRADES) for an array of marks"""
+        codes = np.array([grade_code(letter) for letter in self.band_grades], dtype=np.uint8)
+        return codes[self.band_indices(marks)]
+
+    def __repr__(self):
+        return f"GradeScheme({self.name!r}, {len(self.letters)} letters, {len(self.bands)} bands)"
+
+
+def load_scheme(path):
+    """Read a grade scheme from a JSON file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return GradeScheme.from_config(json.load(f))
+
+
+def grade_code(letter):
+    """Code of a letter, registering it if it is new"""
+    code = _REGISTERED.get(letter)
+    if code is None:
+        if len(GRADES) >= MAX_GRADES:
+            raise ValueError(f"More than {MAX_GRADES} distinct letter grades")
+        code = len(GRADES)
+        GRADES.append(letter)
+        _REGISTERED[letter] = code
+    return code
+
+
+def resolve_grade(letter, points=None):
+    """Code of the active letter a stored course's grade maps to
+
+    Active letters map to themselves. Any other letter maps to the active
+    letter with the nearest points (the first listed among ties), using
+    the points stored with the course, or for data saved before points
+    were stored, the letter's points on the default 4.0 scale.
+    """
+    code = GRADE_CODES.get(letter)
+    if code is not None:
+        return code
+    if points is None or points != points:
+        points = DEFAULT_SCHEME.letters.get(letter)
+        if points is None:
+            raise ValueError(f"Unknown grade: {letter}")
+    nearest = min(GRADE_SCALE, key=lambda grade: abs(GRADE_SCALE[grade] - points))
+    return GRADE_CODES[nearest]
+
+
+def current_scheme():
+    return _active
+
+
+def use_scheme(scheme):
+    """Make scheme the active one and return the previous scheme
+
+    Courses already in memory report the new points immediately; running
+    totals derived from them (GPAAggregates) must be rebuilt by the caller.
+    """
+    global _active
+    points = np.full(MAX_GRADES, np.nan, dtype=np.float64)
+    for letter, value in scheme.letters.items():
+        points[grade_code(letter)] = value
+    GRADE_POINTS[:] = points
+
+    GRADE_SCALE.clear()
+    GRADE_SCALE.update(scheme.letters)
+    GRADE_CODES.clear()
+    GRADE_CODES.update((letter, _REGISTERED[letter]) for letter in scheme.letters)
+
+    previous, _active = _active, scheme
+    return previous
+
+
+DEFAULT_SCHEME = GradeScheme(
+    "4.0",
+    {
+        'A': 4.0, 'A-': 3.7,
+        'B+': 3.3, 'B': 3.0, 'B-': 2.7,
+        'C+': 2.3, 'C': 2.0, 'C-': 1.7,
+        'D+': 1.3, 'D': 1.0,
+        'F': 0.0
+    },
+    # Lowest marks for each grade point value; below 50 is an F
+    [(50, 1.7), (55, 2.0), (60, 2.3), (65, 2.7), (70, 3.0), (75, 3.3), (80, 3.7), (85, 4.0)]
+)
+
+use_scheme(DEFAULT_SCHEME)
@@ -0,0 +1,387 @@
+"""
+History Module
+Calculation history: a ring buffer of recent entries over an append-only log
+
+    python history.py search "sin("
+    python history.py replay 100 200
+
+Every evaluation is recorded with its expression, result, angle mode and
+timestamp. record() only touches memory; pending entries are written to
+the JSON Lines log in batches by flush(), which the calculator runs on a
+background thread, so recording never waits for the disk.
+
+Older entries live only in the log and are read back by byte offset.
+A trigram index over "expression = result" maps every three-character
+sequence to the (ascending) entry numbers containing it, so substring
+and prefix searches over hundreds of thousands of entries only look at
+candidate entries.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from array import array
+from collections import deque
+
+import numpy as np
+
+from engine import CalculatorEngine
+
+
+RING_SIZE = 1000
+DEFAULT_LIMIT = 100
+HISTORY_FILE = "calculator_history.jsonl"
+
+
+class HistoryEntry:
+    """One evaluation; seq is its position in the history"""
+
+    __slots__ = ('seq', 'timestamp', 'expression', 'result', 'angle_mode')
+
+    def __init__(self, seq, timestamp, expression, result, angle_mode):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.expression = expression
+        self.result = result
+        self.angle_mode = angle_mode
+
+    @property
+    def text(self):
+        """The searchable form, e.g. "sin(30) = 0.5" """
+        return f"{self.expression} = {self.result}"
+
+    def to_json(self):
+        return json.dumps({'t': self.timestamp, 'expr': self.expression,
+                           'result': self.result, 'mode': self.angle_mode}, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, seq, line):
+        data = json.loads(line)
+        return cls(seq, data['t'], data['expr'], data['result'], data['mode'])
+
+    def __repr__(self):
+        return f"HistoryEntry({self.seq}, {self.text!r}, {self.angle_mode})"
+
+
+def trigrams(text):
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def build_index(texts):
+    """Trigram index of many texts at once: {trigram: array of text numbers}
+
+    Builds the same index as adding the texts one by one, with NumPy: the
+    lowered texts are joined and every trigram is packed into one int64
+    (three 21-bit code points), then a stable sort groups the text
+    numbers by trigram.
+    """
+    lowered = [text.lower() for text in texts]
+    lengths = np.array([len(text) for text in lowered], dtype=np.int64)
+    if not len(lengths) or lengths.max() < 3:
+        return {}
+    # Texts are joined with a separator, which every trigram check below excludes
+    codes = np.frombuffer("\0".join(lowered).encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+    grams = (codes[:-2] << 42) | (codes[1:-1] << 21) | codes[2:]
+    seqs = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths + 1)[:len(grams)]
+    starts = np.cumsum(lengths + 1) - (lengths + 1)
+    valid = np.arange(len(grams)) - starts[seqs] <= lengths[seqs] - 3
+    grams = grams[valid]
+    seqs = seqs[valid]
+
+    # Stable sort: text numbers stay ascending within each trigram
+    order = np.argsort(grams, kind='stable')
+    grams = grams[order]
+    seqs = seqs[order]
+    keep = np.ones(len(grams), dtype=bool)
+    keep[1:] = (grams[1:] != grams[:-1]) | (seqs[1:] != seqs[:-1])
+    grams = grams[keep]
+    seqs = seqs[keep].astype(np.uint32)
+
+    index = {}
+    bounds = np.concatenate(([0], np.flatnonzero(np.diff(grams)) + 1, [len(grams)])).tolist()
+    mask = (1 << 21) - 1
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        code = int(grams[start])
+        gram = chr(code >> 42) + chr((code >> 21) & mask) + chr(code & mask)
+        postings = index[gram] = array('I')
+        postings.frombytes(seqs[start:end].tobytes())
+    return index
+
+
+def parse_lines(raw):
+    """(timestamp, expression, result, angle mode) of each log line
+
+    A line that is not a valid entry gives None. A clean log is parsed
+    with a single json.loads call over all lines.
+    """
+    try:
+        records = json.loads(b"[" + b",".join(raw) + b"]")
+        return [(data['t'], data['expr'], data['result'], data['mode']) for data in records]
+    except (ValueError, KeyError, TypeError):
+        pass
+    lines = []
+    for line in raw:
+        try:
+            data = json.loads(line)
+            lines.append((data['t'], data['expr'], data['result'], data['mode']))
+        except (ValueError, KeyError, TypeError):
+            lines.append(None)
+    return lines
+
+
+class CalculationHistory:
+    """Recent entries in memory, all entries in a log file, with a search index
+
+    The log is read by load(), normally in the background at startup.
+    Entries recorded before it finishes are kept in memory and renumbered
+    after the loaded ones; flush() does not write until then. All methods
+    are thread-safe.
+    """
+
+    def __init__(self, path=HISTORY_FILE, capacity=RING_SIZE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.recent = deque(maxlen=capacity)
+        self.offsets = array('q')       # log offset of each entry, -1 until written
+        self.index = {}                 # trigram -> array of entry numbers
+        self.pending = []
+        self.loaded = path is None
+        self.closed = False
+        self._writer = None
+        self._reader = None
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def _add(self, entry):
+        """Number and index an entry; the caller holds the lock"""
+        entry.seq = len(self.offsets)
+        self.offsets.append(-1)
+        for gram in trigrams(entry.text):
+            postings = self.index.get(gram)
+            if postings is None:
+                postings = self.index[gram] = array('I')
+            postings.append(entry.seq)
+        self.recent.append(entry)
+
+    def record(self, expression, result, angle_mode, timestamp=None):
+        """Add an evaluation; it is written to the log by the next flush()"""
+        entry = HistoryEntry(0, time.time() if timestamp is None else timestamp,
+                             expression, result, angle_mode)
+        with self.lock:
+            self._add(entry)
+            if self.path is not None:
+                self.pending.append(entry)
+        return entry
+
+    def load(self):
+        """Read the log, index it and put entries recorded meanwhile after it"""
+        lines = []
+        offsets = array('q')
+        if self.path is not None and os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            end = data.rfind(b"\n") + 1
+            raw = data[:end].split(b"\n")[:-1]
+            lines = parse_lines(raw)
+            sizes = np.array([len(line) + 1 for line in raw], dtype=np.int64)
+            starts = np.cumsum(sizes) - sizes
+            valid = np.array([fields is not None for fields in lines], dtype=bool)
+            if not valid.all():
+                # Skip corrupt lines but keep them and everything after them on disk
+                print(f"Skipping {len(lines) - int(valid.sum())} unreadable entries in {self.path}")
+                lines = [fields for fields in lines if fields is not None]
+                starts = starts[valid]
+            offsets.frombytes(starts.tobytes())
+            # Drop a torn final line (no newline) so new entries start on a fresh line
+            if end < len(data):
+                with open(self.path, 'r+b') as f:
+                    f.truncate(end)
+
+        index = build_index([f"{expression} = {result}" for _, expression, result, _ in lines])
+        recent = [HistoryEntry(seq, *fields)
+                  for seq, fields in enumerate(lines[-self.recent.maxlen:], len(lines) - len(lines[-self.recent.maxlen:]))]
+
+        with self.lock:
+            if self.closed:
+                return 0
+            # Nothing is flushed before loading, so pending holds every entry
+            # recorded so far; they are renumbered after the loaded ones
+            self.recent.clear()
+            self.recent.extend(recent)
+            self.offsets = offsets
+            self.index = index
+            for entry in self.pending:
+                self._add(entry)
+            self.loaded = True
+        return len(lines)
+
+    def flush(self):
+        """Write pending entries to the log in one batch"""
+        with self.lock:
+            if not self.loaded or self.closed or not self.pending or self.path is None:
+                return 0
+            if self._writer is None:
+                self._writer = open(self.path, 'ab')
+            offset = self._writer.seek(0, os.SEEK_END)
+            lines = []
+            for entry in self.pending:
+                line = (entry.to_json() + "\n").encode('utf-8')
+                self.offsets[entry.seq] = offset
+                offset += len(line)
+                lines.append(line)
+            self._writer.write(b"".join(lines))
+            self._writer.flush()
+            count = len(self.pending)
+            self.pending = []
+        return count
+
+    def close(self):
+        self.flush()
+        with self.lock:
+            self.closed = True
+            for f in (self._writer, self._reader):
+                if f is not None:
+                    f.close()
+            self._writer = self._reader = None
+
+    # Reading
+
+    def _entry(self, seq):
+        """An entry by number, from memory or the log; the caller holds the lock
+
+        Returns None for an entry that left the ring buffer of a history
+        without a log file.
+        """
+        first = len(self.offsets) - len(self.recent)
+        if seq >= first:
+            return self.recent[seq - first]
+        if self.offsets[seq] < 0:
+            if self.pending and seq >= self.pending[0].seq:
+                return self.pending[seq - self.pending[0].seq]
+            return None
+        if self._reader is None:
+            self._reader = open(self.path, 'rb')
+        self._reader.seek(self.offsets[seq])
+        return HistoryEntry.from_json(seq, self._reader.readline())
+
+    def entry(self, seq):
+        with self.lock:
+            if not 0 <= seq < len(self.offsets):
+                raise IndexError("history index out of range")
+            entry = self._entry(seq)
+        if entry is None:
+            raise IndexError(f"history entry {seq} is no longer in memory")
+        return entry
+
+    def entries(self, start=0, stop=None):
+        """Entries start..stop-1, oldest first"""
+        with self.lock:
+            start, stop, _ = slice(start, stop).indices(len(self.offsets))
+            entries = [self._entry(seq) for seq in range(start, stop)]
+        return [entry for entry in entries if entry is not None]
+
+    def _candidates(self, query):
+        """Entry numbers that may contain query, ascending; the caller holds the lock
+
+        Returns (numbers, exact), exact meaning every number is a match.
+        """
+        query = query.lower()
+        if not query:
+            return range(len(self.offsets)), True
+        if len(query) >= 3:
+            postings = [self.index.get(gram) for gram in trigrams(query)]
+            if any(p is None for p in postings):
+                return [], False
+            postings.sort(key=len)
+            candidates = np.array(postings[0], dtype=np.uint32)
+            for other in postings[1:]:
+                candidates = np.intersect1d(candidates, np.frombuffer(other, dtype=np.uint32),
+                                            assume_unique=True)
+            # Every trigram matching does not yet mean the whole query matches
+            return candidates.tolist(), False
+        # Every searchable text is longer than two characters, so a short
+        # query occurs exactly where some trigram containing it occurs
+        found = np.zeros(len(self.offsets), dtype=bool)
+        for gram, postings in self.index.items():
+            if query in gram:
+                found[np.frombuffer(postings, dtype=np.uint32)] = True
+        return np.flatnonzero(found).tolist(), True
+
+    def search(self, query, limit=DEFAULT_LIMIT, prefix=False):
+        """Newest entries whose "expression = result" contains query
+
+        With prefix=True only expressions starting with query match.
+        Matching is case-insensitive.
+        """
+        needle = query.lower()
+        with self.lock:
+            candidates, exact = self._candidates(query)
+            matches = []
+            for seq in reversed(candidates):
+                entry = self._entry(seq)
+                if entry is None:
+                    continue
+                if prefix:
+                    if not entry.expression.lower().startswith(needle):
+                        continue
+                elif not exact and needle not in entry.text.lower():
+                    continue
+                matches.append(entry)
+                if len(matches) >= limit:
+                    break
+        return matches
+
+    # Replay
+
+    def replay(self, start=0, stop=None, engine=None):
+        """Re-evaluate entries start..stop-1, returning [(entry, new result)]
+
+        Each expression runs through a CalculatorEngine (a fresh one unless
+        given) in the angle mode it was recorded with, e.g. to check old
+        results after switching numeric backend.
+        """
+        engine = engine or CalculatorEngine()
+        results = []
+        for entry in self.entries(start, stop):
+            engine.set_angle_mode(entry.angle_mode)
+            results.append((entry, engine.evaluate(entry.expression)))
+        return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search or replay the calculator history.")
+    parser.add_argument("--file", default=HISTORY_FILE, help="history log (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    search = commands.add_parser("search", help="list the newest entries containing a text")
+    search.add_argument("query")
+    search.add_argument("--prefix", action="store_true", help="match the start of the expression only")
+    search.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    replay = commands.add_parser("replay", help="re-evaluate a range of entries")
+    replay.add_argument("start", type=int)
+    replay.add_argument("stop", type=int, nargs="?")
+    args = parser.parse_args(argv)
+
+    history = CalculationHistory(args.file)
+    history.load()
+    if args.command == "search":
+        for entry in history.search(args.query, args.limit, args.prefix):
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry.timestamp))
+            print(f"{entry.seq:>8}  {stamp}  {entry.angle_mode}  {entry.text}")
+    else:
+        changed = 0
+        for entry, result in history.replay(args.start, args.stop):
+            mark = "" if result == entry.result else f"   (was {entry.result})"
+            changed += bool(mark)
+            print(f"{entry.seq:>8}  {entry.expression} = {result}{mark}")
+        print(f"{changed} result(s) changed", file=sys.stderr)
+    history.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
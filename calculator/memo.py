@@ -0,0 +1,249 @@
+"""
+Memo Module
+Opt-in memoization of scientific function results
+
+Scripted workloads apply the same functions to the same values over and
+over (sin(30), log(2), 10^x tables). When enabled, results are kept in
+one bounded cache shared by everything in the process: the calculator
+UI, the expression evaluator and the command line all go through
+operations.scientific_function or a numeric backend, which look results
+up here first.
+
+    import memo
+    memo.enable(maxsize=4096, policy='lfu')
+    ...
+    memo.cache_info()   # CacheInfo(hits=..., misses=..., evictions=..., ...)
+
+A result is keyed by the numeric backend (and its precision), the
+operation, the exact input value and, for sin/cos/tan only, the angle
+mode. Only operations registered as pure are cached, and only values
+are stored: an operation that raises raises again on every call, and
+NaN is never stored. All caches are thread-safe; a lookup never waits
+for another thread's computation.
+"""
+
+import math
+import threading
+from collections import OrderedDict, namedtuple
+from decimal import Decimal
+
+
+DEFAULT_SIZE = 4096
+
+CacheInfo = namedtuple('CacheInfo', 'hits misses evictions maxsize currsize policy')
+
+_MISSING = object()
+
+
+def normalize(value):
+    """Hashable key for a number, or None if it should not be cached
+
+    Equal keys must give identical results, so the type is part of the
+    key (1, 1.0 and True differ), Decimals keep their exponent (1.0 and 1
+    differ) and -0.0 is kept apart from 0.0.
+    """
+    if isinstance(value, Decimal):
+        return None if value.is_nan() else value.as_tuple()
+    if isinstance(value, float):
+        if value != value:
+            return None
+        if value == 0:
+            return (float, value, math.copysign(1.0, value))
+    return (value.__class__, value)
+
+
+def _is_nan(result):
+    if isinstance(result, Decimal):
+        return result.is_nan()
+    return isinstance(result, float) and result != result
+
+
+class _ResultCache:
+    """Bounded result cache; subclasses decide which entry to evict"""
+
+    policy = None
+
+    def __init__(self, maxsize=DEFAULT_SIZE):
+        if maxsize < 1:
+            raise ValueError(f"Cache size must be positive, got {maxsize}")
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def call(self, key, compute, *args):
+        """Return the cached result for key, or compute(*args) and store it
+
+        The computation runs outside the lock, so two threads missing the
+        same key may both compute it; the first result is kept. Exceptions
+        propagate and nothing is stored.
+        """
+        with self.lock:
+            result = self._get(key)
+            if result is not _MISSING:
+                self.hits += 1
+                return result
+            self.misses += 1
+        result = compute(*args)
+        if not _is_nan(result):
+            with self.lock:
+                if self._put(key, result):
+                    self.evictions += 1
+        return result
+
+    def info(self):
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, self.evictions,
+                             self.maxsize, len(self), self.policy)
+
+    def clear(self):
+        """Discard all results and reset the counters"""
+        with self.lock:
+            self._clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+class LRUCache(_ResultCache):
+    """Evicts the least recently used result"""
+
+    policy = 'lru'
+
+    def __init__(self, maxsize=DEFAULT_SIZE):
+        super().__init__(maxsize)
+        self._values = OrderedDict()
+
+    def __len__(self):
+        return len(self._values)
+
+    def _get(self, key):
+        result = self._values.get(key, _MISSING)
+        if result is not _MISSING:
+            self._values.move_to_end(key)
+        return result
+
+    def _put(self, key, result):
+        """Store a result; returns whether another one was evicted"""
+        if key in self._values:
+            return False
+        self._values[key] = result
+        if len(self._values) > self.maxsize:
+            self._values.popitem(last=False)
+            return True
+        return False
+
+    def _clear(self):
+        self._values.clear()
+
+
+class LFUCache(_ResultCache):
+    """Evicts the least frequently used result, the oldest among ties
+
+    Keys are grouped by use count, each group in insertion order, so
+    every operation is O(1).
+    """
+
+    policy = 'lfu'
+
+    def __init__(self, maxsize=DEFAULT_SIZE):
+        super().__init__(maxsize)
+        self._values = {}
+        self._counts = {}
+        self._by_count = {}         # use count -> OrderedDict of keys
+        self._min_count = 0
+
+    def __len__(self):
+        return len(self._values)
+
+    def _get(self, key):
+        result = self._values.get(key, _MISSING)
+        if result is not _MISSING:
+            count = self._counts[key]
+            group = self._by_count[count]
+            del group[key]
+            if not group:
+                del self._by_count[count]
+                if self._min_count == count:
+                    self._min_count = count + 1
+            self._counts[key] = count + 1
+            self._by_count.setdefault(count + 1, OrderedDict())[key] = None
+        return result
+
+    def _put(self, key, result):
+        """Store a result; returns whether another one was evicted"""
+        if key in self._values:
+            return False
+        evicted = False
+        if len(self._values) >= self.maxsize:
+            group = self._by_count[self._min_count]
+            old, _ = group.popitem(last=False)
+            if not group:
+                del self._by_count[self._min_count]
+            del self._values[old]
+            del self._counts[old]
+            evicted = True
+        self._values[key] = result
+        self._counts[key] = 1
+        self._by_count.setdefault(1, OrderedDict())[key] = None
+        self._min_count = 1
+        return evicted
+
+    def _clear(self):
+        self._values.clear()
+        self._counts.clear()
+        self._by_count.clear()
+        self._min_count = 0
+
+
+POLICIES = {'lru': LRUCache, 'lfu': LFUCache}
+
+# The shared cache; None while memoization is off
+_cache = None
+
+
+def enable(maxsize=DEFAULT_SIZE, policy='lru'):
+    """Start memoizing with a new, empty shared cache and return it"""
+    global _cache
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown cache policy: {policy}")
+    _cache = POLICIES[policy](maxsize)
+    return _cache
+
+
+def disable():
+    """Stop memoizing and drop the shared cache"""
+    global _cache
+    _cache = None
+
+
+def shared_cache():
+    """The shared cache, or None if memoization is off"""
+    return _cache
+
+
+def cache_info():
+    """Hit/miss/eviction counters of the shared cache (None if off)"""
+    cache = _cache
+    return None if cache is None else cache.info()
+
+
+def clear_cache():
+    cache = _cache
+    if cache is not None:
+        cache.clear()
+
+
+def call(scope, operation, value, angle_mode, compute):
+    """compute(value, angle_mode), through the shared cache if enabled
+
+    compute implements operation; scope identifies the numeric backend
+    and its precision, e.g. 'float' or ('decimal', 28).
+    """
+    cache = _cache
+    if cache is None or not operation.pure:
+        return compute(value, angle_mode)
+    normalized = normalize(value)
+    if normalized is None:
+        return compute(value, angle_mode)
+    mode = ('deg' if angle_mode == 'deg' else 'rad') if operation.uses_angle else None
+    return cache.call((scope, operation, normalized, mode), compute, value, angle_mode)
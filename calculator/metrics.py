@@ -0,0 +1,309 @@
+"""
+Metrics Module
+Opt-in latency histograms, counters and profiling hooks
+
+    import metrics
+    metrics.enable()
+    ...
+    metrics.snapshot()                  # {"series": [{"name": "calculate_gpa", "p95": ...}]}
+    metrics.write_json("metrics.json")
+    metrics.serve(9464)                 # http://127.0.0.1:9464/metrics (Prometheus text)
+
+Hot paths are wrapped with @timed(name) or wrap(name, func). While
+metrics are off (the default) a wrapped call costs one flag check;
+while on, every call is timed into a histogram per (name, operation),
+e.g. ("scientific_function", "sin"), whose count doubles as the
+counter for that operation.
+
+Histograms have fixed buckets, ten per decade from 1 µs to 100 s, so
+recording is O(1) with constant memory and p50/p95/p99 are read back
+within about 12%. The same buckets are exported as a Prometheus
+histogram.
+
+start_profile()/stop_profile() run cProfile around one interaction of
+the calling (UI) thread; work done in background threads is not
+included.
+
+The HTTP server and profiler are imported on first use, so importing
+this module adds next to nothing to startup.
+"""
+
+import bisect
+import functools
+import json
+import threading
+from time import perf_counter
+
+
+PREFIX = "calculator"
+QUANTILES = (0.5, 0.95, 0.99)
+PROFILE_FILE = "calculator_profile.prof"
+
+# Upper bounds of the histogram buckets in seconds; one more bucket holds the rest
+BOUNDS = [10 ** (exponent / 10) for exponent in range(-60, 21)]
+
+_enabled = False
+_lock = threading.Lock()
+_histograms = {}    # (name, op) -> Histogram
+_counters = {}      # (name, op) -> count
+_profiler = None
+
+
+class Histogram:
+    """Counts of observed durations per bucket, plus count, sum, min and max"""
+
+    __slots__ = ('counts', 'count', 'sum', 'min', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BOUNDS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BOUNDS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Estimated q-quantile in seconds (0.0 if nothing was observed)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = BOUNDS[i - 1] if i > 0 else 0.0
+                upper = BOUNDS[i] if i < len(BOUNDS) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / n
+                return min(max(estimate, self.min), self.max)
+            seen += n
+        return self.max
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def enabled():
+    return _enabled
+
+
+def reset():
+    """Forget everything recorded so far"""
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+# Recording
+
+def observe(name, seconds, op=None):
+    """Record one duration of name (for operation op)"""
+    with _lock:
+        histogram = _histograms.get((name, op))
+        if histogram is None:
+            histogram = _histograms[(name, op)] = Histogram()
+        histogram.observe(seconds)
+
+
+def increment(name, op=None, amount=1):
+    """Add to a counter, e.g. of errors by kind (only while enabled)"""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[(name, op)] = _counters.get((name, op), 0) + amount
+
+
+def timed(name, label=None):
+    """Decorator timing every call while metrics are enabled
+
+    label(*args) names the operation type of a call (e.g. the scientific
+    function); it is evaluated before the call.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            op = label(*args) if label is not None else None
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, perf_counter() - start, op)
+        return wrapper
+    return decorate
+
+
+def wrap(name, func, op=None):
+    """func itself while metrics are off, else func timed as name
+
+    For work handed to another thread, e.g. executor.submit(wrap("save_data", store.append), ...).
+    """
+    if not _enabled:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            observe(name, perf_counter() - start, op)
+    return wrapper
+
+
+# Export
+
+def snapshot():
+    """Everything recorded so far, with durations in seconds"""
+    with _lock:
+        histograms = [(key, h.count, h.sum, h.min, h.max, [h.quantile(q) for q in QUANTILES])
+                      for key, h in sorted(_histograms.items(), key=_sort_key)]
+        counters = sorted(_counters.items(), key=_sort_key)
+    series = []
+    for (name, op), count, total, low, high, quantiles in histograms:
+        entry = {'name': name, 'op': op, 'count': count, 'sum': total,
+                 'mean': total / count, 'min': low, 'max': high}
+        entry.update((f"p{round(q * 100)}", value) for q, value in zip(QUANTILES, quantiles))
+        series.append(entry)
+    return {
+        'enabled': _enabled,
+        'series': series,
+        'counters': [{'name': name, 'op': op, 'count': count} for (name, op), count in counters],
+    }
+
+
+def _sort_key(item):
+    name, op = item[0]
+    return name, op or ""
+
+
+def write_json(path):
+    """Write snapshot() to a JSON file"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot(), f, indent=2)
+
+
+def _labels(op, **extra):
+    labels = {} if op is None else {'op': op}
+    labels.update(extra)
+    if not labels:
+        return ""
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+def prometheus_text():
+    """Everything recorded so far in the Prometheus text exposition format"""
+    with _lock:
+        histograms = [(key, list(h.counts), h.count, h.sum)
+                      for key, h in sorted(_histograms.items(), key=_sort_key)]
+        counters = sorted(_counters.items(), key=_sort_key)
+
+    lines = []
+    declared = set()
+    for (name, op), counts, count, total in histograms:
+        metric = f"{PREFIX}_{name}_seconds"
+        if metric not in declared:
+            declared.add(metric)
+            lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for bound, n in zip(BOUNDS, counts):
+            cumulative += n
+            lines.append(f"{metric}_bucket{_labels(op, le=f'{bound:.3g}')} {cumulative}")
+        lines.append(f"{metric}_bucket{_labels(op, le='+Inf')} {count}")
+        lines.append(f"{metric}_sum{_labels(op)} {total!r}")
+        lines.append(f"{metric}_count{_labels(op)} {count}")
+    for (name, op), count in counters:
+        metric = f"{PREFIX}_{name}_total"
+        if metric not in declared:
+            declared.add(metric)
+            lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric}{_labels(op)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def serve(port=9464, host="127.0.0.1"):
+    """Serve /metrics on a local port from a daemon thread; returns the server
+
+    Call shutdown() on it to stop. port=0 picks a free port
+    (server.server_address[1]).
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = prometheus_text().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+# Profiling
+
+def profiling():
+    return _profiler is not None
+
+
+def start_profile():
+    """Start profiling the calling thread"""
+    global _profiler
+    if _profiler is None:
+        import cProfile
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+
+def stop_profile(path=PROFILE_FILE, top=20):
+    """Stop profiling, save the stats to path and return the top entries as text
+
+    Returns None if no profile was running. The saved file can be
+    inspected with `python -m pstats`.
+    """
+    global _profiler
+    if _profiler is None:
+        return None
+    profiler, _profiler = _profiler, None
+    profiler.disable()
+    if path is not None:
+        profiler.dump_stats(path)
+    import io
+    import pstats
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(top)
+    return out.getvalue()
+
+
+def toggle_profile(path=PROFILE_FILE):
+    """Start profiling, or stop and return the report if already running"""
+    if _profiler is None:
+        start_profile()
+        return None
+    return stop_profile(path)
@@ -0,0 +1,168 @@
+"""
+Operations Module
+Registry of numeric operations shared by the engine, expression parser and UI
+"""
+
+import math
+
+import bignum
+import memo
+
+
+CONSTANTS = {'pi': math.pi, 'e': math.e}
+
+
+def format_number(num):
+    """Format number for display"""
+    if bignum.is_large(num):
+        return bignum.format_scientific(num)
+    if isinstance(num, int) or (isinstance(num, float) and num.is_integer()):
+        return str(int(num))
+    else:
+        # Round to 10 decimal places and remove trailing zeros
+        formatted = f"{num:.10f}".rstrip('0').rstrip('.')
+        return formatted
+
+
+def cube_root(x):
+    """Real cube root, negative for negative x"""
+    if hasattr(math, 'cbrt'):
+        return math.cbrt(x)
+    return math.copysign(abs(x) ** (1/3), x)
+
+
+def to_radians(value, angle_mode):
+    """Convert an angle to radians according to the angle mode"""
+    return math.radians(value) if angle_mode == 'deg' else value
+
+
+class Operation:
+    """A registered operation: implementation, arity, domain check and button label
+
+    pure means the result depends only on the arguments (and the angle
+    mode), so it may be memoized.
+    """
+
+    __slots__ = ('key', 'arity', 'func', 'domain', 'error', 'label', 'uses_angle', 'pure')
+
+    def __init__(self, key, arity, func, domain=None, error=ValueError,
+                 label=None, uses_angle=False, pure=True):
+        self.key = key
+        self.arity = arity
+        self.func = func
+        self.domain = domain
+        self.error = error
+        self.label = label or key
+        self.uses_angle = uses_angle
+        self.pure = pure
+
+    def __call__(self, *args, angle_mode="deg"):
+        if len(args) != self.arity:
+            raise TypeError(f"{self.key} takes {self.arity} argument(s), got {len(args)}")
+        if self.domain is not None and not self.domain(*args):
+            raise self.error(f"{self.key}: math domain error")
+        if self.uses_angle:
+            args = (to_radians(args[0], angle_mode),) + args[1:]
+        return self.func(*args)
+
+    def __repr__(self):
+        return f"Operation({self.key!r}, arity={self.arity}, label={self.label!r})"
+
+
+class OperationRegistry:
+    """Maps operation keys to Operation objects for O(1) dispatch"""
+
+    def __init__(self):
+        self._operations = {}
+
+    def register(self, key, arity, func=None, domain=None, error=ValueError,
+                 label=None, uses_angle=False, replace=False, pure=True):
+        """Register an operation; usable directly or as a decorator"""
+        if func is None:
+            def decorator(f):
+                self.register(key, arity, f, domain, error, label, uses_angle, replace, pure)
+                return f
+            return decorator
+
+        if key in self._operations and not replace:
+            raise ValueError(f"Operation already registered: {key}")
+        if arity not in (1, 2):
+            raise ValueError(f"Unsupported arity for {key}: {arity}")
+        operation = Operation(key, arity, func, domain, error, label, uses_angle, pure)
+        self._operations[key] = operation
+        return operation
+
+    def unregister(self, key):
+        """Remove an operation"""
+        del self._operations[key]
+
+    def get(self, key, arity=None):
+        """Look up an operation by key, optionally checking its arity"""
+        try:
+            operation = self._operations[key]
+        except KeyError:
+            raise ValueError(f"Unknown operation: {key}") from None
+        if arity is not None and operation.arity != arity:
+            raise ValueError(f"Operation {key} is not {'unary' if arity == 1 else 'binary'}")
+        return operation
+
+    def __contains__(self, key):
+        return key in self._operations
+
+    def __iter__(self):
+        return iter(self._operations.values())
+
+    def keys(self, arity=None):
+        """Return registered keys in registration order"""
+        return tuple(op.key for op in self._operations.values()
+                     if arity is None or op.arity == arity)
+
+    def is_unary(self, key):
+        """Check whether key names a registered unary function"""
+        operation = self._operations.get(key)
+        return operation is not None and operation.arity == 1
+
+
+REGISTRY = OperationRegistry()
+register = REGISTRY.register
+
+# Binary operations
+register('+', 2, lambda a, b: a + b)
+register('-', 2, lambda a, b: a - b)
+register('*', 2, lambda a, b: a * b, label='×')
+register('/', 2, lambda a, b: a / b, domain=lambda a, b: b != 0,
+         error=ZeroDivisionError, label='÷')
+register('^', 2, bignum.power, domain=lambda a, b: a != 0 or b >= 0,
+         error=ZeroDivisionError, label='xʸ')
+register('%', 2, lambda a, b: a % b, label='mod')
+
+# Scientific functions
+register('sin', 1, math.sin, uses_angle=True)
+register('cos', 1, math.cos, uses_angle=True)
+register('tan', 1, math.tan, uses_angle=True)
+register('log', 1, math.log10, domain=lambda x: x > 0)
+register('ln', 1, math.log, domain=lambda x: x > 0)
+register('sqrt', 1, math.sqrt, domain=lambda x: x >= 0, label='√')
+register('cbrt', 1, cube_root, label='∛')
+register('square', 1, lambda x: x ** 2, label='x²')
+register('cube', 1, lambda x: x ** 3, label='x³')
+register('reciprocal', 1, lambda x: 1 / x, domain=lambda x: x != 0,
+         error=ZeroDivisionError, label='1/x')
+register('factorial', 1, bignum.factorial, label='n!')
+register('abs', 1, abs, label='|x|')
+register('10x', 1, lambda x: bignum.power(10, x), label='10ˣ')
+register('2x', 1, lambda x: bignum.power(2, x), label='2ˣ')
+
+
+def binary_operation(op, prev, current):
+    """Apply a binary operation to two numbers"""
+    return REGISTRY.get(op, arity=2)(prev, current)
+
+
+def scientific_function(func, value, angle_mode="deg"):
+    """Apply a scientific function to a number (memoized if enabled, see memo)"""
+    operation = REGISTRY.get(func, arity=1)
+    if memo.shared_cache() is None:
+        return operation(value, angle_mode=angle_mode)
+    return memo.call('float', operation, value, angle_mode,
+                     lambda x, mode: operation(x, angle_mode=mode))
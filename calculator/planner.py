@@ -0,0 +1,161 @@
+"""
+Planner Module
+What-if planning: the least demanding grades that reach a target CGPA
+
+Given the cumulative totals so far, the credit hours of upcoming courses
+and the allowed letter grades, plan_grades() returns grade combinations
+whose resulting CGPA meets the target. Quality points are counted in
+integer hundredths and a subset-sum DP keeps, per course, a boolean
+NumPy array of the totals reachable so far; plans are then read back
+from those arrays in order of increasing total. Only minimal plans are
+returned (lowering any single grade would miss the target), and courses
+with equal credits are not reported in every permutation, so 10-30
+upcoming courses are planned in milliseconds.
+"""
+
+import math
+
+import numpy as np
+
+from course_store import GRADE_SCALE
+
+
+# Quality points are compared in hundredths
+SCALE = 100
+DEFAULT_LIMIT = 10
+
+
+class Plan:
+    """One letter grade per upcoming course and the CGPA it leads to"""
+
+    __slots__ = ('grades', 'points', 'gpa')
+
+    def __init__(self, grades, points, gpa):
+        self.grades = grades
+        self.points = points
+        self.gpa = gpa
+
+    def __repr__(self):
+        return f"Plan({', '.join(self.grades)} -> {self.gpa:.2f})"
+
+
+class PlanResult:
+    """Plans for a target, least demanding first (empty if out of reach)"""
+
+    __slots__ = ('target', 'required_points', 'best_gpa', 'plans')
+
+    def __init__(self, target, required_points, best_gpa, plans):
+        self.target = target
+        self.required_points = required_points
+        self.best_gpa = best_gpa
+        self.plans = plans
+
+    @property
+    def feasible(self):
+        return bool(self.plans)
+
+
+def plan_grades(cumulative, credits, target, grades=None, limit=DEFAULT_LIMIT):
+    """Minimal grade combinations for upcoming courses that reach a target CGPA
+
+    cumulative is the GradeTotals so far (e.g. repository.totals()[1]),
+    credits the credit hours of each upcoming course and grades the
+    allowed letters (default: every letter of the active grade scheme).
+    Each plan lists one letter per course, in the order of credits.
+    """
+    letters = list(GRADE_SCALE if grades is None else grades)
+    unknown = [grade for grade in letters if grade not in GRADE_SCALE]
+    if unknown:
+        raise ValueError(f"Unknown grade: {unknown[0]}")
+    if not letters:
+        raise ValueError("At least one grade must be allowed")
+    credits = [float(c) for c in credits]
+    if any(not (math.isfinite(c) and c > 0) for c in credits):
+        raise ValueError("Credit hours must be positive numbers")
+
+    # Grades in ascending points, so a grade's index is also its rank
+    letters = sorted(set(letters), key=GRADE_SCALE.get)
+    points = np.array([GRADE_SCALE[grade] for grade in letters])
+
+    total_credits = cumulative.credits + sum(credits)
+    required = target * total_credits - cumulative.points
+    best = sum(credits) * float(points[-1])
+    best_gpa = (cumulative.points + best) / total_credits if total_credits > 0 else 0.0
+    need = max(0, math.ceil(required * SCALE - 1e-6))
+
+    # Courses sorted by credits so that equal-credit courses are adjacent;
+    # gains[i, g] is what course i adds with grade g, in hundredths
+    order = sorted(range(len(credits)), key=lambda i: credits[i])
+    ordered = [credits[i] for i in order]
+    gains = np.rint(np.outer(ordered, points) * SCALE).astype(np.int64)
+
+    # reach[i][s]: some grades for the first i courses add exactly s
+    reach = [np.ones(1, dtype=bool)]
+    for row in gains:
+        previous = reach[-1]
+        current = np.zeros(len(previous) + int(row[-1]), dtype=bool)
+        for gain in np.unique(row).tolist():
+            current[gain:gain + len(previous)] |= previous
+        reach.append(current)
+
+    final = reach[-1]
+    totals = np.flatnonzero(final[need:]) + need if need < len(final) else []
+    if not len(totals):
+        return PlanResult(target, required, best_gpa, [])
+
+    # Past the largest one-step grade difference every plan could lower
+    # some grade and still reach the target, so none of them is minimal
+    steps = np.diff(gains, axis=1)
+    max_step = int(steps.max()) if steps.size else 0
+    lowest = int(gains[:, 0].sum())
+
+    def is_minimal(combo, total):
+        for i, g in enumerate(combo):
+            if g > 0 and total - gains[i, g] + gains[i, g - 1] >= need:
+                return False
+        return True
+
+    dead = set()
+
+    def walk(i, remaining, cap, chosen):
+        """Grade indices for courses 0..i-1 adding exactly remaining
+
+        Among equal-credit neighbours, grades never decrease, so each
+        combination is produced once rather than in every order.
+        """
+        if i == 0:
+            if remaining == 0:
+                yield chosen[::-1]
+            return
+        key = (i, remaining, cap)
+        if key in dead:
+            return
+        found = False
+        previous = reach[i - 1]
+        for g in range(cap, -1, -1):
+            rest = remaining - int(gains[i - 1, g])
+            if 0 <= rest < len(previous) and previous[rest]:
+                same = i >= 2 and ordered[i - 2] == ordered[i - 1]
+                for combo in walk(i - 1, rest, g if same else len(letters) - 1, chosen + [g]):
+                    found = True
+                    yield combo
+        if not found:
+            dead.add(key)
+
+    plans = []
+    for total in totals.tolist():
+        if total >= need + max_step and total > lowest:
+            break
+        for combo in walk(len(ordered), total, len(letters) - 1, []):
+            if not is_minimal(combo, total):
+                continue
+            course_grades = [None] * len(credits)
+            added = 0.0
+            for i, g in zip(order, combo):
+                course_grades[i] = letters[g]
+                added += credits[i] * float(points[g])
+            gpa = (cumulative.points + added) / total_credits if total_credits > 0 else 0.0
+            plans.append(Plan(tuple(course_grades), added, gpa))
+            if len(plans) >= limit:
+                return PlanResult(target, required, best_gpa, plans)
+    return PlanResult(target, required, best_gpa, plans)
@@ -0,0 +1,348 @@
+"""
+Repository Module
+Read access to GPA totals and history, from memory or from a SQLite database
+
+The GPA tab reads everything it displays through a repository:
+
+    totals()     (current semester GradeTotals, cumulative GradeTotals)
+    history()    [(semester name, GradeTotals, [(name, credits, grade, points), ...])]
+
+MemoryRepository answers from the tab's own data and running totals.
+SQLiteRepository answers with indexed SQL aggregates over one student's
+rows of a shared database, and also acts as the tab's store (load,
+append, close), so a department-wide database never has to fit in memory.
+"""
+
+import sqlite3
+import threading
+
+from aggregates import GradeTotals
+from course_store import GRADE_SCALE, CourseTable
+from grade_scheme import GRADES, current_scheme, resolve_grade
+
+
+DEFAULT_STUDENT = "default"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS semesters (
+    id INTEGER PRIMARY KEY,
+    student_id INTEGER NOT NULL REFERENCES students(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    is_current INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS courses (
+    id INTEGER PRIMARY KEY,
+    semester_id INTEGER NOT NULL REFERENCES semesters(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    credits REAL NOT NULL,
+    grade TEXT NOT NULL,
+    points REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS semesters_by_student ON semesters(student_id, is_current, position);
+CREATE INDEX IF NOT EXISTS courses_by_semester ON courses(semester_id, credits, points);
+"""
+
+# Totals per saved semester of one student, in order
+_SEMESTER_TOTALS = """
+SELECT s.id, s.name, COALESCE(SUM(c.credits), 0), COALESCE(SUM(c.credits * c.points), 0), COUNT(c.id)
+FROM semesters s LEFT JOIN courses c ON c.semester_id = s.id
+WHERE s.student_id = ? AND s.is_current = 0
+GROUP BY s.id
+ORDER BY s.position
+"""
+
+_CURRENT_TOTALS = """
+SELECT COALESCE(SUM(c.credits), 0), COALESCE(SUM(c.credits * c.points), 0), COUNT(c.id)
+FROM semesters s JOIN courses c ON c.semester_id = s.id
+WHERE s.student_id = ? AND s.is_current = 1
+"""
+
+_CUMULATIVE_TOTALS = """
+SELECT COALESCE(SUM(c.credits), 0), COALESCE(SUM(c.credits * c.points), 0), COUNT(c.id)
+FROM semesters s JOIN courses c ON c.semester_id = s.id
+WHERE s.student_id = ?
+"""
+
+# Courses of one student, tagged with their semester
+_COURSES = """
+SELECT s.id, s.is_current, c.name, c.credits, c.grade, c.points
+FROM semesters s JOIN courses c ON c.semester_id = s.id
+WHERE s.student_id = ?
+ORDER BY s.position, c.id
+"""
+
+# Cumulative totals for every student, e.g. for department reports
+_STUDENT_TOTALS = """
+SELECT st.name, COALESCE(SUM(c.credits), 0), COALESCE(SUM(c.credits * c.points), 0), COUNT(c.id)
+FROM students st
+LEFT JOIN semesters s ON s.student_id = st.id
+LEFT JOIN courses c ON c.semester_id = s.id
+GROUP BY st.id
+ORDER BY st.name
+"""
+
+
+class MemoryRepository:
+    """Repository over a GPA tab's in-memory semesters and running totals"""
+
+    def __init__(self, owner):
+        self.owner = owner
+
+    def totals(self):
+        totals = self.owner.totals
+        return totals.current, totals.cumulative
+
+    def history(self):
+        totals = self.owner.totals.semesters
+        return [
+            (semester['name'], totals[idx], list(semester['courses'].records()))
+            for idx, semester in enumerate(self.owner.semesters)
+        ]
+
+
+class SQLiteRepository:
+    """One student's GPA data in a SQLite database shared by many students
+
+    Reads run SQL aggregates restricted to the student through the
+    semesters_by_student and courses_by_semester indexes, so they cost
+    O(this student's courses) however large the database grows. Change
+    records (see storage.apply_change) are written as small transactions;
+    they are cheap enough to run on the Tk thread, which keeps reads
+    consistent with the latest edit. One connection is shared between
+    threads and serialized with a lock.
+
+    Course points are stored for the SQL aggregates and are recomputed
+    when the database is opened under a different grade scheme.
+    """
+
+    # GPACalculator applies changes synchronously so the next read sees them
+    synchronous_writes = True
+
+    def __init__(self, path, student=DEFAULT_STUDENT, create=True):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        with self.db:
+            self.db.executescript(SCHEMA)
+        try:
+            self.sync_grade_scheme()
+        except ValueError:
+            self.db.close()
+            raise
+        # student=None opens the database for department-wide queries only
+        self.student_id = None
+        if student is not None:
+            self.student_id = self.add_student(student) if create else self.find_student(student)
+            if self.student_id is None:
+                self.db.close()
+                raise KeyError(f"No student named {student!r} in {path}")
+
+    def find_student(self, name):
+        """Id of a student, or None if there is no such student"""
+        with self.lock:
+            row = self.db.execute("SELECT id FROM students WHERE name = ?", (name,)).fetchone()
+        return row[0] if row is not None else None
+
+    def add_student(self, name):
+        """Id of a student, creating the student if needed"""
+        with self.lock, self.db:
+            self.db.execute("INSERT OR IGNORE INTO students (name) VALUES (?)", (name,))
+            return self.db.execute("SELECT id FROM students WHERE name = ?", (name,)).fetchone()[0]
+
+    def sync_grade_scheme(self):
+        """Recompute stored points if the database was written under another scheme
+
+        Returns True if points were recomputed. Courses whose letter the
+        active scheme lacks keep the letter and get the points of the
+        active letter they map to (see resolve_grade), which is also the
+        letter they load as.
+        """
+        scheme = current_scheme()
+        with self.lock, self.db:
+            row = self.db.execute("SELECT value FROM settings WHERE key = 'grade_scheme'").fetchone()
+            if row is not None and row[0] == scheme.key:
+                return False
+            unknown = [(grade, points) for grade, points
+                       in self.db.execute("SELECT DISTINCT grade, points FROM courses")
+                       if grade not in scheme.letters]
+            self.db.executemany(
+                "UPDATE courses SET points = ? WHERE grade = ? AND points = ?",
+                [(scheme.letters[GRADES[resolve_grade(grade, points)]], grade, points)
+                 for grade, points in unknown]
+            )
+            self.db.executemany(
+                "UPDATE courses SET points = ? WHERE grade = ? AND points != ?",
+                [(points, grade, points) for grade, points in scheme.letters.items()]
+            )
+            self.db.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('grade_scheme', ?)",
+                            (scheme.key,))
+        return True
+
+    def students(self):
+        """Every student with cumulative totals, as [(name, GradeTotals)]"""
+        with self.lock:
+            rows = self.db.execute(_STUDENT_TOTALS).fetchall()
+        return [(name, GradeTotals(credits, points, count)) for name, credits, points, count in rows]
+
+    # Repository reads
+
+    def totals(self):
+        with self.lock:
+            current = self.db.execute(_CURRENT_TOTALS, (self.student_id,)).fetchone()
+            cumulative = self.db.execute(_CUMULATIVE_TOTALS, (self.student_id,)).fetchone()
+        return GradeTotals(*current), GradeTotals(*cumulative)
+
+    def history(self):
+        with self.lock:
+            semesters = self.db.execute(_SEMESTER_TOTALS, (self.student_id,)).fetchall()
+            courses = self.db.execute(_COURSES, (self.student_id,)).fetchall()
+        history = []
+        by_id = {}
+        for semester_id, name, credits, points, count in semesters:
+            by_id[semester_id] = []
+            history.append((name, GradeTotals(credits, points, count), by_id[semester_id]))
+        for semester_id, is_current, name, credits, grade, points in courses:
+            if not is_current:
+                by_id[semester_id].append((name, credits, grade, points))
+        return history
+
+    def sections(self):
+        """Stream (semester name, GradeTotals, is current, courses) per semester, current last
+
+        Totals come from the aggregate queries. Courses are fetched one
+        semester at a time in batches, so memory use does not grow with
+        the length of the history. Each semester's courses must be
+        consumed before the next section is taken.
+        """
+        with self.lock:
+            semesters = self.db.execute(_SEMESTER_TOTALS, (self.student_id,)).fetchall()
+            current = self.db.execute(_CURRENT_TOTALS, (self.student_id,)).fetchone()
+            current_id = self.db.execute(
+                "SELECT id FROM semesters WHERE student_id = ? AND is_current = 1", (self.student_id,)
+            ).fetchone()
+        for semester_id, name, credits, points, count in semesters:
+            yield name, GradeTotals(credits, points, count), False, self._semester_courses(semester_id)
+        if current_id is not None and current[2]:
+            yield None, GradeTotals(*current), True, self._semester_courses(current_id[0])
+
+    def _semester_courses(self, semester_id, batch_size=500):
+        """(name, credits, grade, points) of one semester's courses, fetched in batches"""
+        with self.lock:
+            cursor = self.db.execute(
+                "SELECT name, credits, grade, points FROM courses WHERE semester_id = ? ORDER BY id",
+                (semester_id,)
+            )
+        while True:
+            with self.lock:
+                rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+
+    # Store interface (same as storage.LogStore)
+
+    def load(self):
+        """This student's (semesters, current course table)"""
+        with self.lock:
+            semesters = self.db.execute(
+                "SELECT id, name FROM semesters WHERE student_id = ? AND is_current = 0 ORDER BY position",
+                (self.student_id,)
+            ).fetchall()
+            courses = self.db.execute(_COURSES, (self.student_id,)).fetchall()
+
+        tables = {semester_id: CourseTable() for semester_id, _ in semesters}
+        current = CourseTable()
+        for semester_id, is_current, name, credits, grade, points in courses:
+            (current if is_current else tables[semester_id]).append(name, credits, grade, points)
+        return [{'name': name, 'courses': tables[semester_id]} for semester_id, name in semesters], current
+
+    def append(self, record):
+        """Apply one change record to the database"""
+        op = record['op']
+        with self.lock, self.db:
+            if op == 'add_course':
+                self._insert_courses(self._current_id(), [record['course']])
+            elif op == 'delete_course':
+                self.db.execute(
+                    "DELETE FROM courses WHERE id = (SELECT id FROM courses WHERE semester_id = ? "
+                    "ORDER BY id LIMIT 1 OFFSET ?)",
+                    (self._current_id(), record['index'])
+                )
+            elif op == 'clear_current':
+                self.db.execute("DELETE FROM courses WHERE semester_id = ?", (self._current_id(),))
+            elif op == 'save_semester':
+                self.db.execute(
+                    "UPDATE semesters SET name = ?, is_current = 0, position = ? WHERE id = ?",
+                    (record['name'], self._next_position(), self._current_id())
+                )
+            elif op == 'delete_semester':
+                self.db.execute("DELETE FROM semesters WHERE id = ?", (self._semester_id(record['index']),))
+            elif op == 'add_semester':
+                semester = record['semester']
+                cursor = self.db.execute(
+                    "INSERT INTO semesters (student_id, name, position) VALUES (?, ?, ?)",
+                    (self.student_id, semester['name'], self._next_position())
+                )
+                self._insert_courses(cursor.lastrowid, semester['courses'])
+            else:
+                raise ValueError(f"Unknown change record: {op}")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    # Helpers; callers hold the lock
+
+    def _current_id(self):
+        row = self.db.execute(
+            "SELECT id FROM semesters WHERE student_id = ? AND is_current = 1", (self.student_id,)
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        return self.db.execute(
+            "INSERT INTO semesters (student_id, name, position, is_current) VALUES (?, '', 0, 1)",
+            (self.student_id,)
+        ).lastrowid
+
+    def _semester_id(self, index):
+        row = self.db.execute(
+            "SELECT id FROM semesters WHERE student_id = ? AND is_current = 0 "
+            "ORDER BY position LIMIT 1 OFFSET ?",
+            (self.student_id, index)
+        ).fetchone()
+        if row is None:
+            raise IndexError("semester index out of range")
+        return row[0]
+
+    def _next_position(self):
+        return self.db.execute(
+            "SELECT COALESCE(MAX(position), 0) + 1 FROM semesters WHERE student_id = ? AND is_current = 0",
+            (self.student_id,)
+        ).fetchone()[0]
+
+    def _insert_courses(self, semester_id, courses):
+        if isinstance(courses, CourseTable):
+            rows = ((semester_id, name, credits, grade, points)
+                    for name, credits, grade, points in courses.records())
+        else:
+            unknown = [c['grade'] for c in courses if c['grade'] not in GRADE_SCALE]
+            if unknown:
+                raise ValueError(f"Unknown grade: {unknown[0]}")
+            rows = ((semester_id, c['name'], c['credits'], c['grade'], GRADE_SCALE[c['grade']])
+                    for c in courses)
+        self.db.executemany(
+            "INSERT INTO courses (semester_id, name, credits, grade, points) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
@@ -4,22 +4,48 @@ Provides advanced mathematical calculations with a beautiful UI
 """
 
 import customtkinter as ctk
-import math
-from typing import Optional
+from tkinter import Entry, TclError, Text
+
+from engine import CalculatorEngine, run_engine
+from executor import BackgroundExecutor
+from history import CalculationHistory
+from styles import adjust_color, get_font
+from operations import REGISTRY, format_number
+
+
+# Engine methods that may evaluate (and so take long) run in the background
+BACKGROUND_METHODS = ('equals_pressed', 'scientific_function', 'operation_pressed', 'paste')
+
+# Key events are buffered and applied together once per frame
+KEY_FRAME_MS = 16
+
+# Recorded evaluations are written to the history log at most this often
+HISTORY_FLUSH_MS = 1000
 
 
 class ScientificCalculator(ctk.CTkFrame):
-    def __init__(self, parent):
+    def __init__(self, parent, use_processes=False):
         super().__init__(parent, fg_color="transparent")
         
-        # Calculator state
-        self.current_value = "0"
-        self.previous_value = ""
-        self.operation = None
-        self.new_number = True
-        self.memory = 0
-        self.angle_mode = "deg"  # deg or rad
-        self.history = []
+        # Calculator state lives in the headless engine
+        self.engine = CalculatorEngine()
+        
+        # Evaluations run off the Tk thread; input arriving meanwhile is queued
+        self.executor = BackgroundExecutor(self, use_processes=use_processes)
+        self.queued_input = []
+        
+        # Keys typed since the last frame, and the pending display redraw
+        self.pending_keys = []
+        self.key_flush_id = None
+        self.render_id = None
+        self.shown_text = "0"
+        
+        # Every evaluation goes to the history; the log is read and written
+        # in the background
+        self.history = CalculationHistory()
+        self.history_flush_id = None
+        self.executor.submit(self.history.load, on_done=lambda _: self.schedule_history_flush(),
+                             group="history")
         
         # Configure grid
         self.grid_rowconfigure(2, weight=1)
@@ -32,6 +58,7 @@ class ScientificCalculator(ctk.CTkFrame):
         
         # Bind keyboard
         self.winfo_toplevel().bind('<Key>', self.on_key_press)
+        self.winfo_toplevel().bind('<<Paste>>', self.on_paste, add="+")
         
     def create_display(self):
         """Create the calculator display"""
@@ -43,7 +70,7 @@ class ScientificCalculator(ctk.CTkFrame):
         self.history_label = ctk.CTkLabel(
             display_frame,
             text="",
-            font=ctk.CTkFont(size=14),
+            font=get_font(14),
             text_color=("gray50", "gray60"),
             anchor="e"
         )
@@ -53,7 +80,7 @@ class ScientificCalculator(ctk.CTkFrame):
         self.display = ctk.CTkLabel(
             display_frame,
             text="0",
-            font=ctk.CTkFont(size=42, weight="bold"),
+            font=get_font(42, "bold"),
             anchor="e"
         )
         self.display.grid(row=1, column=0, padx=20, pady=(5, 15), sticky="ew")
@@ -66,7 +93,7 @@ class ScientificCalculator(ctk.CTkFrame):
         self.mode_label = ctk.CTkLabel(
             mode_frame,
             text="Angle Mode:",
-            font=ctk.CTkFont(size=12)
+            font=get_font(12)
         )
         self.mode_label.pack(side="left", padx=(10, 5))
         
@@ -74,7 +101,7 @@ class ScientificCalculator(ctk.CTkFrame):
             mode_frame,
             values=["Degrees", "Radians"],
             command=self.toggle_mode,
-            font=ctk.CTkFont(size=12)
+            font=get_font(12)
         )
         self.mode_switch.pack(side="left")
         self.mode_switch.set("Degrees")
@@ -84,12 +111,6 @@ class ScientificCalculator(ctk.CTkFrame):
         button_frame = ctk.CTkFrame(self, corner_radius=10)
         button_frame.grid(row=2, column=0, padx=10, pady=(0, 10), sticky="nsew")
         
-        # Configure grid to be responsive
-        for i in range(7):
-            button_frame.grid_rowconfigure(i, weight=1)
-        for i in range(6):
-            button_frame.grid_columnconfigure(i, weight=1)
-        
         # Button configurations: (text, row, col, colspan, command, color)
         buttons = [
             # Row 0 - Memory and special functions
@@ -101,26 +122,26 @@ class ScientificCalculator(ctk.CTkFrame):
             ("C", 0, 5, 1, lambda: self.clear(), "#d32f2f"),
             
             # Row 1 - Advanced functions
-            ("sin", 1, 0, 1, lambda: self.scientific_function('sin'), "#6441a5"),
-            ("cos", 1, 1, 1, lambda: self.scientific_function('cos'), "#6441a5"),
-            ("tan", 1, 2, 1, lambda: self.scientific_function('tan'), "#6441a5"),
-            ("log", 1, 3, 1, lambda: self.scientific_function('log'), "#6441a5"),
-            ("ln", 1, 4, 1, lambda: self.scientific_function('ln'), "#6441a5"),
+            self.operation_button('sin', 1, 0),
+            self.operation_button('cos', 1, 1),
+            self.operation_button('tan', 1, 2),
+            self.operation_button('log', 1, 3),
+            self.operation_button('ln', 1, 4),
             ("AC", 1, 5, 1, lambda: self.all_clear(), "#b71c1c"),
             
             # Row 2 - More functions
-            ("x²", 2, 0, 1, lambda: self.scientific_function('square'), "#6441a5"),
-            ("x³", 2, 1, 1, lambda: self.scientific_function('cube'), "#6441a5"),
-            ("xʸ", 2, 2, 1, lambda: self.operation_pressed('^'), "#1f538d"),
-            ("√", 2, 3, 1, lambda: self.scientific_function('sqrt'), "#6441a5"),
-            ("∛", 2, 4, 1, lambda: self.scientific_function('cbrt'), "#6441a5"),
+            self.operation_button('square', 2, 0),
+            self.operation_button('cube', 2, 1),
+            self.operation_button('^', 2, 2),
+            self.operation_button('sqrt', 2, 3),
+            self.operation_button('cbrt', 2, 4),
             ("⌫", 2, 5, 1, lambda: self.backspace(), "#f57c00"),
             
             # Row 3 - More functions and operations
-            ("1/x", 3, 0, 1, lambda: self.scientific_function('reciprocal'), "#6441a5"),
-            ("n!", 3, 1, 1, lambda: self.scientific_function('factorial'), "#6441a5"),
-            ("|x|", 3, 2, 1, lambda: self.scientific_function('abs'), "#6441a5"),
-            ("mod", 3, 3, 1, lambda: self.operation_pressed('%'), "#1f538d"),
+            self.operation_button('reciprocal', 3, 0),
+            self.operation_button('factorial', 3, 1),
+            self.operation_button('abs', 3, 2),
+            self.operation_button('%', 3, 3),
             ("(", 3, 4, 1, lambda: self.append_char('('), "gray30"),
             (")", 3, 5, 1, lambda: self.append_char(')'), "gray30"),
             
@@ -128,7 +149,7 @@ class ScientificCalculator(ctk.CTkFrame):
             ("7", 4, 0, 1, lambda: self.number_pressed('7'), "gray25"),
             ("8", 4, 1, 1, lambda: self.number_pressed('8'), "gray25"),
             ("9", 4, 2, 1, lambda: self.number_pressed('9'), "gray25"),
-            ("÷", 4, 3, 1, lambda: self.operation_pressed('/'), "#1f538d"),
+            self.operation_button('/', 4, 3),
             ("π", 4, 4, 1, lambda: self.constant_pressed('pi'), "#6441a5"),
             ("e", 4, 5, 1, lambda: self.constant_pressed('e'), "#6441a5"),
             
@@ -136,24 +157,36 @@ class ScientificCalculator(ctk.CTkFrame):
             ("4", 5, 0, 1, lambda: self.number_pressed('4'), "gray25"),
             ("5", 5, 1, 1, lambda: self.number_pressed('5'), "gray25"),
             ("6", 5, 2, 1, lambda: self.number_pressed('6'), "gray25"),
-            ("×", 5, 3, 1, lambda: self.operation_pressed('*'), "#1f538d"),
-            ("10ˣ", 5, 4, 1, lambda: self.scientific_function('10x'), "#6441a5"),
-            ("2ˣ", 5, 5, 1, lambda: self.scientific_function('2x'), "#6441a5"),
+            self.operation_button('*', 5, 3),
+            self.operation_button('10x', 5, 4),
+            self.operation_button('2x', 5, 5),
             
             # Row 6
             ("1", 6, 0, 1, lambda: self.number_pressed('1'), "gray25"),
             ("2", 6, 1, 1, lambda: self.number_pressed('2'), "gray25"),
             ("3", 6, 2, 1, lambda: self.number_pressed('3'), "gray25"),
-            ("-", 6, 3, 1, lambda: self.operation_pressed('-'), "#1f538d"),
+            self.operation_button('-', 6, 3),
             ("0", 6, 4, 1, lambda: self.number_pressed('0'), "gray25"),
             (".", 6, 5, 1, lambda: self.decimal_pressed(), "gray25"),
             
             # Row 7 (last row, centered)
             ("+/-", 7, 0, 1, lambda: self.toggle_sign(), "gray30"),
-            ("+", 7, 1, 1, lambda: self.operation_pressed('+'), "#1f538d"),
+            self.operation_button('+', 7, 1),
             ("=", 7, 2, 4, lambda: self.equals_pressed(), "#00897b"),
         ]
         
+        # Operations registered at runtime get their own rows below the keypad
+        placed = {config[0] for config in buttons}
+        extra = [op.key for op in REGISTRY if op.label not in placed]
+        for idx, key in enumerate(extra):
+            buttons.append(self.operation_button(key, 8 + idx // 6, idx % 6))
+        
+        # Configure grid to be responsive
+        for i in range(max(config[1] for config in buttons) + 1):
+            button_frame.grid_rowconfigure(i, weight=1)
+        for i in range(6):
+            button_frame.grid_columnconfigure(i, weight=1)
+        
         # Create buttons
         for btn_config in buttons:
             text, row, col, colspan, command, color = btn_config
@@ -161,7 +194,7 @@ class ScientificCalculator(ctk.CTkFrame):
                 button_frame,
                 text=text,
                 command=command,
-                font=ctk.CTkFont(size=16, weight="bold"),
+                font=get_font(16, "bold"),
                 fg_color=color,
                 hover_color=self.adjust_color(color, 1.2),
                 corner_radius=8,
@@ -170,265 +203,254 @@ class ScientificCalculator(ctk.CTkFrame):
             btn.grid(row=row, column=col, columnspan=colspan, 
                     padx=3, pady=3, sticky="nsew")
     
+    def operation_button(self, key, row, col):
+        """Build a button config for a registered operation"""
+        operation = REGISTRY.get(key)
+        if operation.arity == 1:
+            return (operation.label, row, col, 1,
+                    lambda: self.scientific_function(key), "#6441a5")
+        return (operation.label, row, col, 1,
+                lambda: self.operation_pressed(key), "#1f538d")
+    
     def adjust_color(self, color, factor):
         """Adjust color brightness for hover effect"""
-        if color.startswith('#'):
-            # Convert hex to RGB, adjust, and convert back
-            r, g, b = int(color[1:3], 16), int(color[4:6], 16), int(color[6:8], 16)
-            r = min(255, int(r * factor))
-            g = min(255, int(g * factor))
-            b = min(255, int(b * factor))
-            return f'#{r:02x}{g:02x}{b:02x}'
-        return color
+        return adjust_color(color, factor)
     
     def toggle_mode(self, value):
         """Toggle between degrees and radians"""
-        self.angle_mode = "deg" if value == "Degrees" else "rad"
+        self.run("set_angle_mode", "deg" if value == "Degrees" else "rad")
     
-    def number_pressed(self, number):
-        """Handle number button press"""
-        if self.new_number:
-            self.current_value = number
-            self.new_number = False
+    def run(self, method, *args):
+        """Apply an engine method, evaluating slow ones in the background"""
+        if self.executor.busy("engine"):
+            self.queued_input.append((method, args))
+            return
+        
+        if self.needs_background(method):
+            self.executor.submit(
+                run_engine, self.engine.snapshot(), method, *args,
+                on_done=self.finish_background,
+                on_error=self.background_failed,
+                group="engine",
+                cpu_bound=True
+            )
         else:
-            if self.current_value == "0":
-                self.current_value = number
+            getattr(self.engine, method)(*args)
+            self.update_display()
+    
+    def run_batch(self, actions):
+        """Apply a list of (engine method, args) with a single display update
+
+        Cheap methods run directly on the engine; from the first one that
+        evaluates, the rest queue behind it as with run(). All clear
+        discards everything before it, including a running evaluation.
+        """
+        clears = [i for i, (method, _) in enumerate(actions) if method == 'all_clear']
+        if clears:
+            self.cancel_background()
+            self.engine.all_clear()
+            actions = actions[clears[-1] + 1:]
+        for i, (method, args) in enumerate(actions):
+            if self.executor.busy("engine"):
+                self.queued_input.extend(actions[i:])
+                break
+            if self.needs_background(method):
+                self.run(method, *args)
             else:
-                self.current_value += number
+                getattr(self.engine, method)(*args)
+        self.update_display()
+    
+    def needs_background(self, method):
+        """Check whether an engine method will evaluate anything"""
+        if method == 'operation_pressed':
+            # Only chained operations (2 + 3 +) evaluate the pending one
+            return bool(self.engine.operation) and not self.engine.new_number
+        return method in BACKGROUND_METHODS
+    
+    def finish_background(self, engine):
+        """Adopt a background result, then replay input typed meanwhile"""
+        self.engine.restore(engine)
+        queued, self.queued_input = self.queued_input, []
+        self.run_batch(queued)
+    
+    def background_failed(self, error):
+        """Show an error when a background evaluation crashed"""
+        self.queued_input = []
+        self.engine.set_error()
         self.update_display()
     
+    def cancel_background(self):
+        """Abandon a running evaluation and any input queued behind it"""
+        self.executor.cancel("engine")
+        self.queued_input = []
+    
+    def number_pressed(self, number):
+        """Handle number button press"""
+        self.run("number_pressed", number)
+    
     def decimal_pressed(self):
         """Handle decimal point"""
-        if '.' not in self.current_value:
-            if self.new_number:
-                self.current_value = "0."
-                self.new_number = False
-            else:
-                self.current_value += '.'
-            self.update_display()
+        self.run("decimal_pressed")
     
     def operation_pressed(self, op):
         """Handle operation button"""
-        if self.operation and not self.new_number:
-            self.equals_pressed()
-        
-        self.previous_value = self.current_value
-        self.operation = op
-        self.new_number = True
-        self.update_history(f"{self.current_value} {self.operation}")
+        self.run("operation_pressed", op)
     
     def equals_pressed(self):
         """Calculate result"""
-        if not self.operation:
-            return
-        
-        try:
-            prev = float(self.previous_value)
-            current = float(self.current_value)
-            
-            if self.operation == '+':
-                result = prev + current
-            elif self.operation == '-':
-                result = prev - current
-            elif self.operation == '*':
-                result = prev * current
-            elif self.operation == '/':
-                if current == 0:
-                    self.current_value = "Error: Div by 0"
-                    self.new_number = True
-                    self.update_display()
-                    return
-                result = prev / current
-            elif self.operation == '^':
-                result = prev ** current
-            elif self.operation == '%':
-                result = prev % current
-            else:
-                return
-            
-            # Format result
-            self.current_value = self.format_number(result)
-            self.operation = None
-            self.new_number = True
-            self.update_display()
-            self.history_label.configure(text="")
-            
-        except Exception as e:
-            self.current_value = "Error"
-            self.new_number = True
-            self.update_display()
+        self.run("equals_pressed")
     
     def scientific_function(self, func):
         """Apply scientific function"""
-        try:
-            value = float(self.current_value)
-            
-            if func == 'sin':
-                result = math.sin(math.radians(value) if self.angle_mode == 'deg' else value)
-            elif func == 'cos':
-                result = math.cos(math.radians(value) if self.angle_mode == 'deg' else value)
-            elif func == 'tan':
-                result = math.tan(math.radians(value) if self.angle_mode == 'deg' else value)
-            elif func == 'log':
-                result = math.log10(value)
-            elif func == 'ln':
-                result = math.log(value)
-            elif func == 'sqrt':
-                result = math.sqrt(value)
-            elif func == 'cbrt':
-                result = value ** (1/3)
-            elif func == 'square':
-                result = value ** 2
-            elif func == 'cube':
-                result = value ** 3
-            elif func == 'reciprocal':
-                result = 1 / value
-            elif func == 'factorial':
-                result = math.factorial(int(value))
-            elif func == 'abs':
-                result = abs(value)
-            elif func == '10x':
-                result = 10 ** value
-            elif func == '2x':
-                result = 2 ** value
-            else:
-                return
-            
-            self.current_value = self.format_number(result)
-            self.new_number = True
-            self.update_display()
-            
-        except Exception as e:
-            self.current_value = "Error"
-            self.new_number = True
-            self.update_display()
+        self.run("scientific_function", func)
     
     def constant_pressed(self, constant):
         """Insert mathematical constant"""
-        if constant == 'pi':
-            value = math.pi
-        elif constant == 'e':
-            value = math.e
-        else:
-            return
-        
-        self.current_value = self.format_number(value)
-        self.new_number = True
-        self.update_display()
+        self.run("constant_pressed", constant)
     
     def toggle_sign(self):
         """Toggle positive/negative"""
-        try:
-            value = float(self.current_value)
-            self.current_value = self.format_number(-value)
-            self.update_display()
-        except:
-            pass
+        self.run("toggle_sign")
     
     def backspace(self):
         """Remove last character"""
-        if not self.new_number and len(self.current_value) > 1:
-            self.current_value = self.current_value[:-1]
-            self.update_display()
-        elif not self.new_number:
-            self.current_value = "0"
-            self.new_number = True
-            self.update_display()
+        self.run("backspace")
     
     def clear(self):
-        """Clear current value"""
-        self.current_value = "0"
-        self.new_number = True
+        """Clear current value, cancelling any running evaluation"""
+        self.cancel_background()
+        self.engine.clear()
         self.update_display()
     
     def all_clear(self):
-        """Clear everything"""
-        self.current_value = "0"
-        self.previous_value = ""
-        self.operation = None
-        self.new_number = True
-        self.history_label.configure(text="")
+        """Clear everything, cancelling any running evaluation"""
+        self.cancel_background()
+        self.engine.all_clear()
         self.update_display()
     
     def append_char(self, char):
         """Append character (for parentheses)"""
-        if self.new_number:
-            self.current_value = char
-            self.new_number = False
-        else:
-            self.current_value += char
-        self.update_display()
+        self.run("append_char", char)
     
     # Memory functions
     def memory_clear(self):
         """Clear memory"""
-        self.memory = 0
+        self.run("memory_clear")
     
     def memory_recall(self):
         """Recall memory"""
-        self.current_value = self.format_number(self.memory)
-        self.new_number = True
-        self.update_display()
+        self.run("memory_recall")
     
     def memory_add(self):
         """Add to memory"""
-        try:
-            self.memory += float(self.current_value)
-        except:
-            pass
+        self.run("memory_add")
     
     def memory_subtract(self):
         """Subtract from memory"""
-        try:
-            self.memory -= float(self.current_value)
-        except:
-            pass
+        self.run("memory_subtract")
     
     def memory_store(self):
         """Store in memory"""
-        try:
-            self.memory = float(self.current_value)
-        except:
-            pass
+        self.run("memory_store")
+    
+    def destroy(self):
+        """Stop background work and write outstanding history before the widget goes away"""
+        for pending in (self.history_flush_id, self.key_flush_id, self.render_id):
+            if pending is not None:
+                self.after_cancel(pending)
+        self.executor.shutdown()
+        self.history.close()
+        super().destroy()
     
     def format_number(self, num):
         """Format number for display"""
-        if isinstance(num, int) or (isinstance(num, float) and num.is_integer()):
-            return str(int(num))
-        else:
-            # Round to 10 decimal places and remove trailing zeros
-            formatted = f"{num:.10f}".rstrip('0').rstrip('.')
-            return formatted
+        return format_number(num)
     
     def update_display(self):
-        """Update the display"""
-        self.display.configure(text=self.current_value)
+        """Show the engine state at the next idle time
+
+        However many changes happen before then, the labels are
+        reconfigured at most once per idle cycle.
+        """
+        self.record_evaluation()
+        if self.render_id is None:
+            self.render_id = self.after_idle(self.render_display)
+    
+    def render_display(self):
+        self.render_id = None
+        if self.engine.current_value != self.shown_text:
+            self.shown_text = self.engine.current_value
+            self.display.configure(text=self.shown_text)
+        if self.engine.history_text != self.history_label.cget("text"):
+            self.update_history(self.engine.history_text)
+    
+    def record_evaluation(self):
+        """Add the engine's latest evaluation to the history"""
+        evaluation = self.engine.take_evaluation()
+        if evaluation is not None:
+            self.history.record(*evaluation)
+            self.schedule_history_flush()
+    
+    def schedule_history_flush(self):
+        """Write recorded evaluations in one batch shortly, off the Tk thread"""
+        if self.history_flush_id is None:
+            self.history_flush_id = self.after(HISTORY_FLUSH_MS, self.flush_history)
+    
+    def flush_history(self):
+        self.history_flush_id = None
+        self.executor.submit(self.history.flush, group="history")
     
     def update_history(self, text):
         """Update history display"""
         self.history_label.configure(text=text)
     
     def on_key_press(self, event):
-        """Handle keyboard input"""
+        """Buffer keyboard input; it is applied once per frame"""
+        action = self.key_action(event)
+        if action is None:
+            return
+        self.pending_keys.append(action)
+        if self.key_flush_id is None:
+            self.key_flush_id = self.after(KEY_FRAME_MS, self.apply_keys)
+    
+    def key_action(self, event):
+        """Engine method and arguments for a key event (None for other keys)"""
         key = event.char
         
         # Numbers
         if key.isdigit():
-            self.number_pressed(key)
+            return ("number_pressed", (key,))
         # Operations
-        elif key == '+':
-            self.operation_pressed('+')
-        elif key == '-':
-            self.operation_pressed('-')
-        elif key == '*':
-            self.operation_pressed('*')
-        elif key == '/':
-            self.operation_pressed('/')
+        elif key in ('+', '-', '*', '/'):
+            return ("operation_pressed", (key,))
         elif key == '.':
-            self.decimal_pressed()
+            return ("decimal_pressed", ())
+        elif key in ('(', ')'):
+            return ("append_char", (key,))
         elif key == '\r' or key == '=':  # Enter or equals
-            self.equals_pressed()
+            return ("equals_pressed", ())
         elif event.keysym == 'BackSpace':
-            self.backspace()
+            return ("backspace", ())
         elif event.keysym == 'Escape':
-            self.all_clear()
+            return ("all_clear", ())
+        return None
+    
+    def apply_keys(self):
+        """Apply the keys buffered since the last frame"""
+        self.key_flush_id = None
+        keys, self.pending_keys = self.pending_keys, []
+        if keys:
+            self.run_batch(keys)
+    
+    def on_paste(self, event):
+        """Enter the whole clipboard text in one step"""
+        if isinstance(event.widget, (Entry, Text)):
+            return  # pasting into a text field elsewhere in the window
+        try:
+            text = self.clipboard_get()
+        except TclError:
+            return
+        if self.key_flush_id is not None:
+            self.after_cancel(self.key_flush_id)
+            self.apply_keys()
+        self.run("paste", text)
@@ -0,0 +1,278 @@
+"""
+Snapshot Module
+GPA data snapshots as pretty-printed JSON or a compact binary file
+
+The binary layout (little-endian) is fixed-width and loaded through mmap:
+
+    header      magic, version, counts, section offsets, last log seq and
+                credit/point totals for the current semester and overall
+    semesters   one 28-byte record per saved semester, then the current one:
+                name string id, first course index, course count, credits, points
+    courses     one 13-byte record per course: name string id, credits, grade code
+    strings     (count + 1) uint32 offsets followed by the UTF-8 names; the
+                last grade count strings are the letters of the grade codes
+    points      one float64 per grade code: its points when the file was
+                written (NaN for letters of other schemes; since version 3)
+
+The totals in the header make cumulative GPA an O(1) read, with the
+grade points in effect when the file was written; course records are
+wrapped as NumPy arrays straight from the mapped file. Grade codes are
+translated through the stored letters, so a file stays valid when the
+grade scheme changes; letters the new scheme lacks are mapped by their
+stored points (see grade_scheme.resolve_grade).
+
+    python snapshot.py gpa_data.json gpa_data.gpab    # JSON -> binary
+    python snapshot.py gpa_data.gpab gpa_data.json    # binary -> JSON
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+
+import numpy as np
+
+from aggregates import GradeTotals
+from course_store import NAMES, CourseTable, semesters_from_data, semesters_to_data
+from grade_scheme import DEFAULT_SCHEME, GRADE_POINTS, GRADES, resolve_grade
+
+
+BINARY_EXTENSION = ".gpab"
+MAGIC = b"GPAS"
+VERSION = 3
+# Version 1 files have no grade letters; their codes follow the default scheme
+V1_GRADES = tuple(DEFAULT_SCHEME.letters)
+# Versions before 3 have no grade points; resolve_grade falls back to the default scheme
+SUPPORTED_VERSIONS = (1, 2, VERSION)
+
+# magic, version, grade count, semester count (excluding current), course count,
+# string count, semesters/courses/strings offsets, log seq, current
+# credits/points/count, cumulative credits/points/count
+HEADER = struct.Struct("<4sHHIQIQQQQddQddQ")
+
+SEMESTER_DTYPE = np.dtype([
+    ('name', '<u4'), ('first', '<u8'), ('count', '<u4'), ('credits', '<f8'), ('points', '<f8'),
+])
+COURSE_DTYPE = np.dtype([('name', '<u4'), ('credits', '<f8'), ('grade', 'u1')])
+
+
+def read_snapshot(path):
+    """Read a JSON snapshot as (semesters, current course table, last seq)"""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    semesters, current = semesters_from_data(data)
+    return semesters, current, data.get('log_seq', 0)
+
+
+def write_snapshot(path, semesters, current_courses, seq=0):
+    """Atomically replace a JSON snapshot: write a temp file, fsync, rename"""
+    data = semesters_to_data(semesters, current_courses)
+    data['log_seq'] = seq
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    fsync_directory(path)
+
+
+def fsync_directory(path):
+    """Make a rename durable (POSIX only; a no-op elsewhere)"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class SnapshotHeader:
+    """Summary fields available without reading any records"""
+
+    __slots__ = ('version', 'grade_count', 'semester_count', 'course_count', 'string_count',
+                 'offsets', 'seq', 'current', 'cumulative')
+
+    def __init__(self, fields):
+        (magic, version, self.grade_count, self.semester_count, self.course_count, self.string_count,
+         semesters_offset, courses_offset, strings_offset, self.seq,
+         current_credits, current_points, current_count,
+         cumulative_credits, cumulative_points, cumulative_count) = fields
+        if magic != MAGIC:
+            raise ValueError("Not a GPA binary snapshot")
+        if version not in SUPPORTED_VERSIONS:
+            raise ValueError(f"Unsupported snapshot version {version}")
+        self.version = version
+        self.offsets = (semesters_offset, courses_offset, strings_offset)
+        self.current = GradeTotals(current_credits, current_points, current_count)
+        self.cumulative = GradeTotals(cumulative_credits, cumulative_points, cumulative_count)
+
+
+def read_header(path):
+    """Read only the header: counts, log seq and current/cumulative totals"""
+    with open(path, 'rb') as f:
+        return SnapshotHeader(HEADER.unpack(f.read(HEADER.size)))
+
+
+def write_binary(path, semesters, current_courses, seq=0):
+    """Atomically write a binary snapshot: temp file, fsync, rename"""
+    tables = [s['courses'] for s in semesters] + [current_courses]
+    all_courses = CourseTable.concatenate(tables)
+
+    # String table: the names used by courses, then the semester names
+    pool_ids, course_names = np.unique(all_courses.name_ids, return_inverse=True)
+    strings = [NAMES[int(i)] for i in pool_ids]
+    semester_names = {}
+    for semester in semesters:
+        semester_names.setdefault(semester['name'], len(strings) + len(semester_names))
+    strings.extend(semester_names)
+    current_name = len(strings)
+    strings.append("")
+    strings.extend(GRADES)
+
+    records = np.zeros(len(semesters) + 1, dtype=SEMESTER_DTYPE)
+    first = 0
+    for i, table in enumerate(tables):
+        name = semester_names[semesters[i]['name']] if i < len(semesters) else current_name
+        records[i] = (name, first, len(table), table.total_credits(), table.quality_points())
+        first += len(table)
+
+    courses = np.empty(len(all_courses), dtype=COURSE_DTYPE)
+    courses['name'] = course_names
+    courses['credits'] = all_courses.credits
+    courses['grade'] = all_courses.grade_codes
+
+    encoded = [name.encode('utf-8') for name in strings]
+    string_offsets = np.zeros(len(encoded) + 1, dtype='<u4')
+    np.cumsum([len(b) for b in encoded], out=string_offsets[1:])
+    grade_points = GRADE_POINTS[:len(GRADES)].astype('<f8')
+
+    semesters_offset = HEADER.size
+    courses_offset = semesters_offset + records.nbytes
+    strings_offset = courses_offset + courses.nbytes
+    current = GradeTotals.from_courses(current_courses)
+    cumulative = GradeTotals.from_courses(all_courses)
+    header = HEADER.pack(
+        MAGIC, VERSION, len(GRADES), len(semesters), len(all_courses), len(strings),
+        semesters_offset, courses_offset, strings_offset, seq,
+        current.credits, current.points, current.count,
+        cumulative.credits, cumulative.points, cumulative.count
+    )
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(records.tobytes())
+        f.write(courses.tobytes())
+        f.write(string_offsets.tobytes())
+        f.write(b"".join(encoded))
+        f.write(grade_points.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    fsync_directory(path)
+
+
+def load_binary(path):
+    """Load a binary snapshot as (semesters, current course table, last seq)"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            raise ValueError("Truncated GPA binary snapshot")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            header = SnapshotHeader(HEADER.unpack_from(mm))
+            semesters_offset, courses_offset, strings_offset = header.offsets
+
+            string_offsets = np.frombuffer(mm, dtype='<u4', count=header.string_count + 1,
+                                           offset=strings_offset)
+            blob_start = strings_offset + string_offsets.nbytes
+            strings = [
+                mm[blob_start + start:blob_start + end].decode('utf-8')
+                for start, end in zip(string_offsets[:-1].tolist(), string_offsets[1:].tolist())
+            ]
+            grade_points = None
+            if header.version >= 3:
+                grade_points = np.frombuffer(mm, dtype='<f8', count=header.grade_count,
+                                             offset=blob_start + int(string_offsets[-1])).tolist()
+            records = np.frombuffer(mm, dtype=SEMESTER_DTYPE, count=header.semester_count + 1,
+                                    offset=semesters_offset)
+            courses = np.frombuffer(mm, dtype=COURSE_DTYPE, count=header.course_count,
+                                    offset=courses_offset)
+
+            # Course names come first in the string table. Map them to ids in
+            # the shared name pool once, then translate every course's name id
+            # with a single vectorized lookup
+            course_names = int(courses['name'].max()) + 1 if len(courses) else 0
+            pool_ids = np.array([NAMES.intern(s) for s in strings[:course_names]], dtype=np.uint32)
+            name_ids = pool_ids[courses['name']]
+            credits = courses['credits'].copy()
+            grades = courses['grade'].copy()
+            semester_records = records.tolist()
+            # Release the views before the map is closed
+            del string_offsets, records, courses
+
+    grades = _grade_codes(header, strings, grades, grade_points)
+
+    # Each semester's table is a slice of the three column arrays
+    tables = []
+    for name, first, count, _, _ in semester_records:
+        end = first + count
+        tables.append((strings[name], CourseTable.from_arrays(
+            name_ids[first:end], credits[first:end], grades[first:end], copy=False
+        )))
+
+    semesters = [{'name': name, 'courses': table} for name, table in tables[:-1]]
+    return semesters, tables[-1][1], header.seq
+
+
+def _grade_codes(header, strings, codes, grade_points=None):
+    """The file's grade codes translated to this process's active codes"""
+    letters = strings[len(strings) - header.grade_count:] if header.version > 1 else V1_GRADES
+    remap = np.arange(len(letters), dtype=np.uint8)
+    for code in np.unique(codes).tolist():
+        if code >= len(letters):
+            raise ValueError(f"Unknown grade code: {code}")
+        points = grade_points[code] if grade_points is not None else None
+        remap[code] = resolve_grade(letters[code], points)
+    if np.array_equal(remap, np.arange(len(letters))):
+        return codes
+    return remap[codes]
+
+
+def is_binary(path):
+    return path.endswith(BINARY_EXTENSION)
+
+
+def read_any(path):
+    """Read a JSON or binary snapshot, chosen by file extension"""
+    return load_binary(path) if is_binary(path) else read_snapshot(path)
+
+
+def write_any(path, semesters, current_courses, seq=0):
+    """Write a JSON or binary snapshot, chosen by file extension"""
+    if is_binary(path):
+        write_binary(path, semesters, current_courses, seq)
+    else:
+        write_snapshot(path, semesters, current_courses, seq)
+
+
+def convert(source, destination):
+    """Convert a snapshot between the JSON and binary formats"""
+    write_any(destination, *read_any(source))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("usage: python snapshot.py SOURCE DESTINATION  (.json or .gpab)", file=sys.stderr)
+        return 2
+    convert(*argv)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
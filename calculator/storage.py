@@ -0,0 +1,202 @@
+"""
+Storage Module
+Append-only change log with periodic snapshot compaction for GPA data
+
+    gpa_data.json      snapshot: semesters, current courses, last applied seq
+    gpa_data.gpab      the same snapshot in binary form (see snapshot.py), if enabled
+    gpa_data.json.log  one JSON change record per line, appended on every edit
+
+Loading reads the snapshot and replays log records newer than it. A
+torn final line (from a killed process) is dropped and truncated away;
+any other record that cannot be read or applied raises LogReplayError
+and the log is left untouched on disk.
+Compaction writes a new snapshot to a temporary file, fsyncs it and
+renames it over the old one, so a crash at any point leaves either the
+old or the new snapshot plus a log that replays correctly on top.
+"""
+
+import json
+import os
+import time
+
+from course_store import CourseTable
+from snapshot import BINARY_EXTENSION, read_any, write_any
+
+
+# always: fsync after every record; interval: at most every FSYNC_INTERVAL
+# seconds; never: leave flushing to the OS
+FSYNC_POLICIES = ('always', 'interval', 'never')
+FSYNC_INTERVAL = 1.0
+
+# Rewrite the snapshot after this many logged changes
+COMPACT_EVERY = 500
+
+
+class LogReplayError(ValueError):
+    """A complete record in the change log could not be replayed"""
+
+
+def apply_change(semesters, current, record):
+    """Apply one change record to in-memory data; returns the new current table"""
+    op = record['op']
+    if op == 'add_course':
+        course = record['course']
+        current.append(course['name'], course['credits'], course['grade'], course.get('points'))
+    elif op == 'delete_course':
+        current.pop(record['index'])
+    elif op == 'clear_current':
+        current = CourseTable()
+    elif op == 'save_semester':
+        semesters.append({'name': record['name'], 'courses': current})
+        current = CourseTable()
+    elif op == 'delete_semester':
+        semesters.pop(record['index'])
+    elif op == 'add_semester':
+        semester = record['semester']
+        courses = semester['courses']
+        if isinstance(courses, CourseTable):
+            courses = courses.copy()
+        else:
+            courses = CourseTable.from_dicts(courses)
+        semesters.append({'name': semester['name'], 'courses': courses})
+    else:
+        raise ValueError(f"Unknown change record: {op}")
+    return current
+
+
+def _encode(value):
+    if isinstance(value, CourseTable):
+        return value.to_dicts()
+    raise TypeError(f"Cannot log {type(value).__name__}")
+
+
+class LogStore:
+    """GPA data persisted as a snapshot plus a write-ahead log of changes
+
+    The store keeps its own copy of the data, so appending a change costs
+    O(change) and compaction never needs the caller's state. It is not
+    thread-safe; the GPA tab only calls it from its single I/O worker.
+    """
+
+    # GPACalculator appends in the background; its own data is already current
+    synchronous_writes = False
+
+    def __init__(self, path, fsync='interval', compact_every=COMPACT_EVERY, binary=False):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {', '.join(FSYNC_POLICIES)}")
+        self.path = path
+        self.binary_path = os.path.splitext(path)[0] + BINARY_EXTENSION
+        # Compaction writes this format; loading uses whichever snapshot is newer
+        self.snapshot_path = self.binary_path if binary else path
+        self.log_path = path + ".log"
+        self.fsync = fsync
+        self.compact_every = compact_every
+        self.semesters = []
+        self.current = CourseTable()
+        self.seq = 0
+        self.pending = 0
+        self._log = None
+        self._last_sync = 0.0
+
+    def load(self, repair=True):
+        """Read the snapshot and replay the log; returns (semesters, current table)
+
+        With repair=False a torn final record is skipped but left on disk,
+        e.g. when only reading someone else's data.
+        """
+        snapshot_seq = 0
+        snapshot_path = self._newest_snapshot()
+        if snapshot_path is not None:
+            self.semesters, self.current, snapshot_seq = read_any(snapshot_path)
+        self.seq = snapshot_seq
+        self.pending = 0
+
+        if os.path.exists(self.log_path):
+            valid_bytes = self._replay(snapshot_seq)
+            if repair and valid_bytes < os.path.getsize(self.log_path):
+                print(f"Dropping incomplete change records from {self.log_path}")
+                with open(self.log_path, 'r+b') as f:
+                    f.truncate(valid_bytes)
+
+        return self._copy()
+
+    def _newest_snapshot(self):
+        """The most recently written snapshot in either format, preferring our own"""
+        candidates = [p for p in (self.snapshot_path, self.path, self.binary_path) if os.path.exists(p)]
+        return max(candidates, key=os.path.getmtime, default=None)
+
+    def _replay(self, snapshot_seq):
+        """Apply log records newer than the snapshot; returns the intact log length
+
+        Only the final line may be torn (no newline, or not valid JSON);
+        it is left out of the length. Any other bad record raises
+        LogReplayError, since dropping it would lose the records after it.
+        """
+        with open(self.log_path, 'rb') as f:
+            lines = f.readlines()
+        valid_bytes = 0
+        for number, line in enumerate(lines, 1):
+            last = number == len(lines)
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                if last:
+                    break  # torn write
+                raise LogReplayError(f"{self.log_path} line {number}: {e}") from None
+            if not line.endswith(b"\n"):
+                break  # torn write
+            try:
+                if record['seq'] > snapshot_seq:
+                    self.current = apply_change(self.semesters, self.current, record)
+                    self.seq = record['seq']
+                    self.pending += 1
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                raise LogReplayError(f"{self.log_path} line {number}: {e}") from None
+            valid_bytes += len(line)
+        return valid_bytes
+
+    def _copy(self):
+        semesters = [{'name': s['name'], 'courses': s['courses'].copy()} for s in self.semesters]
+        return semesters, self.current.copy()
+
+    def append(self, record):
+        """Log a change record and apply it to the store's copy of the data"""
+        self.current = apply_change(self.semesters, self.current, record)
+        self.seq += 1
+        record = dict(record, seq=self.seq)
+
+        if self._log is None:
+            self._log = open(self.log_path, 'a', encoding='utf-8')
+        self._log.write(json.dumps(record, ensure_ascii=False, default=_encode) + "\n")
+        self._log.flush()
+        self._sync()
+
+        self.pending += 1
+        if self.pending >= self.compact_every:
+            self.compact()
+
+    def _sync(self, force=False):
+        now = time.monotonic()
+        if (force or self.fsync == 'always'
+                or (self.fsync == 'interval' and now - self._last_sync >= FSYNC_INTERVAL)):
+            os.fsync(self._log.fileno())
+            self._last_sync = now
+
+    def compact(self):
+        """Fold the log into a new snapshot and start an empty log"""
+        write_any(self.snapshot_path, self.semesters, self.current, self.seq)
+        # Records up to self.seq are now in the snapshot; if we crash before
+        # truncating, load() skips them by sequence number
+        if self._log is not None:
+            self._log.close()
+        self._log = open(self.log_path, 'w', encoding='utf-8')
+        self.pending = 0
+
+    def close(self):
+        """Flush the log, fsync it unless the policy is 'never', and release it"""
+        if self._log is not None:
+            self._log.flush()
+            if self.fsync != 'never':
+                self._sync(force=True)
+            self._log.close()
+            self._log = None
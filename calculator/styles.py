@@ -0,0 +1,33 @@
+"""
+Styles Module
+Shared font objects and cached hover colors for the calculator widgets
+"""
+
+from functools import lru_cache
+
+import customtkinter as ctk
+
+
+_fonts = {}
+
+
+def get_font(size, weight="normal"):
+    """Return a shared CTkFont, creating it on first use"""
+    key = (size, weight)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = ctk.CTkFont(size=size, weight=weight)
+    return font
+
+
+@lru_cache(maxsize=None)
+def adjust_color(color, factor):
+    """Adjust color brightness for hover effect"""
+    if color.startswith('#'):
+        # Convert hex to RGB, adjust, and convert back
+        r, g, b = int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
+        r = min(255, int(r * factor))
+        g = min(255, int(g * factor))
+        b = min(255, int(b * factor))
+        return f'#{r:02x}{g:02x}{b:02x}'
+    return color
@@ -0,0 +1,264 @@
+"""
+Virtual Table Module
+Scrollable list that only creates widgets for visible rows and recycles them
+"""
+
+import math
+import sys
+
+import customtkinter as ctk
+
+from styles import get_font
+
+
+# Appearance of each row kind: background, font, and the action button text
+# (None for rows without a button)
+ROW_KINDS = {
+    'row': {'fg_color': "gray20", 'font': None, 'action': "✕"},
+    'header': {'fg_color': "gray25", 'font': (16, "bold"), 'action': "Delete"},
+    'item': {'fg_color': "transparent", 'font': None, 'action': None},
+}
+
+ROW_PADDING = 4
+
+if sys.platform.startswith("linux"):
+    WHEEL_SEQUENCES = ("<Button-4>", "<Button-5>")
+else:
+    WHEEL_SEQUENCES = ("<MouseWheel>",)
+
+
+class _Slot:
+    """One pooled row widget and the row it currently shows"""
+
+    __slots__ = ('frame', 'labels', 'button', 'index', 'row', 'kind', 'placed')
+
+    def __init__(self, frame, labels, button):
+        self.frame = frame
+        self.labels = labels
+        self.button = button
+        self.index = None
+        self.row = None
+        self.kind = None
+        self.placed = False
+
+
+class VirtualTable(ctk.CTkFrame):
+    """Fixed-height rows drawn from a small pool of recycled widgets
+
+    Rows are (kind, cells) tuples, where each cell is a string or a
+    (text, text_color) pair and kind is a key of ROW_KINDS. Only as many
+    row widgets exist as fit in the visible area; scrolling reassigns
+    them to other rows. set_rows() compares the new rows with what each
+    widget already shows and only reconfigures those that changed, so
+    appending a course touches a single row. Clicking a row's action
+    button calls on_action(row_index).
+    """
+
+    def __init__(self, parent, columns, row_height=40, on_action=None,
+                 empty_text="", show_header=True, action_width=50, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        self.columns = columns
+        self.row_height = row_height
+        self.on_action = on_action
+        self.action_width = action_width
+        self.rows = []
+        self.offset = 0
+        self.slots = []
+        self.text_color = ctk.ThemeManager.theme["CTkLabel"]["text_color"]
+
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.header = None
+        if show_header:
+            self.header = self._create_header()
+
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.grid(row=1, column=0, padx=(5, 0), pady=5, sticky="nsew")
+        self.body.bind("<Configure>", lambda e: self.refresh())
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, padx=(0, 3), pady=5, sticky="ns")
+
+        self.empty_label = ctk.CTkLabel(self.body, text=empty_text,
+                                        text_color="gray", font=get_font(14))
+
+        # The wheel is bound to a tag on this table's own widgets rather
+        # than with bind_all, so the binding goes away with the table
+        self.wheel_tag = f"wheel{self}"
+        for sequence in WHEEL_SEQUENCES:
+            self.bind_class(self.wheel_tag, sequence, self.on_mousewheel)
+        self._tag_wheel(self)
+
+        self.refresh()
+
+    def destroy(self):
+        for sequence in WHEEL_SEQUENCES:
+            self.unbind_class(self.wheel_tag, sequence)
+        super().destroy()
+
+    def _tag_wheel(self, widget):
+        """Let wheel events over a widget and its children scroll the table"""
+        if widget is self.scrollbar:
+            return  # the scrollbar scrolls itself
+        tags = widget.bindtags()
+        if self.wheel_tag not in tags:
+            widget.bindtags((self.wheel_tag,) + tags)
+        for child in widget.winfo_children():
+            self._tag_wheel(child)
+
+    def _create_header(self):
+        header = ctk.CTkFrame(self, fg_color="gray25")
+        for title, width, anchor in self.columns:
+            ctk.CTkLabel(header, text=title, font=get_font(12, "bold"),
+                         width=width, anchor=anchor).pack(side="left", padx=5, pady=5)
+        ctk.CTkLabel(header, text="", width=self.action_width).pack(side="left", padx=5, pady=5)
+        return header
+
+    def _create_slot(self):
+        frame = ctk.CTkFrame(self.body, fg_color=ROW_KINDS['row']['fg_color'],
+                             height=self.row_height - ROW_PADDING)
+        frame.pack_propagate(False)
+        labels = []
+        for title, width, anchor in self.columns:
+            label = ctk.CTkLabel(frame, text="", width=width, anchor=anchor)
+            label.pack(side="left", padx=5)
+            labels.append(label)
+        slot = _Slot(frame, labels, None)
+        slot.button = ctk.CTkButton(
+            frame,
+            text="",
+            width=self.action_width,
+            command=lambda: self._action(slot),
+            fg_color="#d32f2f",
+            hover_color="#b71c1c"
+        )
+        self._tag_wheel(frame)
+        return slot
+
+    # Row updates
+
+    def set_rows(self, rows):
+        """Show a new list of rows, redrawing only the visible rows that changed"""
+        self.rows = list(rows)
+        self.refresh()
+
+    def append(self, row):
+        self.rows.append(row)
+        self.refresh()
+
+    def delete(self, index):
+        del self.rows[index]
+        self.refresh()
+
+    def update_row(self, index, row):
+        self.rows[index] = row
+        self.refresh()
+
+    def scroll_to(self, index):
+        """Scroll so that a row is visible"""
+        top = index * self.row_height
+        height = self.body.winfo_height()
+        if top < self.offset:
+            self.offset = top
+        elif top + self.row_height > self.offset + height:
+            self.offset = top + self.row_height - height
+        self.refresh()
+
+    # Scrolling
+
+    def on_scrollbar(self, action, *args):
+        """Handle CTkScrollbar commands ('moveto', fraction) and ('scroll', n, what)"""
+        if action == "moveto":
+            self.offset = float(args[0]) * len(self.rows) * self.row_height
+        elif action == "scroll":
+            step = self.body.winfo_height() if args[1] == "pages" else self.row_height
+            self.offset += int(args[0]) * step
+        self.refresh()
+
+    def on_mousewheel(self, event):
+        if event.num == 4:
+            units = -1
+        elif event.num == 5:
+            units = 1
+        elif sys.platform == "darwin":
+            units = -event.delta
+        else:
+            units = -event.delta // 120
+        self.on_scrollbar("scroll", units, "units")
+
+    # Drawing
+
+    def refresh(self):
+        """Place pooled widgets over the visible rows"""
+        if not self.winfo_exists():
+            return
+        height = max(self.body.winfo_height(), 1)
+        total = len(self.rows) * self.row_height
+        self.offset = max(0, min(self.offset, total - height))
+
+        first = int(self.offset // self.row_height)
+        shift = self.offset - first * self.row_height
+        visible = min(len(self.rows) - first, math.ceil((height + shift) / self.row_height))
+
+        while len(self.slots) < visible:
+            self.slots.append(self._create_slot())
+
+        for i, slot in enumerate(self.slots):
+            if i < visible:
+                index = first + i
+                slot.index = index
+                self._show(slot, self.rows[index])
+                slot.frame.place(x=0, y=i * self.row_height - shift, relwidth=1)
+                slot.placed = True
+            elif slot.placed:
+                slot.frame.place_forget()
+                slot.placed = False
+
+        if total > height:
+            self.scrollbar.set(self.offset / total, (self.offset + height) / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+        if self.rows:
+            self.empty_label.place_forget()
+            if self.header is not None:
+                self.header.grid(row=0, column=0, columnspan=2, padx=5, pady=(5, 0), sticky="ew")
+        else:
+            self.empty_label.place(relx=0.5, y=20, anchor="n")
+            if self.header is not None:
+                self.header.grid_forget()
+
+    def _show(self, slot, row):
+        """Configure a pooled widget for a row unless it already shows it"""
+        if slot.row == row:
+            return
+        kind, cells = row
+        if slot.kind != kind:
+            style = ROW_KINDS[kind]
+            slot.frame.configure(fg_color=style['fg_color'])
+            font = get_font(*style['font']) if style['font'] else get_font(13)
+            for label in slot.labels:
+                label.configure(font=font)
+            if style['action']:
+                slot.button.configure(text=style['action'])
+                slot.button.pack(side="right", padx=5)
+                # The button creates its text label once it has text
+                self._tag_wheel(slot.button)
+            else:
+                slot.button.pack_forget()
+            slot.kind = kind
+
+        old_cells = slot.row[1] if slot.row else ()
+        for col, label in enumerate(slot.labels):
+            cell = cells[col] if col < len(cells) else ""
+            if col < len(old_cells) and old_cells[col] == cell:
+                continue
+            text, color = cell if isinstance(cell, tuple) else (cell, None)
+            label.configure(text=text, text_color=color or self.text_color)
+        slot.row = row
+
+    def _action(self, slot):
+        if self.on_action is not None and slot.index is not None:
+            self.on_action(slot.index)